@@ -0,0 +1,102 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Bench commands for TenantX
+"""
+
+import sys
+
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("tenantx-generate-dataset")
+@click.option("--company", help="Company to generate the dataset for (defaults to the global default)")
+@click.option("--enterprises", default=2, type=int, help="Number of enterprises")
+@click.option("--sbus-per-enterprise", default=3, type=int, help="Top-level SBUs per enterprise")
+@click.option("--sbu-depth", default=1, type=int, help="Nesting depth of SBUs")
+@click.option("--sbu-fanout", default=2, type=int, help="Child SBUs per SBU below the top level")
+@click.option("--factories", default=10, type=int, help="Number of factories, spread over the leaf SBUs")
+@click.option("--extra-cost-centers", default=0, type=int, help="Cost centers not linked to any unit")
+@click.option("--users", default=20, type=int, help="Number of users, spread over the scope shapes")
+@click.option("--cost-center-scope-size", default=1000, type=int, help="Cost centers held by cost-center scoped users")
+@click.option("--transactions", default=1000, type=int, help="Transactions spread over the scoped doctypes")
+@click.option("--prefix", default="GEN", help="Name prefix of every generated record")
+@click.option("--seed", default=42, type=int, help="Random seed")
+@click.option("--purge", is_flag=True, default=False, help="Delete the dataset with this prefix instead")
+@pass_context
+def generate_dataset(context, company=None, purge=False, **kwargs):
+	"""Generate a synthetic large-tenant dataset for scale testing"""
+	import frappe
+
+	from tenantx.tenantx.perf.dataset import generate_dataset as _generate_dataset
+	from tenantx.tenantx.perf.dataset import purge_dataset
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		if purge:
+			purge_dataset(kwargs["prefix"])
+		else:
+			_generate_dataset(company, **kwargs)
+	finally:
+		frappe.destroy()
+
+
+@click.command("tenantx-benchmark-permissions")
+@click.option("--prefix", default="GEN", help="Prefix of the generated dataset to benchmark against")
+@click.option("--iterations", default=10, type=int, help="Measurements per doctype and scope shape")
+@click.option("--baseline", "baseline_path", help="Baseline JSON file (defaults to the site's tenantx_benchmarks folder)")
+@click.option("--threshold", default=0.2, type=float, help="Relative slowdown flagged as a regression")
+@click.option("--update-baseline", is_flag=True, default=False, help="Store this run as the new baseline")
+@pass_context
+def benchmark_permissions(context, prefix, iterations, baseline_path, threshold, update_baseline):
+	"""Benchmark permission queries and flag regressions against the baseline"""
+	import frappe
+
+	from tenantx.tenantx.perf.permission_benchmark import run_and_compare
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		regressions = run_and_compare(prefix, iterations, baseline_path, threshold, update_baseline)
+	finally:
+		frappe.destroy()
+
+	if regressions:
+		sys.exit(1)
+
+
+@click.command("tenantx-benchmark-user-sync")
+@click.option("--prefix", default="GEN", help="Prefix of the generated dataset to take scope units from")
+@click.option("--size", "sizes", multiple=True, type=int, help="Scope rows per user (repeatable, defaults to 10/100/1000/5000)")
+@click.option("--strategy", "strategies", multiple=True, help="Sync strategy to measure (repeatable, defaults to all)")
+@click.option("--output", help="Results JSON file (defaults to the site's tenantx_benchmarks folder)")
+@pass_context
+def benchmark_user_sync(context, prefix, sizes, strategies, output):
+	"""Benchmark user save and permission sync latency by scope size"""
+	import frappe
+
+	from tenantx.tenantx.perf.user_sync_benchmark import (
+		DEFAULT_SIZES,
+		get_results_path,
+		run_user_sync_benchmark,
+		save_results,
+	)
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		print("Running TenantX user sync benchmark...")
+		results = run_user_sync_benchmark(prefix, sizes or DEFAULT_SIZES, strategies or None)
+		save_results(results, output)
+		print(f"✓ Results saved to {output or get_results_path()}")
+	finally:
+		frappe.destroy()
+
+
+commands = [generate_dataset, benchmark_permissions, benchmark_user_sync]
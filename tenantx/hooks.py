@@ -26,7 +26,7 @@ app_license = "mit"
 
 # include js, css files in header of desk.html
 # app_include_css = "/assets/tenantx/css/tenantx.css"
-# app_include_js = "/assets/tenantx/js/tenantx.js"
+app_include_js = "/assets/tenantx/js/active_unit.js"
 
 # include js, css files in header of web template
 # web_include_css = "/assets/tenantx/css/tenantx.css"
@@ -43,7 +43,14 @@ app_license = "mit"
 # page_js = {"page" : "public/js/file.js"}
 
 # include js in doctype views
-doctype_js = {"User" : "public/js/user.js"}
+doctype_js = {
+	"User" : "public/js/user.js",
+	"Purchase Order": "public/js/purchase_supplier.js",
+	"Purchase Receipt": "public/js/purchase_supplier.js",
+	"Purchase Invoice": "public/js/purchase_supplier.js",
+	"Sales Order": "public/js/selling_factory.js",
+	"Delivery Note": "public/js/selling_factory.js",
+}
 # doctype_list_js = {"doctype" : "public/js/doctype_list.js"}
 # doctype_tree_js = {"doctype" : "public/js/doctype_tree.js"}
 # doctype_calendar_js = {"doctype" : "public/js/doctype_calendar.js"}
@@ -85,6 +92,8 @@ doctype_js = {"User" : "public/js/user.js"}
 # before_install = "tenantx.install.before_install"
 # after_install = "tenantx.install.after_install"
 
+after_migrate = "tenantx.tenantx.dependencies.clear_link_registry"
+
 # Uninstallation
 # ------------
 
@@ -117,21 +126,46 @@ doctype_js = {"User" : "public/js/user.js"}
 # -----------
 # Permissions evaluated in scripted ways
 
-# permission_query_conditions = {
-# 	"Factory Business Unit": "tenantx.tenantx.doctype.factory_business_unit.factory_business_unit.get_permission_query_conditions",
-# 	"Strategic Business Unit": "tenantx.tenantx.doctype.strategic_business_unit.strategic_business_unit.get_permission_query_conditions",
-# 	"Purchase Order": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_purchase_order",
-# 	"Sales Invoice": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_sales_invoice",
-# 	"Purchase Invoice": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_purchase_invoice",
-# 	"Sales Order": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_sales_order",
-# 	"Delivery Note": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_delivery_note",
-# 	"Purchase Receipt": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_purchase_receipt",
-# 	"Journal Entry": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_journal_entry",
-# }
+permission_query_conditions = {
+	"Factory Business Unit": "tenantx.tenantx.doctype.factory_business_unit.factory_business_unit.get_permission_query_conditions",
+	"Strategic Business Unit": "tenantx.tenantx.doctype.strategic_business_unit.strategic_business_unit.get_permission_query_conditions",
+	"Purchase Order": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_purchase_order",
+	"Sales Invoice": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_sales_invoice",
+	"Purchase Invoice": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_purchase_invoice",
+	"Sales Order": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_sales_order",
+	"Delivery Note": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_delivery_note",
+	"Purchase Receipt": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_purchase_receipt",
+	"Journal Entry": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_journal_entry",
+	"Supplier": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_supplier",
+	"Customer": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_customer",
+	"Stock Entry": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_stock_entry",
+	"Material Request": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_material_request",
+	"Stock Reconciliation": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_stock_reconciliation",
+	"Stock Ledger Entry": "tenantx.tenantx.permission_queries.get_permission_query_conditions_for_stock_ledger_entry",
+}
 
-# has_permission = {
-# 	"Event": "frappe.desk.doctype.event.event.has_permission",
-# }
+has_permission = {
+	"Purchase Order": "tenantx.tenantx.permission_queries.has_permission_for_purchase_order",
+	"Sales Invoice": "tenantx.tenantx.permission_queries.has_permission_for_sales_invoice",
+	"Purchase Invoice": "tenantx.tenantx.permission_queries.has_permission_for_purchase_invoice",
+	"Sales Order": "tenantx.tenantx.permission_queries.has_permission_for_sales_order",
+	"Delivery Note": "tenantx.tenantx.permission_queries.has_permission_for_delivery_note",
+	"Purchase Receipt": "tenantx.tenantx.permission_queries.has_permission_for_purchase_receipt",
+	"Journal Entry": "tenantx.tenantx.permission_queries.has_permission_for_journal_entry",
+}
+
+# Session
+# -------
+boot_session = "tenantx.tenantx.active_unit.boot_session"
+on_logout = "tenantx.tenantx.active_unit.clear_active_unit"
+
+# Link search within the user's scope
+standard_queries = {
+	"Enterprise": "tenantx.tenantx.link_search.search_units",
+	"Strategic Business Unit": "tenantx.tenantx.link_search.search_units",
+	"Factory Business Unit": "tenantx.tenantx.link_search.search_units",
+	"Liaison Office": "tenantx.tenantx.link_search.search_units",
+}
 
 # DocType Class
 # ---------------
@@ -147,30 +181,80 @@ doctype_js = {"User" : "public/js/user.js"}
 
 doc_events = {
 	"User": {
+		"validate": "tenantx.tenantx.scope_validity.validate_user_scope_bounds",
 		"on_update": "tenantx.tenantx.doc_events.user.on_update",
-	}
+	},
+	"Enterprise": {
+		"on_update": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+		"on_trash": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+	},
+	"Strategic Business Unit": {
+		"on_update": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+		"on_trash": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+	},
+	"Factory Business Unit": {
+		"on_update": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+		"on_trash": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+	},
+	"Liaison Office": {
+		"on_update": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+		"on_trash": "tenantx.tenantx.hierarchy.clear_hierarchy_cache",
+	},
+	"Warehouse": {
+		"on_update": "tenantx.tenantx.warehouse_map.on_warehouse_change",
+		"after_delete": "tenantx.tenantx.warehouse_map.on_warehouse_change",
+	},
+	"User Permission": {
+		"on_update": "tenantx.tenantx.scope_index.on_user_permission_change",
+		"on_trash": "tenantx.tenantx.scope_index.on_user_permission_change",
+	},
+	"Supplier": {
+		"on_update": [
+			"tenantx.tenantx.party_map.on_party_update",
+			"tenantx.tenantx.approved_suppliers.on_supplier_update",
+		],
+		"on_trash": [
+			"tenantx.tenantx.party_map.on_party_trash",
+			"tenantx.tenantx.approved_suppliers.on_supplier_trash",
+		],
+	},
+	"Customer": {
+		"on_update": "tenantx.tenantx.party_map.on_party_update",
+		"on_trash": "tenantx.tenantx.party_map.on_party_trash",
+	},
+	"Purchase Order": {
+		"before_insert": "tenantx.tenantx.active_unit.set_default_cost_center",
+	},
+	"Sales Invoice": {
+		"before_insert": "tenantx.tenantx.active_unit.set_default_cost_center",
+	},
+	"Purchase Invoice": {
+		"before_insert": "tenantx.tenantx.active_unit.set_default_cost_center",
+	},
+	"Sales Order": {
+		"before_insert": "tenantx.tenantx.active_unit.set_default_cost_center",
+		"validate": "tenantx.tenantx.selling.validate_selling_factory",
+	},
+	"Delivery Note": {
+		"before_insert": "tenantx.tenantx.active_unit.set_default_cost_center",
+		"validate": "tenantx.tenantx.selling.validate_selling_factory",
+	},
+	"Purchase Receipt": {
+		"before_insert": "tenantx.tenantx.active_unit.set_default_cost_center",
+	},
+	"Journal Entry": {
+		"before_insert": "tenantx.tenantx.active_unit.set_default_cost_center",
+	},
 }
 
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"tenantx.tasks.all"
-# 	],
-# 	"daily": [
-# 		"tenantx.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"tenantx.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"tenantx.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"tenantx.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+	"hourly": [
+		"tenantx.tenantx.scope_validity.apply_scope_validity"
+	],
+}
 
 # Testing
 # -------
@@ -198,17 +282,23 @@ doc_events = {
 # Ignore links to specified DocTypes when deleting documents
 # -----------------------------------------------------------
 
-# ignore_links_on_delete = ["Communication", "ToDo"]
+ignore_links_on_delete = ["User Scope Index", "User Unit Index", "Unit Cost Center Index", "Permission Query Log", "Party Unit Map", "Warehouse Unit Map"]
 
 # Request Events
 # ----------------
-# before_request = ["tenantx.utils.before_request"]
-# after_request = ["tenantx.utils.after_request"]
+before_request = ["tenantx.tenantx.perf.request_timing.before_request"]
+after_request = [
+	"tenantx.tenantx.perf.request_timing.after_request",
+	"tenantx.tenantx.perf.query_log.uninstall_watchers",
+]
 
 # Job Events
 # ----------
-# before_job = ["tenantx.utils.before_job"]
-# after_job = ["tenantx.utils.after_job"]
+before_job = ["tenantx.tenantx.perf.request_timing.before_job"]
+after_job = [
+	"tenantx.tenantx.perf.request_timing.after_job",
+	"tenantx.tenantx.perf.query_log.uninstall_watchers",
+]
 
 # User Data Protection
 # --------------------
@@ -244,9 +334,9 @@ doc_events = {
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
+default_log_clearing_doctypes = {
+	"Permission Query Log": 30
+}
 
 # Fixtures
 # ----------
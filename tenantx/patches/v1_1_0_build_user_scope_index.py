@@ -0,0 +1,18 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Patch: v1.1.0 - Build User Scope Index
+Materializes the cost center scope of every user with scoped User Permissions
+"""
+
+import frappe
+
+from tenantx.tenantx.scope_index import rebuild_all_scope_indexes
+
+
+def execute():
+	"""Backfill the User Scope Index table for existing users"""
+	frappe.logger().info("Building TenantX User Scope Index...")
+	rebuild_all_scope_indexes()
+	frappe.logger().info("TenantX User Scope Index built successfully!")
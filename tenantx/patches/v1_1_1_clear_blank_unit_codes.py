@@ -0,0 +1,29 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Patch: v1.1.1 - Clear blank unit codes
+Unit codes become unique indexes, which accept any number of NULLs but only one
+empty string, so blank codes are normalized before the schema is synced
+"""
+
+import frappe
+
+UNIT_CODE_FIELDS = {
+	"Enterprise": "enterprise_code",
+	"Strategic Business Unit": "sbu_code",
+	"Factory Business Unit": "factory_code",
+	"Liaison Office": "office_code",
+}
+
+
+def execute():
+	"""Set empty unit codes to NULL"""
+	for doctype, fieldname in UNIT_CODE_FIELDS.items():
+		if not frappe.db.has_column(doctype, fieldname):
+			continue
+
+		frappe.db.sql(f"""
+			UPDATE `tab{doctype}` SET `{fieldname}` = NULL
+			WHERE TRIM(`{fieldname}`) = ''
+		""")
@@ -0,0 +1,23 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Patch: v1.1.1 - Install hot path indexes
+Adds composite indexes on the core tables TenantX permission queries filter on
+and verifies with EXPLAIN that they are picked up
+"""
+
+import frappe
+
+from tenantx.tenantx.db_indexes import install_indexes, verify_indexes
+
+
+def execute():
+	"""Create and verify TenantX indexes"""
+	install_indexes()
+
+	unused = [result for result in verify_indexes() if not result["ok"]]
+	if unused:
+		frappe.logger().warning(f"TenantX indexes not used by {len(unused)} hot path queries")
+	else:
+		frappe.logger().info("TenantX hot path indexes verified successfully!")
@@ -0,0 +1,18 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Patch: v1.2.0 - Build Party Unit Map
+Flattens the unit access tables of every Supplier and Customer into the Party Unit Map
+"""
+
+import frappe
+
+from tenantx.tenantx.party_map import rebuild_all_party_unit_maps
+
+
+def execute():
+	"""Backfill the Party Unit Map table for existing parties"""
+	frappe.logger().info("Building TenantX Party Unit Map...")
+	rebuild_all_party_unit_maps()
+	frappe.logger().info("TenantX Party Unit Map built successfully!")
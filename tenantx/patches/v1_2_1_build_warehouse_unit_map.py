@@ -0,0 +1,18 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Patch: v1.2.1 - Build Warehouse Unit Map
+Maps every warehouse under a Factory Business Unit's Warehouse Details to its factory
+"""
+
+import frappe
+
+from tenantx.tenantx.warehouse_map import rebuild_all_warehouse_unit_maps
+
+
+def execute():
+	"""Backfill the Warehouse Unit Map table for existing factories"""
+	frappe.logger().info("Building TenantX Warehouse Unit Map...")
+	rebuild_all_warehouse_unit_maps()
+	frappe.logger().info("TenantX Warehouse Unit Map built successfully!")
@@ -0,0 +1,18 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Patch: v1.2.2 - Build User Unit Index
+Materializes the units every scoped user can see, for party permission conditions
+"""
+
+import frappe
+
+from tenantx.tenantx.scope_index import rebuild_all_scope_indexes
+
+
+def execute():
+	"""Backfill the User Unit Index table, along with the User Scope Index, for existing users"""
+	frappe.logger().info("Building TenantX User Unit Index...")
+	rebuild_all_scope_indexes()
+	frappe.logger().info("TenantX User Unit Index built successfully!")
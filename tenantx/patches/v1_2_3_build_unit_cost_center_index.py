@@ -0,0 +1,18 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Patch: v1.2.3 - Build Unit Cost Center Index
+Materializes the subtree cost centers of every unit a session can make active
+"""
+
+import frappe
+
+from tenantx.tenantx.hierarchy import rebuild_unit_cost_centers
+
+
+def execute():
+	"""Backfill the Unit Cost Center Index table for existing units"""
+	frappe.logger().info("Building TenantX Unit Cost Center Index...")
+	rebuild_unit_cost_centers()
+	frappe.logger().info("TenantX Unit Cost Center Index built successfully!")
@@ -0,0 +1,86 @@
+// Active unit selector for TenantX sessions
+// Shows the active unit in the navbar, clicking it opens the switcher
+
+frappe.provide("tenantx.active_unit");
+
+tenantx.active_unit.render = function() {
+	const active_unit = frappe.boot.tenantx_active_unit;
+	$(".tenantx-active-unit").remove();
+
+	$(`<li class="nav-item tenantx-active-unit">
+		<a class="nav-link text-muted small" href="#" title="${__("Switch Active Unit")}">
+			${active_unit ? frappe.utils.escape_html(active_unit.title) : __("All Units")}
+		</a>
+	</li>`)
+		.prependTo(".navbar-nav:last")
+		.on("click", (e) => {
+			e.preventDefault();
+			tenantx.active_unit.show_dialog();
+		});
+};
+
+tenantx.active_unit.show_dialog = function() {
+	const active_unit = frappe.boot.tenantx_active_unit || {};
+	const dialog = new frappe.ui.Dialog({
+		title: __("Switch Active Unit"),
+		fields: [
+			{
+				fieldname: "unit_type",
+				fieldtype: "Select",
+				label: __("Unit Type"),
+				options: ["Factory Business Unit", "Strategic Business Unit", "Enterprise"],
+				default: active_unit.doctype || "Factory Business Unit",
+				reqd: 1,
+			},
+			{
+				fieldname: "unit",
+				fieldtype: "Dynamic Link",
+				label: __("Unit"),
+				options: "unit_type",
+				default: active_unit.name,
+				reqd: 1,
+			},
+		],
+		primary_action_label: __("Set"),
+		primary_action(values) {
+			frappe
+				.xcall("tenantx.tenantx.active_unit.set_active_unit", {
+					doctype: values.unit_type,
+					name: values.unit,
+				})
+				.then((unit) => {
+					dialog.hide();
+					tenantx.active_unit.changed(unit);
+				});
+		},
+		secondary_action_label: __("Clear"),
+		secondary_action() {
+			frappe.xcall("tenantx.tenantx.active_unit.clear_active_unit").then(() => {
+				dialog.hide();
+				tenantx.active_unit.changed(null);
+			});
+		},
+	});
+	dialog.show();
+};
+
+tenantx.active_unit.changed = function(unit) {
+	frappe.boot.tenantx_active_unit = unit;
+	tenantx.active_unit.render();
+	frappe.show_alert({
+		message: unit ? __("Working in {0}", [unit.title]) : __("Active unit cleared"),
+		indicator: "green",
+	});
+	// The open list carries the old scope until it refreshes
+	if (window.cur_list) {
+		cur_list.refresh();
+	}
+};
+
+$(document).on("app_ready", function() {
+	if (frappe.session.user === "Guest") {
+		return;
+	}
+
+	tenantx.active_unit.render();
+});
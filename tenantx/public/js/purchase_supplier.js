@@ -0,0 +1,13 @@
+// Supplier link query for TenantX purchase documents
+// Once the cost center resolves to a factory, only its approved suppliers are offered
+
+["Purchase Order", "Purchase Receipt", "Purchase Invoice"].forEach((doctype) => {
+	frappe.ui.form.on(doctype, {
+		setup(frm) {
+			frm.set_query("supplier", () => ({
+				query: "tenantx.tenantx.approved_suppliers.supplier_query",
+				filters: frm.doc.cost_center ? { cost_center: frm.doc.cost_center } : {},
+			}));
+		},
+	});
+});
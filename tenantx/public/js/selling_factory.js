@@ -0,0 +1,33 @@
+// Selling factory for TenantX Sales Orders and Delivery Notes
+// Picking a customer defaults the cost center to the factory serving it, and limits the
+// cost center to the factories serving it when there are several
+
+["Sales Order", "Delivery Note"].forEach((doctype) => {
+	frappe.ui.form.on(doctype, {
+		setup(frm) {
+			frm.set_query("cost_center", () => {
+				const cost_centers = (frm.tenantx_selling_factories || [])
+					.map((row) => row.cost_center)
+					.filter(Boolean);
+				return cost_centers.length ? { filters: { name: ["in", cost_centers] } } : {};
+			});
+		},
+
+		customer(frm) {
+			frm.tenantx_selling_factories = [];
+			if (!frm.doc.customer) {
+				return;
+			}
+
+			frappe
+				.xcall("tenantx.tenantx.selling.get_selling_factories", { customer: frm.doc.customer })
+				.then((result) => {
+					frm.tenantx_selling_factories = result.factories;
+					const cost_centers = result.factories.map((row) => row.cost_center);
+					if (result.cost_center && !cost_centers.includes(frm.doc.cost_center)) {
+						frm.set_value("cost_center", result.cost_center);
+					}
+				});
+		},
+	});
+});
@@ -0,0 +1,167 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Active unit for TenantX sessions
+A user can select one Enterprise, SBU or Factory Business Unit to work in. While it is
+set, permission conditions only match the cost centers of that subtree and new
+transactions default to its cost center
+"""
+
+import frappe
+from frappe import _
+from frappe.sessions import get_expiry_in_seconds
+
+from tenantx.tenantx.hierarchy import (
+	get_descendants,
+	get_hierarchy,
+	get_subtree_cost_centers,
+	get_visible_units,
+)
+
+ACTIVE_UNIT_CACHE_KEY = "tenantx_active_unit"
+
+ACTIVE_UNIT_DOCTYPES = ("Enterprise", "Strategic Business Unit", "Factory Business Unit")
+
+# Child tables whose rows default to the active unit's cost center, taxes and other tables keep theirs
+COST_CENTER_CHILD_TABLES = {
+	"Purchase Order": ("items",),
+	"Sales Invoice": ("items",),
+	"Purchase Invoice": ("items",),
+	"Sales Order": ("items",),
+	"Delivery Note": ("items",),
+	"Purchase Receipt": ("items",),
+	"Journal Entry": ("accounts",),
+}
+
+
+def get_cache_key(sid):
+	return f"{ACTIVE_UNIT_CACHE_KEY}|{sid}"
+
+
+def get_session_id():
+	"""Get the id of a logged in session, None for guests and background jobs"""
+	sid = frappe.session.get("sid") if frappe.session else None
+	if not sid or sid == "Guest":
+		return None
+	return sid
+
+
+@frappe.whitelist()
+def get_active_unit():
+	"""Get the active unit of the current session as a dict, or None"""
+	sid = get_session_id()
+	return frappe.cache().get_value(get_cache_key(sid)) if sid else None
+
+
+@frappe.whitelist()
+def set_active_unit(doctype, name):
+	"""Make a unit in the user's scope the active unit of the current session"""
+	sid = get_session_id()
+	if not sid:
+		frappe.throw(_("An active unit can only be set for a logged in session"))
+
+	if doctype not in ACTIVE_UNIT_DOCTYPES:
+		frappe.throw(_("Active unit must be one of {0}").format(", ".join(map(_, ACTIVE_UNIT_DOCTYPES))))
+
+	hierarchy = get_hierarchy()
+	unit = hierarchy["units"][doctype].get(name)
+	if not unit:
+		frappe.throw(_("{0} {1} does not exist").format(_(doctype), name), frappe.DoesNotExistError)
+
+	visible = get_visible_units(frappe.session.user, hierarchy)
+	if visible is not None and name not in visible[doctype]:
+		frappe.throw(_("{0} {1} is outside your access scope").format(_(doctype), name), frappe.PermissionError)
+
+	active_unit = {
+		"doctype": doctype,
+		"name": name,
+		"title": unit.title or name,
+		"cost_center": unit.cost_center,
+		"cost_centers": get_subtree_cost_centers(doctype, name, hierarchy),
+		"liaison_offices": sorted(get_descendants(doctype, name, hierarchy)["Liaison Office"]),
+	}
+	frappe.cache().set_value(get_cache_key(sid), active_unit, expires_in_sec=get_expiry_in_seconds())
+	return active_unit
+
+
+@frappe.whitelist()
+def clear_active_unit(*args, **kwargs):
+	"""Clear the active unit of the current session, also used as the on_logout hook"""
+	sid = get_session_id()
+	if sid:
+		frappe.cache().delete_value(get_cache_key(sid))
+
+
+def get_narrowing_unit(user):
+	"""Get the active unit narrowing a user's conditions, only ever the session user's own"""
+	if user != frappe.session.user:
+		return None
+
+	return get_active_unit()
+
+
+def narrow_to_active_unit(user, cost_centers):
+	"""
+	Narrow a user's scope to the active unit of the current session
+	Returns None when no unit is active, otherwise the cost centers within both
+	"""
+	active_unit = get_narrowing_unit(user)
+	if not active_unit:
+		return None
+
+	allowed = set(cost_centers)
+	return [cost_center for cost_center in active_unit["cost_centers"] if cost_center in allowed]
+
+
+def narrow_liaison_offices(user, liaison_offices):
+	"""
+	Narrow a user's Liaison Offices to those below the active unit of the current session
+	Returns None when no unit is active
+	"""
+	active_unit = get_narrowing_unit(user)
+	if not active_unit:
+		return None
+
+	below = set(active_unit.get("liaison_offices") or ())
+	return [office for office in liaison_offices if office in below]
+
+
+def set_default_cost_center(doc, method=None):
+	"""
+	Default the cost center of new transactions, and of their item rows, to the active unit's
+	Journal Entry rows are only filled when their account requires a cost center
+	"""
+	active_unit = get_active_unit()
+	if not active_unit or not active_unit.get("cost_center"):
+		return
+
+	rows = [doc]
+	for fieldname in COST_CENTER_CHILD_TABLES.get(doc.doctype, ()):
+		rows.extend(doc.get(fieldname) or [])
+
+	if doc.doctype == "Journal Entry":
+		profit_and_loss = get_profit_and_loss_accounts([row.get("account") for row in rows[1:]])
+		rows = [doc, *(row for row in rows[1:] if row.get("account") in profit_and_loss)]
+
+	for row in rows:
+		if row.meta.has_field("cost_center") and not row.get("cost_center"):
+			row.cost_center = active_unit["cost_center"]
+
+
+def get_profit_and_loss_accounts(accounts):
+	"""Get the accounts among some that require a cost center, as ERPNext does for Profit and Loss"""
+	accounts = list(set(filter(None, accounts)))
+	if not accounts:
+		return set()
+
+	return set(frappe.get_all(
+		"Account",
+		filters={"name": ["in", accounts], "report_type": "Profit and Loss"},
+		pluck="name",
+	))
+
+
+def boot_session(bootinfo):
+	"""Expose the active unit to the desk"""
+	bootinfo.tenantx_active_unit = get_active_unit()
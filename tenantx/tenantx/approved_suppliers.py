@@ -0,0 +1,115 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Approved suppliers per factory
+Caches, for each Factory Business Unit, the approved suppliers of its Factory Association
+rows ranked Primary, Secondary, Backup. Purchase documents search suppliers from this
+cache once their cost center resolves to a factory
+"""
+
+import frappe
+
+from tenantx.tenantx.hierarchy import get_factory_for_cost_center
+
+APPROVED_SUPPLIERS_CACHE_KEY = "tenantx_approved_suppliers"
+
+# Factory Association access types, best first
+ACCESS_TYPE_RANK = ("Primary", "Secondary", "Backup")
+
+
+def get_approved_suppliers(factory):
+	"""
+	Get the approved, enabled suppliers of a factory as ranked (supplier, supplier_name, access_type)
+	Served from cache, resolved from the Party Unit Map on a miss
+	"""
+	return frappe.cache().hget(
+		APPROVED_SUPPLIERS_CACHE_KEY, factory, generator=lambda: resolve_approved_suppliers(factory)
+	)
+
+
+def resolve_approved_suppliers(factory):
+	"""Resolve the ranked approved suppliers of a factory"""
+	rows = frappe.db.sql("""
+		SELECT pum.`party`, sup.`supplier_name`, pum.`access_type`
+		FROM `tabParty Unit Map` pum
+		INNER JOIN `tabSupplier` sup ON sup.`name` = pum.`party`
+		WHERE pum.`party_type` = 'Supplier'
+			AND pum.`unit_type` = 'Factory Business Unit'
+			AND pum.`unit` = %(factory)s
+			AND pum.`source` = 'Factory Association'
+			AND pum.`is_approved` = 1
+			AND sup.`disabled` = 0
+	""", {"factory": factory})
+
+	ranked = {}
+	for supplier, supplier_name, access_type in rows:
+		rank = get_rank(access_type)
+		# A supplier associated twice keeps its best association
+		if supplier not in ranked or rank < get_rank(ranked[supplier][2]):
+			ranked[supplier] = (supplier, supplier_name, access_type)
+
+	return sorted(ranked.values(), key=lambda row: (get_rank(row[2]), row[1] or row[0]))
+
+
+def get_rank(access_type):
+	return ACCESS_TYPE_RANK.index(access_type) if access_type in ACCESS_TYPE_RANK else len(ACCESS_TYPE_RANK)
+
+
+def refresh_factories(factories):
+	"""Re-resolve the cached suppliers of some factories"""
+	for factory in factories:
+		frappe.cache().hset(APPROVED_SUPPLIERS_CACHE_KEY, factory, resolve_approved_suppliers(factory))
+
+
+def get_associated_factories(doc):
+	return {row.factory for row in doc.get("custom_factory_association") or [] if row.factory}
+
+
+def on_supplier_update(doc, method=None):
+	"""Refresh the factories a Supplier was or now is associated with, after the Party Unit Map"""
+	factories = get_associated_factories(doc)
+	before_save = doc.get_doc_before_save()
+	if before_save:
+		factories |= get_associated_factories(before_save)
+
+	refresh_factories(factories)
+
+
+def on_supplier_trash(doc, method=None):
+	"""Drop the cached suppliers of a deleted Supplier's factories"""
+	for factory in get_associated_factories(doc):
+		frappe.cache().hdel(APPROVED_SUPPLIERS_CACHE_KEY, factory)
+
+
+def clear_approved_supplier_cache():
+	frappe.cache().delete_value(APPROVED_SUPPLIERS_CACHE_KEY)
+
+
+@frappe.whitelist()
+@frappe.validate_and_sanitize_search_inputs
+def supplier_query(doctype, txt, searchfield, start, page_len, filters):
+	"""
+	Supplier link query for purchase documents
+	Lists the approved suppliers of the document's factory, best association first. Without a
+	factory it falls back to ERPNext's supplier query
+	"""
+	filters = filters or {}
+	factory = filters.get("factory")
+	if not factory and filters.get("cost_center"):
+		factory = get_factory_for_cost_center(filters["cost_center"])
+
+	if not factory:
+		from erpnext.controllers.queries import supplier_query as erpnext_supplier_query
+
+		other_filters = {key: value for key, value in filters.items() if key not in ("factory", "cost_center")}
+		return erpnext_supplier_query(doctype, txt, searchfield, start, page_len, other_filters)
+
+	txt = (txt or "").lower()
+	suppliers = [
+		row for row in get_approved_suppliers(factory)
+		if not txt or txt in row[0].lower() or txt in (row[1] or "").lower()
+	]
+
+	start = int(start)
+	return suppliers[start:start + int(page_len)]
@@ -0,0 +1,124 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Database indexes for TenantX hot filter columns
+Single-column and unique indexes on TenantX doctypes are declared in their DocType JSON;
+this module adds the composite indexes on core tables that permission and validation
+paths filter on, and verifies with EXPLAIN that the optimizer actually uses them
+"""
+
+import frappe
+
+# Composite indexes that cannot be declared through DocType JSON
+COMPOSITE_INDEXES = [
+	{
+		"doctype": "User Permission",
+		"fields": ["user", "allow", "for_value"],
+		"index_name": "tenantx_user_allow_for_value",
+	},
+	{
+		"doctype": "Journal Entry Account",
+		"fields": ["parent", "cost_center"],
+		"index_name": "tenantx_parent_cost_center",
+	},
+]
+
+# Representative hot-path queries and the filter values used to EXPLAIN them
+EXPLAIN_CHECKS = [
+	{
+		"doctype": "User Permission",
+		"query": """SELECT `for_value` FROM `tabUser Permission`
+			WHERE `user` = %(value)s AND `allow` = 'Factory Business Unit'""",
+	},
+	{
+		"doctype": "Factory Business Unit",
+		"query": "SELECT `name` FROM `tabFactory Business Unit` WHERE `cost_center` = %(value)s",
+	},
+	{
+		"doctype": "Factory Business Unit",
+		"query": "SELECT `name` FROM `tabFactory Business Unit` WHERE `sbu` = %(value)s",
+	},
+	{
+		"doctype": "Factory Business Unit",
+		"query": "SELECT `name` FROM `tabFactory Business Unit` WHERE `enterprise` = %(value)s",
+	},
+	{
+		"doctype": "Factory Business Unit",
+		"query": "SELECT `name` FROM `tabFactory Business Unit` WHERE `factory_code` = %(value)s",
+	},
+	{
+		"doctype": "Strategic Business Unit",
+		"query": "SELECT `name` FROM `tabStrategic Business Unit` WHERE `cost_center` = %(value)s",
+	},
+	{
+		"doctype": "Strategic Business Unit",
+		"query": "SELECT `name` FROM `tabStrategic Business Unit` WHERE `enterprise` = %(value)s",
+	},
+	{
+		"doctype": "Strategic Business Unit",
+		"query": "SELECT `name` FROM `tabStrategic Business Unit` WHERE `sbu_code` = %(value)s",
+	},
+	{
+		"doctype": "Strategic Business Unit",
+		"query": "SELECT `name` FROM `tabStrategic Business Unit` WHERE `parent_sbu` = %(value)s",
+	},
+	{
+		"doctype": "Enterprise",
+		"query": "SELECT `name` FROM `tabEnterprise` WHERE `parent_enterprise` = %(value)s",
+	},
+	{
+		"doctype": "Enterprise",
+		"query": "SELECT `name` FROM `tabEnterprise` WHERE `enterprise_code` = %(value)s",
+	},
+	{
+		"doctype": "Journal Entry Account",
+		"query": """SELECT 1 FROM `tabJournal Entry Account`
+			WHERE `parent` = %(value)s AND `cost_center` = %(value)s""",
+	},
+	{
+		"doctype": "User Scope Index",
+		"query": "SELECT `cost_center` FROM `tabUser Scope Index` WHERE `user` = %(value)s",
+	},
+	{
+		"doctype": "User Unit Index",
+		"query": """SELECT `unit` FROM `tabUser Unit Index`
+			WHERE `user` = %(value)s AND `unit_type` = 'Factory Business Unit'""",
+	},
+]
+
+
+def install_indexes():
+	"""Create the composite indexes that are missing"""
+	for index in COMPOSITE_INDEXES:
+		if not frappe.db.table_exists(index["doctype"]):
+			continue
+
+		frappe.db.add_index(index["doctype"], index["fields"], index["index_name"])
+
+
+def verify_indexes():
+	"""
+	EXPLAIN every hot-path query and report the index the optimizer picks
+	Can be run on a site with `bench execute tenantx.tenantx.db_indexes.verify_indexes`
+	"""
+	report = []
+	for check in EXPLAIN_CHECKS:
+		if not frappe.db.table_exists(check["doctype"]):
+			continue
+
+		plan = frappe.db.sql(f"EXPLAIN {check['query']}", {"value": "_tenantx_probe"}, as_dict=True)[0]
+		result = {
+			"doctype": check["doctype"],
+			"query": " ".join(check["query"].split()),
+			"key": plan.get("key"),
+			"rows": plan.get("rows"),
+			# An impossible WHERE on an empty or unique lookup is still answered from an index
+			"ok": bool(plan.get("key")) or "Impossible WHERE" in (plan.get("Extra") or ""),
+		}
+		report.append(result)
+
+		if not result["ok"]:
+			frappe.logger().warning(f"TenantX index not used for: {result['query']}")
+
+	return report
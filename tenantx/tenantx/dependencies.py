@@ -0,0 +1,102 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Dependency registry for TenantX org units
+Finds every Link field pointing at a doctype from DocField and Custom Field metadata
+and counts all references to a document in a single UNION ALL query
+"""
+
+import frappe
+from frappe import _
+
+LINK_REGISTRY_CACHE_KEY = "tenantx_link_registry"
+
+
+def get_link_registry(doctype):
+	"""
+	Get the cached list of Link fields that point at a doctype
+	Each entry is a dict of `doctype`, `fieldname` and `istable`
+	"""
+	return frappe.cache().hget(LINK_REGISTRY_CACHE_KEY, doctype, generator=lambda: build_link_registry(doctype))
+
+
+def build_link_registry(doctype):
+	"""Collect standard and custom Link fields pointing at a doctype"""
+	links = frappe.db.sql("""
+		SELECT df.`parent` AS doctype, df.`fieldname`, dt.`istable`
+		FROM `tabDocField` df
+		INNER JOIN `tabDocType` dt ON dt.`name` = df.`parent`
+		WHERE df.`fieldtype` = 'Link' AND df.`options` = %(doctype)s
+			AND dt.`issingle` = 0 AND IFNULL(dt.`is_virtual`, 0) = 0
+		UNION
+		SELECT cf.`dt` AS doctype, cf.`fieldname`, dt.`istable`
+		FROM `tabCustom Field` cf
+		INNER JOIN `tabDocType` dt ON dt.`name` = cf.`dt`
+		WHERE cf.`fieldtype` = 'Link' AND cf.`options` = %(doctype)s
+			AND dt.`issingle` = 0 AND IFNULL(dt.`is_virtual`, 0) = 0
+	""", {"doctype": doctype}, as_dict=True)
+
+	# Derived index tables are rebuilt on their own and never block a delete
+	ignored = set(frappe.get_hooks("ignore_links_on_delete"))
+
+	return sorted(
+		(link for link in links if link.doctype not in ignored),
+		key=lambda link: (link.doctype, link.fieldname),
+	)
+
+
+def clear_link_registry():
+	"""Drop the cached registry, called after migrate when metadata may have changed"""
+	frappe.cache().delete_key(LINK_REGISTRY_CACHE_KEY)
+
+
+def get_dependency_counts(doctype, name):
+	"""
+	Count the documents referencing `name` in one UNION ALL query
+	Rows in child tables are counted against their parent doctype
+	Returns a dict of referencing doctype to number of documents
+	"""
+	branches = []
+	for link in get_link_registry(doctype):
+		if link.istable:
+			branches.append(f"""
+				SELECT `parenttype` AS doctype, COUNT(DISTINCT `parent`) AS count
+				FROM `tab{link.doctype}`
+				WHERE `{link.fieldname}` = %(name)s
+				GROUP BY `parenttype`
+			""")
+		else:
+			# A self-referencing link (e.g. parent_enterprise) must not count the document itself
+			exclude_self = "AND `name` != %(name)s" if link.doctype == doctype else ""
+			branches.append(f"""
+				SELECT {frappe.db.escape(link.doctype)} AS doctype, COUNT(*) AS count
+				FROM `tab{link.doctype}`
+				WHERE `{link.fieldname}` = %(name)s {exclude_self}
+			""")
+
+	if not branches:
+		return {}
+
+	counts = {}
+	for referencing_doctype, count in frappe.db.sql(" UNION ALL ".join(branches), {"name": name}):
+		if count:
+			counts[referencing_doctype] = counts.get(referencing_doctype, 0) + count
+
+	return counts
+
+
+def check_dependencies(doc):
+	"""Throw if any document still references `doc`, listing every referencing doctype"""
+	counts = get_dependency_counts(doc.doctype, doc.name)
+	if not counts:
+		return
+
+	references = ", ".join(
+		_("{0} {1}(s)").format(count, _(referencing_doctype))
+		for referencing_doctype, count in sorted(counts.items())
+	)
+	frappe.throw(
+		_("Cannot delete {0} '{1}' as it is referenced by {2}").format(_(doc.doctype), doc.name, references),
+		frappe.LinkExistsError,
+	)
@@ -1,16 +1,24 @@
 import frappe
 from frappe import _
 
+from tenantx.tenantx.perf.profiler import profile_hook
+from tenantx.tenantx.scope_index import rebuild_scope_index
+from tenantx.tenantx.scope_validity import is_scope_current
+
+@profile_hook("user_sync", "User")
 def on_update(doc, method):
     """
     Update User Permissions based on user_access_scope child table
     This function implements Phase 2 of the permission system roadmap
     """
     try:
+        frappe.flags.in_user_scope_sync = True
         update_user_permissions(doc, method)
     except Exception as e:
         frappe.logger().error(f"Error updating user permissions for {doc.name}: {str(e)}")
         frappe.throw(_("Failed to update user permissions: {0}").format(str(e)))
+    finally:
+        frappe.flags.in_user_scope_sync = False
 
 
 def update_user_permissions(doc, method):
@@ -33,7 +41,9 @@ def update_user_permissions(doc, method):
     user_access_scope = doc.get("user_access_scope") or []
     
     for scope in user_access_scope:
-        if scope.scope_type and scope.scope_name:
+        # Scopes granting neither read nor write give no access at all, time-bounded
+        # scopes outside their bounds are granted or revoked by the hourly validity job
+        if scope.scope_type and scope.scope_name and (scope.read or scope.write) and is_scope_current(scope):
             # Validate the scope assignment
             if not frappe.db.exists(scope.scope_type, scope.scope_name):
                 frappe.logger().warning(f"Scope document {scope.scope_name} does not exist in {scope.scope_type}")
@@ -61,6 +71,9 @@ def update_user_permissions(doc, method):
                 
                 frappe.logger().info(f"Created User Permission for {doc.name}: {scope.scope_type} - {scope.scope_name}")
     
+    # Refresh the materialized scope index, with its read and write sets, in one pass
+    rebuild_scope_index([doc.name])
+    
     # Clear user permissions cache
     frappe.clear_cache(user=doc.name)
 
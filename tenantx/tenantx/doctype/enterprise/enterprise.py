@@ -6,8 +6,13 @@ from frappe.model.document import Document
 from frappe import _
 import re
 
+from tenantx.tenantx.dependencies import check_dependencies
+from tenantx.tenantx.hierarchy import cascade_deactivation
+from tenantx.tenantx.perf.request_timing import VALIDATION, timed_area
+
 
 class Enterprise(Document):
+	@timed_area(VALIDATION)
 	def validate(self):
 		"""Validate enterprise data before saving"""
 		self.validate_enterprise_code()
@@ -18,7 +23,7 @@ class Enterprise(Document):
 		self.create_cost_center_if_needed()
 	
 	def validate_enterprise_code(self):
-		"""Validate enterprise code format and uniqueness"""
+		"""Validate enterprise code format"""
 		if self.enterprise_code:
 			# Check for alphanumeric format
 			if not re.match(r'^[A-Z0-9\-_]+$', self.enterprise_code):
@@ -28,13 +33,7 @@ class Enterprise(Document):
 			if len(self.enterprise_code) < 3:
 				frappe.throw(_("Enterprise Code must be at least 3 characters long"))
 			
-			# Check for uniqueness
-			existing = frappe.db.exists("Enterprise", {
-				"enterprise_code": self.enterprise_code,
-				"name": ["!=", self.name]
-			})
-			if existing:
-				frappe.throw(_("Enterprise Code '{0}' already exists").format(self.enterprise_code))
+			# Uniqueness is enforced by the unique index on enterprise_code
 	
 	def validate_tax_id(self):
 		"""Validate tax ID format if provided"""
@@ -85,32 +84,12 @@ class Enterprise(Document):
 	
 	def on_update(self):
 		"""Actions to perform after enterprise is updated"""
-		self.update_child_enterprises()
-		self.update_related_documents()
-	
-	def update_child_enterprises(self):
-		"""Update child enterprises if parent status changes"""
-		if self.has_value_changed("is_active"):
-			child_enterprises = frappe.get_all("Enterprise", 
-				filters={"parent_enterprise": self.name}, 
-				fields=["name", "is_active"])
-			
-			for child in child_enterprises:
-				if not self.is_active and child.is_active:
-					frappe.db.set_value("Enterprise", child.name, "is_active", 0)
-					frappe.msgprint(_("Child Enterprise '{0}' has been deactivated").format(child.name))
+		self.cascade_deactivation()
 	
-	def update_related_documents(self):
-		"""Update related documents when enterprise changes"""
-		# Update SBUs if enterprise is deactivated
+	def cascade_deactivation(self):
+		"""Deactivate child enterprises, SBUs, factories and liaison offices when the enterprise is deactivated"""
 		if self.has_value_changed("is_active") and not self.is_active:
-			sbus = frappe.get_all("Strategic Business Unit", 
-				filters={"enterprise": self.name, "is_active": 1}, 
-				fields=["name"])
-			
-			for sbu in sbus:
-				frappe.db.set_value("Strategic Business Unit", sbu.name, "is_active", 0)
-				frappe.msgprint(_("SBU '{0}' has been deactivated").format(sbu.name))
+			cascade_deactivation(self.doctype, self.name)
 	
 	def on_trash(self):
 		"""Actions before enterprise is deleted"""
@@ -118,29 +97,8 @@ class Enterprise(Document):
 	
 	def check_dependencies(self):
 		"""Check for dependencies before deletion"""
-		# Check for child enterprises
-		child_enterprises = frappe.db.count("Enterprise", {"parent_enterprise": self.name})
-		if child_enterprises > 0:
-			frappe.throw(_("Cannot delete Enterprise '{0}' as it has {1} child enterprise(s)").format(
-				self.name, child_enterprises))
-		
-		# Check for associated SBUs
-		sbu_count = frappe.db.count("Strategic Business Unit", {"enterprise": self.name})
-		if sbu_count > 0:
-			frappe.throw(_("Cannot delete Enterprise '{0}' as it has {1} associated SBU(s)").format(
-				self.name, sbu_count))
-		
-		# Check for associated Factory Business Units
-		factory_count = frappe.db.count("Factory Business Unit", {"enterprise": self.name})
-		if factory_count > 0:
-			frappe.throw(_("Cannot delete Enterprise '{0}' as it has {1} associated Factory Business Unit(s)").format(
-				self.name, factory_count))
-		
-		# Check for associated Liaison Offices
-		liaison_count = frappe.db.count("Liaison Office", {"enterprise": self.name})
-		if liaison_count > 0:
-			frappe.throw(_("Cannot delete Enterprise '{0}' as it has {1} associated Liaison Office(s)").format(
-				self.name, liaison_count))
+		# Child enterprises, SBUs, factories, liaison offices and parties in one query
+		check_dependencies(self)
 
 	def create_cost_center_if_needed(self):
 		"""Create a Cost Center if is_cost_center is checked and not already set"""
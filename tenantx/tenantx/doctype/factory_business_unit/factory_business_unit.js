@@ -35,6 +35,23 @@ frappe.ui.form.on("Factory Business Unit", {
                     custom_enterprise: frm.doc.enterprise
                 });
             }, __('Create'));
+
+            frm.add_custom_button(__('Provision Warehouses'), function() {
+                frappe.call({
+                    method: "tenantx.tenantx.warehouse_provisioning.provision_warehouses",
+                    args: {
+                        factory: frm.doc.name
+                    },
+                    freeze: true,
+                    callback: function(r) {
+                        frappe.show_alert({
+                            message: __("{0} warehouses created", [r.message || 0]),
+                            indicator: "green"
+                        });
+                        frm.reload_doc();
+                    }
+                });
+            }, __('Create'));
         }
         frm.set_query("parent_enterprise", function() {
             return {
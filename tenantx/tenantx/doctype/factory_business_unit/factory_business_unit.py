@@ -6,8 +6,17 @@ from frappe.model.document import Document
 from frappe import _
 import re
 
+from tenantx.tenantx.dependencies import check_dependencies
+from tenantx.tenantx.hierarchy import cascade_deactivation
+from tenantx.tenantx import party_map, warehouse_map
+from tenantx.tenantx.perf.profiler import profile_hook
+from tenantx.tenantx.permission_queries import get_unit_conditions
+from tenantx.tenantx.scope_index import rebuild_scope_index_for_unit
+from tenantx.tenantx.perf.request_timing import VALIDATION, timed_area
+
 
 class FactoryBusinessUnit(Document):
+	@timed_area(VALIDATION)
 	def validate(self):
 		"""Validate factory business unit data before saving"""
 		self.validate_factory_code()
@@ -22,7 +31,7 @@ class FactoryBusinessUnit(Document):
 		self.create_cost_center_if_needed()
 	
 	def validate_factory_code(self):
-		"""Validate factory code format and uniqueness"""
+		"""Validate factory code format"""
 		if self.factory_code:
 			# Check for alphanumeric format
 			if not re.match(r'^[A-Z0-9\-_]+$', self.factory_code):
@@ -36,13 +45,7 @@ class FactoryBusinessUnit(Document):
 			if len(self.factory_code) > 20:
 				frappe.throw(_("Factory Code cannot exceed 20 characters"))
 			
-			# Check for uniqueness
-			existing = frappe.db.exists("Factory Business Unit", {
-				"factory_code": self.factory_code,
-				"name": ["!=", self.name]
-			})
-			if existing:
-				frappe.throw(_("Factory Code '{0}' already exists").format(self.factory_code))
+			# Uniqueness is enforced by the unique index on factory_code
 	
 	def validate_enterprise_association(self):
 		"""Validate enterprise association"""
@@ -138,6 +141,9 @@ class FactoryBusinessUnit(Document):
 		"""Actions after factory business unit is updated"""
 		self.update_sbu_references()
 		self.update_related_documents()
+		self.update_scope_index()
+		self.update_party_unit_map()
+		self.update_warehouse_unit_map()
 	
 	def update_sbu_references(self):
 		pass
@@ -149,25 +155,40 @@ class FactoryBusinessUnit(Document):
 	
 	def update_related_documents(self):
 		"""Update related documents when factory changes"""
-		# Update SBU if factory is deactivated
 		if self.has_value_changed("is_active") and not self.is_active:
+			# Update SBU if factory is deactivated
 			if self.sbu:
 				sbu = frappe.get_doc("Strategic Business Unit", self.sbu)
 				if sbu.factory == self.name:
 					frappe.db.set_value("Strategic Business Unit", self.sbu, "factory", "")
 					frappe.msgprint(_("Factory reference has been removed from SBU '{0}'").format(self.sbu))
+			
+			# Deactivate liaison offices attached to this factory
+			cascade_deactivation(self.doctype, self.name)
+	
+	def update_scope_index(self):
+		"""Refresh the scope of users granted this factory when its cost center changes or it is (de)activated"""
+		if self.has_value_changed("cost_center") or self.has_value_changed("is_active"):
+			rebuild_scope_index_for_unit(self.doctype, self.name)
+	
+	def update_party_unit_map(self):
+		"""Keep the customer to factory rows of the Party Unit Map in step with Customer Details"""
+		party_map.on_factory_update(self)
+	
+	def update_warehouse_unit_map(self):
+		"""Remap the warehouses under Warehouse Details, and their cost center, for stock permissions"""
+		warehouse_map.on_factory_update(self)
 	
 	def on_trash(self):
 		"""Actions before factory business unit is deleted"""
 		self.check_dependencies()
+		party_map.on_factory_trash(self)
+		warehouse_map.on_factory_trash(self)
 	
 	def check_dependencies(self):
 		"""Check for dependencies before deletion"""
-		# Check for associated SBUs
-		sbu_count = frappe.db.count("Strategic Business Unit", {"factory": self.name})
-		if sbu_count > 0:
-			frappe.throw(_("Cannot delete Factory Business Unit '{0}' as it is referenced by {1} SBU(s)").format(
-				self.name, sbu_count))
+		# SBUs reference factories through the FBU List child table, so this covers them too
+		check_dependencies(self)
 	
 	def before_insert(self):
 		"""Actions before factory business unit is inserted"""
@@ -199,21 +220,10 @@ class FactoryBusinessUnit(Document):
 				self.cost_center = cc.name
 
 
+@profile_hook("permission_query_conditions", "Factory Business Unit")
 def get_permission_query_conditions(user):
 	"""
 	Permission query conditions for Factory Business Unit
-	This function checks User Permission records for the logged-in user and returns SQL conditions
+	Users see the Factory Business Units granted to them and every one below their granted units
 	"""
-	if not user:
-		user = frappe.session.user
-	
-	# System Manager sees everything
-	if "System Manager" in frappe.get_roles(user):
-		return ""
-	
-	# This line fetches all Factory Business Units the user has been granted access to
-	# via the User Permissions doctype, which we automated in the previous step.
-	return """( `tabFactory Business Unit`.`name` IN (
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user`=%(user)s AND `allow`='Factory Business Unit'
-	))"""
+	return get_unit_conditions("Factory Business Unit", user)
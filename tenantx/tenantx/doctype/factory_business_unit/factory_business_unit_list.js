@@ -0,0 +1,30 @@
+// Copyright (c) 2026, CognitionXLogic and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings["Factory Business Unit"] = {
+    onload: function(listview) {
+        listview.page.add_actions_menu_item(__("Provision Warehouses"), function() {
+            const factories = listview.get_checked_items(true);
+            if (!factories.length) {
+                frappe.msgprint(__("Select the factories to provision warehouses for"));
+                return;
+            }
+
+            frappe.call({
+                method: "tenantx.tenantx.warehouse_provisioning.bulk_provision_warehouses",
+                args: {
+                    factories: factories
+                },
+                freeze: true,
+                freeze_message: __("Provisioning warehouses for {0} factories", [factories.length]),
+                callback: function(r) {
+                    frappe.show_alert({
+                        message: __("{0} warehouses created", [r.message || 0]),
+                        indicator: "green"
+                    });
+                    listview.refresh();
+                }
+            });
+        }, false);
+    }
+};
@@ -6,8 +6,13 @@ from frappe.model.document import Document
 from frappe import _
 import re
 
+from tenantx.tenantx.dependencies import check_dependencies
+from tenantx.tenantx.perf.request_timing import VALIDATION, timed_area
+from tenantx.tenantx.scope_index import rebuild_scope_index_for_unit
+
 
 class LiaisonOffice(Document):
+	@timed_area(VALIDATION)
 	def validate(self):
 		"""Validate liaison office data before saving"""
 		self.validate_office_code()
@@ -16,7 +21,7 @@ class LiaisonOffice(Document):
 		self.validate_contact_address()
 	
 	def validate_office_code(self):
-		"""Validate office code format and uniqueness"""
+		"""Validate office code format"""
 		if self.office_code:
 			# Check for alphanumeric format
 			if not re.match(r'^[A-Z0-9\-_]+$', self.office_code):
@@ -30,13 +35,7 @@ class LiaisonOffice(Document):
 			if len(self.office_code) > 20:
 				frappe.throw(_("Office Code cannot exceed 20 characters"))
 			
-			# Check for uniqueness
-			existing = frappe.db.exists("Liaison Office", {
-				"office_code": self.office_code,
-				"name": ["!=", self.name]
-			})
-			if existing:
-				frappe.throw(_("Office Code '{0}' already exists").format(self.office_code))
+			# Uniqueness is enforced by the unique index on office_code
 	
 	def validate_enterprise_association(self):
 		"""Validate enterprise association"""
@@ -89,6 +88,12 @@ class LiaisonOffice(Document):
 	def on_update(self):
 		"""Actions after liaison office is updated"""
 		self.update_related_documents()
+		self.update_scope_index()
+	
+	def update_scope_index(self):
+		"""Refresh the scope of users granted this liaison office when its factory or SBU changes or it is (de)activated"""
+		if any(self.has_value_changed(fieldname) for fieldname in ("factory", "sbu", "is_active")):
+			rebuild_scope_index_for_unit(self.doctype, self.name)
 	
 	def update_related_documents(self):
 		"""Update related documents when liaison office changes"""
@@ -103,6 +108,8 @@ class LiaisonOffice(Document):
 	
 	def check_dependencies(self):
 		"""Check for dependencies before deletion"""
+		check_dependencies(self)
+		
 		# Check for active liaison head assignment
 		if self.liaison_head:
 			frappe.msgprint(_("Liaison Head '{0}' assignment will be removed").format(self.liaison_head), alert=True)
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class PartyUnitMap(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Party Unit Map", ["party_type", "party"])
+	frappe.db.add_index("Party Unit Map", ["unit_type", "unit", "party_type"])
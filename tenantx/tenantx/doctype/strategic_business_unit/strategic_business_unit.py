@@ -6,8 +6,16 @@ from frappe.model.document import Document
 from frappe import _
 import re
 
+from tenantx.tenantx.dependencies import check_dependencies
+from tenantx.tenantx.hierarchy import cascade_deactivation
+from tenantx.tenantx.perf.profiler import profile_hook
+from tenantx.tenantx.permission_queries import get_unit_conditions
+from tenantx.tenantx.scope_index import rebuild_scope_index_for_unit
+from tenantx.tenantx.perf.request_timing import VALIDATION, timed_area
+
 
 class StrategicBusinessUnit(Document):
+	@timed_area(VALIDATION)
 	def validate(self):
 		"""Validate SBU data before saving"""
 		self.validate_sbu_code()
@@ -20,7 +28,7 @@ class StrategicBusinessUnit(Document):
 		self.create_cost_center_if_needed()
 	
 	def validate_sbu_code(self):
-		"""Validate SBU code format and uniqueness"""
+		"""Validate SBU code format"""
 		if self.sbu_code:
 			# Check for alphanumeric format
 			if not re.match(r'^[A-Z0-9\-_]+$', self.sbu_code):
@@ -34,13 +42,7 @@ class StrategicBusinessUnit(Document):
 			if len(self.sbu_code) > 20:
 				frappe.throw(_("SBU Code cannot exceed 20 characters"))
 			
-			# Check for uniqueness
-			existing = frappe.db.exists("Strategic Business Unit", {
-				"sbu_code": self.sbu_code,
-				"name": ["!=", self.name]
-			})
-			if existing:
-				frappe.throw(_("SBU Code '{0}' already exists").format(self.sbu_code))
+			# Uniqueness is enforced by the unique index on sbu_code
 	
 	def validate_enterprise_association(self):
 		"""Validate enterprise association"""
@@ -110,6 +112,29 @@ class StrategicBusinessUnit(Document):
 			if self.company and parent.company and parent.company != self.company:
 				frappe.throw(_("Parent SBU must belong to the same company"))
 	
+	def on_update(self):
+		"""Actions after SBU is updated"""
+		self.update_scope_index()
+		self.cascade_deactivation()
+	
+	def cascade_deactivation(self):
+		"""Deactivate child SBUs, factories and liaison offices when the SBU is deactivated"""
+		if self.has_value_changed("is_active") and not self.is_active:
+			cascade_deactivation(self.doctype, self.name)
+	
+	def update_scope_index(self):
+		"""Refresh the scope of users granted this SBU when its cost center changes or it is (de)activated"""
+		if self.has_value_changed("cost_center") or self.has_value_changed("is_active"):
+			rebuild_scope_index_for_unit(self.doctype, self.name)
+	
+	def on_trash(self):
+		"""Actions before SBU is deleted"""
+		self.check_dependencies()
+	
+	def check_dependencies(self):
+		"""Check for dependencies before deletion"""
+		check_dependencies(self)
+	
 	def before_insert(self):
 		"""Actions before SBU is inserted"""
 		self.set_default_values()
@@ -140,21 +165,10 @@ class StrategicBusinessUnit(Document):
 				self.cost_center = cc.name
 
 
+@profile_hook("permission_query_conditions", "Strategic Business Unit")
 def get_permission_query_conditions(user):
 	"""
 	Permission query conditions for Strategic Business Unit
-	This function checks User Permission records for the logged-in user and returns SQL conditions
+	Users see the Strategic Business Units granted to them and every one below their granted units
 	"""
-	if not user:
-		user = frappe.session.user
-	
-	# System Manager sees everything
-	if "System Manager" in frappe.get_roles(user):
-		return ""
-	
-	# This line fetches all Strategic Business Units the user has been granted access to
-	# via the User Permissions doctype, which we automated in the previous step.
-	return """( `tabStrategic Business Unit`.`name` IN (
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user`=%(user)s AND `allow`='Strategic Business Unit'
-	))"""
+	return get_unit_conditions("Strategic Business Unit", user)
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class UnitCostCenterIndex(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Unit Cost Center Index", ["unit_type", "unit", "cost_center"])
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class UserScopeIndex(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("User Scope Index", ["user", "cost_center"])
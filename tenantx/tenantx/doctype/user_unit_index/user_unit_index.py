@@ -0,0 +1,13 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class UserUnitIndex(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("User Unit Index", ["user", "unit_type", "unit"])
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class WarehouseUnitMap(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Warehouse Unit Map", ["cost_center", "warehouse"])
+	frappe.db.add_index("Warehouse Unit Map", ["factory", "root_warehouse"])
@@ -0,0 +1,381 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Organization hierarchy index for TenantX
+Keeps an adjacency map of Enterprises, SBUs, Factory Business Units and Liaison Offices
+in Redis so subtree walks never touch the database, and cascades deactivation through
+whole subtrees with set-based updates
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint, create_batch, now
+
+from tenantx.tenantx.perf.profiler import note_cache_miss
+from tenantx.tenantx.perf.request_timing import HIERARCHY_EXPANSION, timed_area
+from tenantx.tenantx.scope_index import (
+	ORG_DOCTYPES,
+	enqueue_enterprise_scope_rebuild,
+	get_user_units,
+	inactive_units_read_only,
+	rebuild_scope_index,
+)
+
+HIERARCHY_CACHE_KEY = "tenantx_org_hierarchy"
+
+# Fields placing a unit, its cost center and whether it is active in the hierarchy
+HIERARCHY_FIELDS = ("parent_enterprise", "enterprise", "parent_sbu", "sbu", "factory", "cost_center", "is_active")
+
+# Link fields placing a unit below another, most specific first: child enterprises hang off
+# their parent enterprise, nested SBUs off their parent SBU and top-level ones off their
+# enterprise, factories off their SBU or enterprise, and liaison offices off the most
+# specific unit they are linked to
+PARENT_FIELDS = {
+	"Enterprise": (("parent_enterprise", "Enterprise"),),
+	"Strategic Business Unit": (("parent_sbu", "Strategic Business Unit"), ("enterprise", "Enterprise")),
+	"Factory Business Unit": (("sbu", "Strategic Business Unit"), ("enterprise", "Enterprise")),
+	"Liaison Office": (
+		("factory", "Factory Business Unit"),
+		("sbu", "Strategic Business Unit"),
+		("enterprise", "Enterprise"),
+	),
+}
+
+# Units whose subtree cost centers are materialized, the ones a session can make active
+SUBTREE_DOCTYPES = ("Enterprise", "Strategic Business Unit", "Factory Business Unit")
+
+# Subtrees with more units than this are deactivated in a background job
+DEFAULT_CASCADE_BACKGROUND_THRESHOLD = 500
+
+
+def get_hierarchy():
+	"""Get the cached organization hierarchy index"""
+	def generator():
+		note_cache_miss()
+		return build_hierarchy()
+
+	return frappe.cache().get_value(HIERARCHY_CACHE_KEY, generator=generator)
+
+
+def get_parent_node(doctype, unit):
+	"""Get the (doctype, name) node a unit hangs off, from its own link fields"""
+	for fieldname, parent_doctype in PARENT_FIELDS[doctype]:
+		if unit.get(fieldname):
+			return (parent_doctype, unit.get(fieldname))
+
+
+@timed_area(HIERARCHY_EXPANSION)
+def build_hierarchy():
+	"""
+	Build the organization hierarchy index
+	Returns the units of each doctype, maps of (doctype, name) to child nodes and to the parent
+	node, and a map of cost center to the Factory Business Unit holding it
+	"""
+	units = {
+		"Enterprise": frappe.db.sql("""
+			SELECT `name`, `enterprise_name` AS `title`, `parent_enterprise`, `cost_center`, `is_active`
+			FROM `tabEnterprise`
+		""", as_dict=True),
+		"Strategic Business Unit": frappe.db.sql("""
+			SELECT `name`, `sbu_name` AS `title`, `enterprise`, `parent_sbu`, `cost_center`, `is_active`
+			FROM `tabStrategic Business Unit`
+		""", as_dict=True),
+		"Factory Business Unit": frappe.db.sql("""
+			SELECT `name`, `factory_name` AS `title`, `enterprise`, `sbu`, `cost_center`, `is_active`
+			FROM `tabFactory Business Unit`
+		""", as_dict=True),
+		"Liaison Office": frappe.db.sql("""
+			SELECT `name`, `office_name` AS `title`, `enterprise`, `sbu`, `factory`, `is_active`
+			FROM `tabLiaison Office`
+		""", as_dict=True),
+	}
+
+	children, parents = {}, {}
+
+	def add_child(parent, child):
+		children.setdefault(parent, []).append(child)
+		parents[child] = parent
+
+	for doctype, rows in units.items():
+		for row in rows:
+			parent = get_parent_node(doctype, row)
+			if parent:
+				add_child(parent, (doctype, row.name))
+
+	return {
+		"units": {doctype: {row.name: row for row in rows} for doctype, rows in units.items()},
+		"children": children,
+		"parents": parents,
+		"factory_by_cost_center": {
+			row.cost_center: row.name for row in units["Factory Business Unit"] if row.cost_center
+		},
+	}
+
+
+@timed_area(HIERARCHY_EXPANSION)
+def get_descendants(doctype, name, hierarchy=None):
+	"""
+	Get every unit below the given node, grouped by doctype
+	The node itself is not included
+	"""
+	hierarchy = hierarchy or get_hierarchy()
+	children = hierarchy["children"]
+
+	descendants = {dt: set() for dt in ORG_DOCTYPES}
+	stack = list(children.get((doctype, name), []))
+	while stack:
+		node = stack.pop()
+		if node[1] in descendants[node[0]]:
+			continue
+		descendants[node[0]].add(node[1])
+		stack.extend(children.get(node, []))
+
+	return descendants
+
+
+def get_subtree_cost_centers(doctype, name, hierarchy=None, active_only=False):
+	"""
+	Get the cost centers of a unit and every unit below it
+	With `active_only`, inactive units and everything below them are skipped
+	"""
+	hierarchy = hierarchy or get_hierarchy()
+	units = hierarchy["units"]
+	if name not in units[doctype] or (active_only and not cint(units[doctype][name].get("is_active"))):
+		return []
+
+	cost_centers = {units[doctype][name].get("cost_center")}
+	if active_only:
+		stack = list(hierarchy["children"].get((doctype, name), []))
+		while stack:
+			node = stack.pop()
+			unit = units[node[0]].get(node[1])
+			if unit and cint(unit.get("is_active")):
+				cost_centers.add(unit.get("cost_center"))
+				stack.extend(hierarchy["children"].get(node, []))
+	else:
+		for descendant_doctype, names in get_descendants(doctype, name, hierarchy).items():
+			cost_centers.update(units[descendant_doctype][unit].get("cost_center") for unit in names)
+
+	cost_centers.discard(None)
+	cost_centers.discard("")
+	return sorted(cost_centers)
+
+
+def get_visible_units(user, hierarchy=None):
+	"""
+	Get the units a user may browse: their granted units and everything below them
+	Returns None when the user may browse the whole tree
+	"""
+	if "System Manager" in frappe.get_roles(user):
+		return None
+
+	return expand_units(get_user_units(user), hierarchy)
+
+
+def expand_units(units, hierarchy=None):
+	"""
+	Expand a dict of doctype to unit names with every unit below them
+	Inactive units and everything below them are skipped, unless the site keeps them read-only
+	"""
+	hierarchy = hierarchy or get_hierarchy()
+	children = hierarchy["children"]
+	is_visible = get_unit_visibility(hierarchy)
+
+	visible = {doctype: set() for doctype in ORG_DOCTYPES}
+	stack = [(doctype, name) for doctype, names in units.items() for name in names]
+	while stack:
+		node = stack.pop()
+		if node[1] in visible[node[0]] or not is_visible(node):
+			continue
+		visible[node[0]].add(node[1])
+		stack.extend(children.get(node, []))
+
+	return visible
+
+
+def filter_active_units(doctype, names, hierarchy=None):
+	"""Keep the units that still grant access, inactive ones only when the site keeps them read-only"""
+	is_visible = get_unit_visibility(hierarchy or get_hierarchy())
+	return [name for name in names if is_visible((doctype, name))]
+
+
+def get_unit_visibility(hierarchy):
+	"""Get a check of whether a (doctype, name) node exists and grants access"""
+	units = hierarchy["units"]
+	keep_inactive = inactive_units_read_only()
+
+	def is_visible(node):
+		unit = units[node[0]].get(node[1])
+		return unit is not None and (keep_inactive or bool(cint(unit.get("is_active"))))
+
+	return is_visible
+
+
+def get_factory_for_cost_center(cost_center, hierarchy=None):
+	"""Get the Factory Business Unit owning a cost center from the cached hierarchy"""
+	hierarchy = hierarchy or get_hierarchy()
+	return hierarchy["factory_by_cost_center"].get(cost_center)
+
+
+def rebuild_unit_cost_centers(units=None):
+	"""
+	Rebuild the Unit Cost Center Index rows of some (doctype, name) units, or of every unit
+	Each row pairs a unit that can be made active with a cost center of its subtree, so a
+	narrowed scope can be joined instead of inlined
+	"""
+	hierarchy = get_hierarchy()
+	if units is None:
+		frappe.db.delete("Unit Cost Center Index")
+		units = [(doctype, name) for doctype in SUBTREE_DOCTYPES for name in hierarchy["units"][doctype]]
+	else:
+		units = sorted({unit for unit in units if unit[0] in SUBTREE_DOCTYPES})
+		for doctype in SUBTREE_DOCTYPES:
+			names = [name for unit_doctype, name in units if unit_doctype == doctype]
+			if names:
+				frappe.db.delete("Unit Cost Center Index", {"unit_type": doctype, "unit": ["in", names]})
+
+	values = [
+		(frappe.generate_hash(length=10), doctype, name, cost_center)
+		for doctype, name in units
+		for cost_center in get_subtree_cost_centers(doctype, name, hierarchy)
+	]
+	for batch in create_batch(values, 10000):
+		frappe.db.bulk_insert("Unit Cost Center Index", ["name", "unit_type", "unit", "cost_center"], batch)
+
+
+def clear_hierarchy_cache(doc=None, method=None):
+	"""Drop the cached hierarchy index, used as a doc event on every org unit"""
+	frappe.cache().delete_value(HIERARCHY_CACHE_KEY)
+
+	if doc and (method == "on_trash" or has_hierarchy_changed(doc)):
+		# The unit's old and new places in the tree, the rebuild walks up from both
+		units = [(doc.doctype, doc.name), get_parent_node(doc.doctype, doc)]
+		before_save = doc.get_doc_before_save()
+		if before_save:
+			units.append(get_parent_node(doc.doctype, before_save))
+		enqueue_enterprise_scope_rebuild(units)
+
+
+def has_hierarchy_changed(doc):
+	"""Whether a save added, moved, deactivated or reactivated a unit, or changed its cost center"""
+	if not doc.get_doc_before_save():
+		return True
+
+	return any(doc.has_value_changed(fieldname) for fieldname in HIERARCHY_FIELDS)
+
+
+def get_cascade_background_threshold():
+	"""Get the subtree size above which deactivation runs in a background job"""
+	return cint(frappe.conf.get("tenantx_cascade_background_threshold")) or DEFAULT_CASCADE_BACKGROUND_THRESHOLD
+
+
+def cascade_deactivation(doctype, name):
+	"""
+	Deactivate every active unit below the given node
+	Large subtrees are handed to a background job
+	"""
+	# Walk a freshly built hierarchy, the cached one may predate this save
+	descendants = get_descendants(doctype, name, build_hierarchy())
+	size = sum(len(names) for names in descendants.values())
+	if not size:
+		return
+
+	if size > get_cascade_background_threshold():
+		frappe.enqueue(
+			"tenantx.tenantx.hierarchy.deactivate_subtree",
+			queue="long",
+			enqueue_after_commit=True,
+			doctype=doctype,
+			name=name,
+			notify_user=frappe.session.user,
+		)
+		frappe.msgprint(
+			_("{0} units below {1} '{2}' will be deactivated in the background").format(size, _(doctype), name)
+		)
+		return
+
+	deactivate_subtree(doctype, name, descendants=descendants)
+
+
+def deactivate_subtree(doctype, name, descendants=None, notify_user=None):
+	"""
+	Deactivate all active units below the given node with one UPDATE per doctype and batch,
+	then refresh the scope of every affected user in a single pass
+	"""
+	if descendants is None:
+		descendants = get_descendants(doctype, name, build_hierarchy())
+
+	timestamp = now()
+	deactivated = {}
+	for unit_doctype, names in descendants.items():
+		if not names:
+			continue
+
+		for batch in create_batch(sorted(names), 1000):
+			active = frappe.db.sql_list(f"""
+				SELECT `name` FROM `tab{unit_doctype}`
+				WHERE `name` IN %(names)s AND `is_active` = 1
+			""", {"names": tuple(batch)})
+			if not active:
+				continue
+
+			frappe.db.sql(f"""
+				UPDATE `tab{unit_doctype}`
+				SET `is_active` = 0, `modified` = %(modified)s, `modified_by` = %(modified_by)s
+				WHERE `name` IN %(names)s
+			""", {"names": tuple(active), "modified": timestamp, "modified_by": frappe.session.user})
+			deactivated.setdefault(unit_doctype, []).extend(active)
+
+	if not deactivated:
+		return deactivated
+
+	clear_hierarchy_cache()
+	rebuild_scope_index(get_users_with_access(deactivated))
+	enqueue_enterprise_scope_rebuild([(doctype, name)])
+
+	message = get_deactivation_summary(doctype, name, deactivated)
+	if notify_user:
+		frappe.publish_realtime("msgprint", message, user=notify_user)
+	else:
+		frappe.msgprint(message)
+
+	return deactivated
+
+
+def get_ancestor_nodes(units, hierarchy=None):
+	"""Get some (doctype, name) nodes with every node above them"""
+	hierarchy = hierarchy or get_hierarchy()
+	parents = hierarchy["parents"]
+
+	nodes = set()
+	for node in units:
+		while node and node not in nodes:
+			nodes.add(node)
+			node = parents.get(node)
+	return nodes
+
+
+def get_users_with_access(units):
+	"""Get the users holding a User Permission on any of the given units in one query"""
+	conditions = []
+	values = {}
+	for index, (doctype, names) in enumerate(units.items()):
+		conditions.append(f"(`allow` = %(doctype_{index})s AND `for_value` IN %(names_{index})s)")
+		values[f"doctype_{index}"] = doctype
+		values[f"names_{index}"] = tuple(names)
+
+	return frappe.db.sql_list(f"""
+		SELECT DISTINCT `user` FROM `tabUser Permission`
+		WHERE {" OR ".join(conditions)}
+	""", values)
+
+
+def get_deactivation_summary(doctype, name, deactivated):
+	"""Build one message summarizing a cascaded deactivation"""
+	counts = ", ".join(
+		_("{0} {1}(s)").format(len(deactivated[unit_doctype]), _(unit_doctype))
+		for unit_doctype in ORG_DOCTYPES
+		if deactivated.get(unit_doctype)
+	)
+	return _("Deactivating {0} '{1}' also deactivated {2}").format(_(doctype), name, counts)
@@ -0,0 +1,81 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Scope-aware link search for TenantX org units
+Registered as the standard query of Enterprise, SBU, Factory Business Unit and Liaison
+Office, so every Link field to them (including Dynamic Links and the Supplier/Customer
+custom fields) searches only the units in the user's cached scope by name or code prefix
+"""
+
+import json
+
+import frappe
+from frappe.desk.reportview import get_filters_cond
+
+from tenantx.tenantx.scope_index import get_unit_index_match
+
+LINK_SEARCH_CACHE_KEY = "tenantx_link_search"
+
+# Seconds a search result stays cached per user, doctype and prefix
+LINK_SEARCH_CACHE_TTL = 30
+
+# Code and title field searched by prefix for each unit doctype
+SEARCH_FIELDS = {
+	"Enterprise": ("enterprise_code", "enterprise_name"),
+	"Strategic Business Unit": ("sbu_code", "sbu_name"),
+	"Factory Business Unit": ("factory_code", "factory_name"),
+	"Liaison Office": ("office_code", "office_name"),
+}
+
+
+@frappe.whitelist()
+@frappe.validate_and_sanitize_search_inputs
+def search_units(doctype, txt, searchfield, start, page_len, filters):
+	"""Search org units within the user's scope, cached briefly per user and prefix"""
+	user = frappe.session.user
+	key = "|".join([
+		LINK_SEARCH_CACHE_KEY,
+		doctype,
+		user,
+		txt or "",
+		json.dumps(filters, sort_keys=True, default=str),
+		str(start),
+		str(page_len),
+	])
+
+	results = frappe.cache().get_value(key)
+	if results is None:
+		results = get_unit_search_results(doctype, txt, start, page_len, filters, user)
+		frappe.cache().set_value(key, results, expires_in_sec=LINK_SEARCH_CACHE_TTL)
+
+	return results
+
+
+def get_unit_search_results(doctype, txt, start, page_len, filters, user):
+	"""
+	Match units whose name, code or title starts with the typed text
+	Non-System Managers only search the active units granted to them and beneath them, the same
+	subtree the org tree and party permissions use. System Managers also find inactive units
+	"""
+	code_field, title_field = SEARCH_FIELDS[doctype]
+	conditions = ["1=1"]
+	values = {"txt": f"{txt}%", "start": int(start), "page_len": int(page_len)}
+
+	# Joined against the materialized visible units, so a keystroke never expands the subtree
+	if "System Manager" not in frappe.get_roles(user):
+		conditions.append("`is_active` = 1")
+		conditions.append(f"`name` IN {get_unit_index_match(user, doctype)}")
+
+	if txt:
+		conditions.append(
+			f"(`name` LIKE %(txt)s OR `{code_field}` LIKE %(txt)s OR `{title_field}` LIKE %(txt)s)"
+		)
+
+	return frappe.db.sql(f"""
+		SELECT `name`, `{title_field}`, `{code_field}`
+		FROM `tab{doctype}`
+		WHERE {" AND ".join(conditions)} {get_filters_cond(doctype, filters, [])}
+		ORDER BY `{code_field}`
+		LIMIT %(start)s, %(page_len)s
+	""", values)
@@ -0,0 +1,95 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Lazy org tree for the desk
+Serves one page of children at a time from the cached hierarchy index, limited to the
+units in the caller's scope, for the TenantX Org Tree page
+"""
+
+import frappe
+from frappe.utils import cint
+
+from tenantx.tenantx.hierarchy import get_hierarchy, get_visible_units
+from tenantx.tenantx.scope_index import ORG_DOCTYPES
+
+DEFAULT_PAGE_LENGTH = 100
+
+# Node values are "<doctype>|<name>", pages after the first are "more|<doctype>|<name>|<start>"
+SEPARATOR = "|"
+MORE = "more"
+ROOT = ""
+
+
+@frappe.whitelist()
+def get_children(parent=None, is_root=False, page_length=DEFAULT_PAGE_LENGTH, **kwargs):
+	"""
+	Get one page of child nodes of a tree node
+	Returns frappe.ui.Tree nodes with child counts and active flags
+	"""
+	hierarchy = get_hierarchy()
+	visible = get_visible_units(frappe.session.user, hierarchy)
+	page_length = cint(page_length) or DEFAULT_PAGE_LENGTH
+
+	start = 0
+	if parent and parent.startswith(MORE + SEPARATOR):
+		_more, doctype, name, start = parent.split(SEPARATOR, 3)
+		parent, start = SEPARATOR.join([doctype, name]) if doctype else ROOT, cint(start)
+
+	if cint(is_root) or not parent:
+		nodes = get_root_nodes(hierarchy, visible)
+	else:
+		doctype, name = parent.split(SEPARATOR, 1)
+		nodes = hierarchy["children"].get((doctype, name), [])
+
+	nodes = [node for node in nodes if is_visible(node, visible)]
+	nodes.sort(key=lambda node: (ORG_DOCTYPES.index(node[0]), get_title(hierarchy, node)))
+
+	page = [get_tree_node(hierarchy, visible, node) for node in nodes[start:start + page_length]]
+	if len(nodes) > start + page_length:
+		page.append({
+			"value": SEPARATOR.join([MORE, *(parent.split(SEPARATOR, 1) if parent else ["", ""]), str(start + page_length)]),
+			"title": frappe._("{0} more").format(len(nodes) - start - page_length),
+			"expandable": 1,
+			"is_more": 1,
+		})
+
+	return page
+
+
+def is_visible(node, visible):
+	return visible is None or node[1] in visible[node[0]]
+
+
+def get_root_nodes(hierarchy, visible):
+	"""Nodes without a visible parent: the top of the org, or the top of the user's scope"""
+	parents = hierarchy["parents"]
+	return [
+		(doctype, name)
+		for doctype in ORG_DOCTYPES
+		for name in hierarchy["units"][doctype]
+		if is_visible((doctype, name), visible)
+		and not ((doctype, name) in parents and is_visible(parents[(doctype, name)], visible))
+	]
+
+
+def get_title(hierarchy, node):
+	unit = hierarchy["units"][node[0]].get(node[1])
+	return (unit and unit.title) or node[1]
+
+
+def get_tree_node(hierarchy, visible, node):
+	"""Build a frappe.ui.Tree node for an org unit"""
+	doctype, name = node
+	unit = hierarchy["units"][doctype].get(name) or {}
+	child_count = len([child for child in hierarchy["children"].get(node, []) if is_visible(child, visible)])
+
+	return {
+		"value": SEPARATOR.join(node),
+		"title": get_title(hierarchy, node),
+		"doctype": doctype,
+		"name": name,
+		"is_active": cint(unit.get("is_active")),
+		"child_count": child_count,
+		"expandable": 1 if child_count else 0,
+	}
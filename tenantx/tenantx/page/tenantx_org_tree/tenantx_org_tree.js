@@ -0,0 +1,44 @@
+frappe.pages["tenantx-org-tree"].on_page_load = function(wrapper) {
+	const page = frappe.ui.make_app_page({
+		parent: wrapper,
+		title: __("TenantX Org Tree"),
+		single_column: true,
+	});
+
+	const make_tree = () => {
+		page.main.empty();
+		page.tree = new frappe.ui.Tree({
+			parent: page.main,
+			label: __("Organization"),
+			root_value: "",
+			expandable: true,
+			method: "tenantx.tenantx.org_tree.get_children",
+			args: {},
+			get_label: (node) => {
+				const data = node.data || {};
+				if (node.is_root || data.is_more) {
+					return frappe.utils.escape_html(node.label || data.title);
+				}
+				let label = `${frappe.utils.escape_html(data.title)}
+					<span class="text-muted small">${__(data.doctype)}</span>`;
+				if (data.child_count) {
+					label += ` <span class="badge">${data.child_count}</span>`;
+				}
+				if (!data.is_active) {
+					label += ` <span class="indicator-pill gray">${__("Inactive")}</span>`;
+				}
+				return label;
+			},
+			toolbar: [
+				{
+					label: __("Open"),
+					condition: (node) => !node.is_root && node.data && node.data.doctype,
+					click: (node) => frappe.set_route("Form", node.data.doctype, node.data.name),
+				},
+			],
+		});
+	};
+
+	page.set_primary_action(__("Refresh"), make_tree, "refresh");
+	make_tree();
+};
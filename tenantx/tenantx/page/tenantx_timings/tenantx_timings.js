@@ -0,0 +1,66 @@
+frappe.pages["tenantx-timings"].on_page_load = function(wrapper) {
+	const page = frappe.ui.make_app_page({
+		parent: wrapper,
+		title: __("TenantX Timings"),
+		single_column: true,
+	});
+
+	const $body = $(`<div class="tenantx-timings"></div>`).appendTo(page.main);
+
+	const ms = (value) => `${flt(value, 1)} ms`;
+
+	const table = (columns, rows) => {
+		if (!rows.length) {
+			return `<p class="text-muted">${__("No data yet")}</p>`;
+		}
+		return `<table class="table table-bordered table-condensed">
+			<thead><tr>${columns.map((column) => `<th>${column.label}</th>`).join("")}</tr></thead>
+			<tbody>${rows.map((row) => `<tr>${columns.map((column) =>
+				`<td>${frappe.utils.escape_html(String(column.format ? column.format(row[column.field], row) : row[column.field] ?? ""))}</td>`
+			).join("")}</tr>`).join("")}</tbody>
+		</table>`;
+	};
+
+	const refresh = () => {
+		frappe.call("tenantx.tenantx.perf.request_timing.get_timing_summary").then((r) => {
+			const summary = r.message;
+			$body.html(`
+				<p class="text-muted">${__("{0} requests and jobs in the ring buffer", [summary.entries])}</p>
+				<h5>${__("Time per TenantX area")}</h5>
+				${table([
+					{ field: "area", label: __("Area"), format: (value) => frappe.unscrub(value) },
+					{ field: "count", label: __("Requests") },
+					{ field: "avg_ms", label: __("Average"), format: ms },
+					{ field: "p95_ms", label: __("P95"), format: ms },
+					{ field: "max_ms", label: __("Max"), format: ms },
+					{ field: "total_ms", label: __("Total"), format: ms },
+				], summary.areas)}
+				<h5>${__("Paths spending most time in TenantX")}</h5>
+				${table([
+					{ field: "kind", label: __("Kind") },
+					{ field: "path", label: __("Path") },
+					{ field: "count", label: __("Count") },
+					{ field: "tenantx_ms", label: __("TenantX Time"), format: ms },
+					{ field: "share", label: __("Share"), format: (value) => `${flt(value, 1)}%` },
+				], summary.paths)}
+				<h5>${__("Latest")}</h5>
+				${table([
+					{ field: "timestamp", label: __("Time") },
+					{ field: "kind", label: __("Kind") },
+					{ field: "path", label: __("Path") },
+					{ field: "user", label: __("User") },
+					{ field: "total_ms", label: __("Total"), format: ms },
+					{ field: "areas", label: __("TenantX Areas"), format: (value) =>
+						Object.entries(value).map(([area, time]) => `${frappe.unscrub(area)}: ${ms(time)}`).join(", ") },
+				], summary.latest)}
+			`);
+		});
+	};
+
+	page.set_primary_action(__("Refresh"), refresh, "refresh");
+	page.add_menu_item(__("Clear"), () => {
+		frappe.call("tenantx.tenantx.perf.request_timing.clear_timings").then(refresh);
+	});
+
+	refresh();
+};
@@ -0,0 +1,172 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Party to unit map for TenantX
+Flattens the SBU Access, Factory Access and Factory Association tables of Suppliers and
+Customers, the Liaison Office of Customers and the Customer Details table of Factory
+Business Units into the indexed Party Unit Map table. Supplier and Customer permission
+conditions join against it instead of reading the child tables, selling documents look up
+a customer's factories and Liaison Offices their customers in it
+"""
+
+import frappe
+from frappe.utils import cint, create_batch
+
+from tenantx.tenantx.approved_suppliers import clear_approved_supplier_cache
+
+PARTY_DOCTYPES = ("Supplier", "Customer")
+
+# Party child tables feeding the map: (parentfield, child doctype, unit doctype, unit field)
+PARTY_UNIT_SOURCES = (
+	("custom_sbu_access", "SBU Access", "Strategic Business Unit", "sbu"),
+	("custom_factory_access", "Factory Access", "Factory Business Unit", "factory"),
+	("custom_factory_association", "Factory Association", "Factory Business Unit", "factory"),
+)
+
+# Sources maintained from the party's own access tables, the only rows that restrict who sees a party
+PARTY_ACCESS_SOURCES = tuple(source for _f, source, _u, _uf in PARTY_UNIT_SOURCES)
+
+# Link fields on the party itself feeding the map: (party doctype, fieldname, unit doctype),
+# their rows use the party doctype as source. They let the linked unit's users see the party
+# but never hide it from anyone else
+PARTY_UNIT_LINKS = (
+	("Customer", "custom_liaison_office", "Liaison Office"),
+)
+
+PARTY_LINK_SOURCES = tuple(sorted({party_type for party_type, _f, _u in PARTY_UNIT_LINKS}))
+
+# Customers listed on a Factory Business Unit, maintained from the factory's side
+FACTORY_CUSTOMER_SOURCE = "Customer Details"
+
+PARTY_UNIT_FIELDS = [
+	"name",
+	"party_type",
+	"party",
+	"unit_type",
+	"unit",
+	"source",
+	"access_type",
+	"is_primary",
+	"is_approved",
+]
+
+
+def on_party_update(doc, method=None):
+	"""Rebuild the map rows of a Supplier or Customer from its access tables"""
+	rows = []
+	for parentfield, source, unit_type, unit_field in PARTY_UNIT_SOURCES:
+		for row in doc.get(parentfield) or []:
+			if row.get(unit_field):
+				rows.append(get_map_row(doc.doctype, doc.name, unit_type, row.get(unit_field), source, row))
+
+	sources = list(PARTY_ACCESS_SOURCES)
+	for party_type, fieldname, unit_type in PARTY_UNIT_LINKS:
+		if party_type == doc.doctype:
+			sources.append(party_type)
+			if doc.get(fieldname):
+				rows.append(get_map_row(doc.doctype, doc.name, unit_type, doc.get(fieldname), party_type))
+
+	replace_party_rows(doc.doctype, [doc.name], rows, sources)
+
+
+def on_party_trash(doc, method=None):
+	"""Drop every map row of a deleted party"""
+	frappe.db.delete("Party Unit Map", {"party_type": doc.doctype, "party": doc.name})
+
+
+def get_map_row(party_type, party, unit_type, unit, source, row=None):
+	"""Build a Party Unit Map row in PARTY_UNIT_FIELDS order"""
+	row = row or {}
+	return (
+		frappe.generate_hash(length=10),
+		party_type,
+		party,
+		unit_type,
+		unit,
+		source,
+		row.get("access_type"),
+		cint(row.get("is_primary")),
+		# Only Factory Association rows need approval, access rows are approved by definition
+		cint(row.get("is_approved", 1)),
+	)
+
+
+def replace_party_rows(party_type, parties, rows, sources):
+	"""Replace the map rows of some parties from some sources with one delete and one insert"""
+	frappe.db.delete("Party Unit Map", {
+		"party_type": party_type,
+		"party": ["in", parties],
+		"source": ["in", sources],
+	})
+	if rows:
+		frappe.db.bulk_insert("Party Unit Map", PARTY_UNIT_FIELDS, rows)
+
+
+def on_factory_update(doc, method=None):
+	"""Rebuild the customer rows of a Factory Business Unit from its Customer Details"""
+	customers = {row.customer for row in doc.get("customer_details") or [] if row.customer}
+	replace_unit_rows(doc.doctype, doc.name, [
+		get_map_row("Customer", customer, doc.doctype, doc.name, FACTORY_CUSTOMER_SOURCE)
+		for customer in sorted(customers)
+	], FACTORY_CUSTOMER_SOURCE)
+
+
+def on_factory_trash(doc, method=None):
+	"""Drop the customer rows of a deleted Factory Business Unit"""
+	replace_unit_rows(doc.doctype, doc.name, [], FACTORY_CUSTOMER_SOURCE)
+
+
+def replace_unit_rows(unit_type, unit, rows, source):
+	"""Replace the map rows a unit maintains from one of its own tables"""
+	frappe.db.delete("Party Unit Map", {"unit_type": unit_type, "unit": unit, "source": source})
+	if rows:
+		frappe.db.bulk_insert("Party Unit Map", PARTY_UNIT_FIELDS, rows)
+
+
+def rebuild_all_party_unit_maps():
+	"""Rebuild the map for every Supplier, Customer and Factory Business Unit straight from the child tables"""
+	sources = [*PARTY_ACCESS_SOURCES, FACTORY_CUSTOMER_SOURCE]
+	sources += [party_type for party_type, _f, _u in PARTY_UNIT_LINKS]
+	frappe.db.delete("Party Unit Map", {"source": ["in", sources]})
+
+	for parentfield, source, unit_type, unit_field in PARTY_UNIT_SOURCES:
+		extra_fields = {
+			"access_type": "`access_type`",
+			"is_primary": "`is_primary`" if source != "Factory Association" else "0",
+			"is_approved": "`is_approved`" if source == "Factory Association" else "1",
+		}
+		rows = frappe.db.sql(f"""
+			SELECT `parenttype`, `parent`, `{unit_field}`,
+				{", ".join(f"{column} AS `{alias}`" for alias, column in extra_fields.items())}
+			FROM `tab{source}`
+			WHERE `parentfield` = %(parentfield)s AND `parenttype` IN %(party_doctypes)s
+				AND IFNULL(`{unit_field}`, '') != ''
+		""", {"parentfield": parentfield, "party_doctypes": PARTY_DOCTYPES}, as_dict=True)
+
+		for batch in create_batch(rows, 10000):
+			frappe.db.bulk_insert("Party Unit Map", PARTY_UNIT_FIELDS, [
+				get_map_row(row.parenttype, row.parent, unit_type, row[unit_field], source, row)
+				for row in batch
+			])
+
+	for party_type, fieldname, unit_type in PARTY_UNIT_LINKS:
+		parties = frappe.get_all(party_type, filters={fieldname: ["is", "set"]}, fields=["name", fieldname])
+		for batch in create_batch(parties, 10000):
+			frappe.db.bulk_insert("Party Unit Map", PARTY_UNIT_FIELDS, [
+				get_map_row(party_type, party.name, unit_type, party.get(fieldname), party_type)
+				for party in batch
+			])
+
+	customers = frappe.db.sql("""
+		SELECT DISTINCT `parent`, `customer`
+		FROM `tabCustomer Details`
+		WHERE `parenttype` = 'Factory Business Unit' AND IFNULL(`customer`, '') != ''
+	""", as_dict=True)
+	for batch in create_batch(customers, 10000):
+		frappe.db.bulk_insert("Party Unit Map", PARTY_UNIT_FIELDS, [
+			get_map_row("Customer", row.customer, "Factory Business Unit", row.parent, FACTORY_CUSTOMER_SOURCE)
+			for row in batch
+		])
+
+	clear_approved_supplier_cache()
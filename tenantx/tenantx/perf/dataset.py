@@ -0,0 +1,376 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Synthetic large-tenant dataset for TenantX scale testing
+Generates a parameterized org model, users with a mix of scope shapes and transactions
+across the scoped doctypes using bulk inserts, so benchmarks and regression checks can
+run against realistic volumes on a local MariaDB
+"""
+
+import random
+
+import frappe
+from frappe.utils import add_days, now, nowdate
+from frappe.utils.nestedset import rebuild_tree
+
+from tenantx.tenantx.hierarchy import clear_hierarchy_cache
+from tenantx.tenantx.permission_queries import SCOPED_TRANSACTION_DOCTYPES
+from tenantx.tenantx.scope_index import clear_scope_cache, rebuild_scope_index
+
+DEFAULT_PREFIX = "GEN"
+
+# Scope shapes handed out round-robin to generated users, with the role each one gets
+SCOPE_SHAPES = {
+	"factory": "Factory User",
+	"sbu": "SBU Head",
+	"enterprise": "Enterprise Admin",
+	"cost_centers": "Factory User",
+}
+
+# Date columns filled on each generated transaction header
+TRANSACTION_DATE_FIELDS = {
+	"Purchase Order": ("transaction_date", "schedule_date"),
+	"Sales Invoice": ("posting_date",),
+	"Purchase Invoice": ("posting_date",),
+	"Sales Order": ("transaction_date", "delivery_date"),
+	"Delivery Note": ("posting_date",),
+	"Purchase Receipt": ("posting_date",),
+	"Journal Entry": ("posting_date",),
+}
+
+# Short codes used in generated transaction names
+TRANSACTION_CODES = {
+	"Purchase Order": "PO",
+	"Sales Invoice": "SI",
+	"Purchase Invoice": "PI",
+	"Sales Order": "SO",
+	"Delivery Note": "DN",
+	"Purchase Receipt": "PR",
+	"Journal Entry": "JV",
+}
+
+
+class DatasetGenerator:
+	"""
+	Bulk generator for a synthetic TenantX tenant
+	Every generated record is named with `prefix` so the dataset can be purged again
+	"""
+
+	def __init__(
+		self,
+		company,
+		enterprises=2,
+		sbus_per_enterprise=3,
+		sbu_depth=1,
+		sbu_fanout=2,
+		factories=10,
+		extra_cost_centers=0,
+		users=20,
+		cost_center_scope_size=1000,
+		transactions=1000,
+		prefix=DEFAULT_PREFIX,
+		seed=42,
+	):
+		self.company = company
+		self.abbr = frappe.db.get_value("Company", company, "abbr")
+		self.enterprises = enterprises
+		self.sbus_per_enterprise = sbus_per_enterprise
+		self.sbu_depth = max(sbu_depth, 1)
+		self.sbu_fanout = sbu_fanout
+		self.factories = factories
+		self.extra_cost_centers = extra_cost_centers
+		self.users = users
+		self.cost_center_scope_size = cost_center_scope_size
+		self.transactions = transactions
+		self.prefix = prefix.upper()
+		self.random = random.Random(seed)
+		self.timestamp = now()
+
+		self.cost_centers = []
+		self.enterprise_names = []
+		self.sbu_names = []
+		self.leaf_sbus = []
+		self.factory_names = []
+		self.user_names = []
+
+	def generate(self):
+		"""Generate the full dataset and rebuild derived indexes once at the end"""
+		print(f"Generating TenantX dataset '{self.prefix}' for {self.company}...")
+
+		self.create_org_model()
+		print(f"✓ {len(self.enterprise_names)} enterprises, {len(self.sbu_names)} SBUs, "
+			f"{len(self.factory_names)} factories, {len(self.cost_centers)} cost centers")
+
+		self.create_users()
+		print(f"✓ {len(self.user_names)} users")
+
+		self.create_transactions()
+		print(f"✓ {self.transactions} transactions")
+
+		clear_hierarchy_cache()
+		rebuild_scope_index(self.user_names)
+		print("✓ Scope index rebuilt")
+
+	def create_org_model(self):
+		"""Create enterprises, nested SBUs, factories and one cost center per unit"""
+		root_cost_center = frappe.db.get_value(
+			"Cost Center", {"company": self.company, "is_group": 1, "parent_cost_center": ["in", ["", None]]}
+		)
+
+		enterprises, sbus, factories = [], [], []
+
+		for e in range(1, self.enterprises + 1):
+			name = f"{self.prefix}-ENT-{e:05d}"
+			enterprises.append({
+				"name": name,
+				"enterprise_name": name,
+				"enterprise_code": name,
+				"company": self.company,
+				"is_group": 1,
+				"is_active": 1,
+				"cost_center": self.add_cost_center(name, root_cost_center),
+			})
+
+			# Top-level SBUs, then `sbu_fanout` children per SBU down to `sbu_depth`
+			level = [None] * self.sbus_per_enterprise
+			for depth in range(1, self.sbu_depth + 1):
+				next_level = []
+				for parent_sbu in level:
+					children = 1 if depth == 1 else self.sbu_fanout
+					for _child in range(children):
+						sbu_name = f"{self.prefix}-SBU-{len(sbus) + 1:06d}"
+						sbus.append({
+							"name": sbu_name,
+							"sbu_name": sbu_name,
+							"sbu_code": sbu_name,
+							"company": self.company,
+							"enterprise": name,
+							"parent_sbu": parent_sbu,
+							"is_active": 1,
+							"cost_center": self.add_cost_center(sbu_name, root_cost_center),
+						})
+						next_level.append(sbu_name)
+				level = next_level
+			self.leaf_sbus.extend(level)
+
+		# Factories are spread round-robin over the leaf SBUs
+		enterprise_of = {sbu["name"]: sbu["enterprise"] for sbu in sbus}
+		for f in range(1, self.factories + 1):
+			name = f"{self.prefix}-FBU-{f:06d}"
+			sbu = self.leaf_sbus[(f - 1) % len(self.leaf_sbus)] if self.leaf_sbus else None
+			factories.append({
+				"name": name,
+				"factory_name": name,
+				"factory_code": name,
+				"company": self.company,
+				"enterprise": enterprise_of.get(sbu),
+				"sbu": sbu,
+				"is_active": 1,
+				"cost_center": self.add_cost_center(name, root_cost_center),
+			})
+
+		for c in range(1, self.extra_cost_centers + 1):
+			self.add_cost_center(f"{self.prefix}-CC-{c:06d}", root_cost_center)
+
+		self.bulk_insert("Cost Center", self.cost_centers)
+		rebuild_tree("Cost Center")
+
+		self.bulk_insert("Enterprise", enterprises)
+		self.bulk_insert("Strategic Business Unit", sbus)
+		self.bulk_insert("Factory Business Unit", factories)
+
+		self.enterprise_names = [row["name"] for row in enterprises]
+		self.sbu_names = [row["name"] for row in sbus]
+		self.factory_names = [row["name"] for row in factories]
+
+	def add_cost_center(self, cost_center_name, parent_cost_center):
+		"""Queue a leaf cost center for bulk insert and return its name"""
+		name = f"{cost_center_name} - {self.abbr}"
+		self.cost_centers.append({
+			"name": name,
+			"cost_center_name": cost_center_name,
+			"company": self.company,
+			"parent_cost_center": parent_cost_center,
+			"is_group": 0,
+		})
+		return name
+
+	def create_users(self):
+		"""Create users with roles, access scope rows and User Permissions for each scope shape"""
+		users, roles, scopes, permissions = [], [], [], []
+		shapes = list(SCOPE_SHAPES)
+		all_cost_centers = [row["name"] for row in self.cost_centers]
+
+		for u in range(1, self.users + 1):
+			shape = shapes[(u - 1) % len(shapes)]
+			email = get_dataset_user_email(self.prefix, shape, u)
+			users.append({
+				"name": email,
+				"email": email,
+				"first_name": f"{self.prefix} {shape} {u}",
+				"enabled": 1,
+				"user_type": "System User",
+				"send_welcome_email": 0,
+			})
+			roles.append(self.child_row(email, "User", "roles", 1, {"role": SCOPE_SHAPES[shape]}))
+			self.user_names.append(email)
+
+			if shape == "cost_centers":
+				granted = self.random.sample(all_cost_centers, min(self.cost_center_scope_size, len(all_cost_centers)))
+				for cost_center in granted:
+					permissions.append(self.user_permission(email, "Cost Center", cost_center))
+			else:
+				scope_type, pool = {
+					"factory": ("Factory Business Unit", self.factory_names),
+					"sbu": ("Strategic Business Unit", self.sbu_names),
+					"enterprise": ("Enterprise", self.enterprise_names),
+				}[shape]
+				if not pool:
+					continue
+
+				scope_name = self.random.choice(pool)
+				scopes.append(self.child_row(email, "User", "user_access_scope", 1, {
+					"scope_type": scope_type,
+					"scope_name": scope_name,
+					"read": 1,
+					"write": 1,
+				}))
+				permissions.append(self.user_permission(email, scope_type, scope_name))
+
+		self.bulk_insert("User", users)
+		self.bulk_insert("Has Role", roles)
+		self.bulk_insert("User Access Scope", scopes)
+		self.bulk_insert("User Permission", permissions)
+
+	def user_permission(self, user, allow, for_value):
+		"""Build a User Permission row"""
+		return {
+			"name": frappe.generate_hash(length=10),
+			"user": user,
+			"allow": allow,
+			"for_value": for_value,
+			"apply_to_all_doctypes": 1,
+			"is_default": 0,
+		}
+
+	def create_transactions(self):
+		"""Spread `transactions` headers round-robin over the scoped doctypes"""
+		factory_cost_centers = [row["name"] for row in self.cost_centers if "-FBU-" in row["name"]]
+		cost_centers = factory_cost_centers or [row["name"] for row in self.cost_centers]
+		if not cost_centers:
+			return
+
+		headers = {doctype: [] for doctype in SCOPED_TRANSACTION_DOCTYPES}
+		journal_accounts = []
+		today = nowdate()
+
+		for t in range(1, self.transactions + 1):
+			doctype = SCOPED_TRANSACTION_DOCTYPES[(t - 1) % len(SCOPED_TRANSACTION_DOCTYPES)]
+			name = f"{self.prefix}-{TRANSACTION_CODES[doctype]}-{t:08d}"
+			cost_center = self.random.choice(cost_centers)
+			row = {
+				"name": name,
+				"company": self.company,
+				"docstatus": self.random.choice((0, 1)),
+			}
+			date = add_days(today, -self.random.randint(0, 365))
+			for fieldname in TRANSACTION_DATE_FIELDS[doctype]:
+				row[fieldname] = date
+
+			if doctype == "Journal Entry":
+				row["voucher_type"] = "Journal Entry"
+				# Balanced pair of lines, the second one usually in another unit
+				for idx, line_cost_center in enumerate((cost_center, self.random.choice(cost_centers)), 1):
+					journal_accounts.append(self.child_row(name, doctype, "accounts", idx, {
+						"cost_center": line_cost_center,
+					}))
+			else:
+				row["cost_center"] = cost_center
+
+			headers[doctype].append(row)
+
+		for doctype, rows in headers.items():
+			self.bulk_insert(doctype, rows)
+		self.bulk_insert("Journal Entry Account", journal_accounts)
+
+	def child_row(self, parent, parenttype, parentfield, idx, values):
+		"""Build a child table row"""
+		return {
+			"name": frappe.generate_hash(length=10),
+			"parent": parent,
+			"parenttype": parenttype,
+			"parentfield": parentfield,
+			"idx": idx,
+			**values,
+		}
+
+	def bulk_insert(self, doctype, rows):
+		"""Insert rows with standard columns filled in, in chunks"""
+		if not rows:
+			return
+
+		fields = [*rows[0], "creation", "modified", "owner", "modified_by"]
+		standard = (self.timestamp, self.timestamp, "Administrator", "Administrator")
+		values = [tuple(row.get(field) for field in rows[0]) + standard for row in rows]
+		frappe.db.bulk_insert(doctype, fields, values)
+
+
+def get_dataset_user_email(prefix, shape, number):
+	"""Build the email of a generated user, which encodes its scope shape"""
+	return f"{prefix.lower()}-{shape.replace('_', '-')}-{number:05d}@example.com"
+
+
+def get_dataset_users(prefix=DEFAULT_PREFIX):
+	"""Get the generated users of a dataset grouped by scope shape"""
+	users = {}
+	for shape in SCOPE_SHAPES:
+		pattern = get_dataset_user_email(prefix, shape, 0).replace("00000@", "%@")
+		users[shape] = frappe.db.sql_list(
+			"SELECT `name` FROM `tabUser` WHERE `name` LIKE %s ORDER BY `name`", pattern
+		)
+	return users
+
+
+def generate_dataset(company=None, **kwargs):
+	"""
+	Generate a synthetic dataset on the current site
+	Keyword arguments are passed on to DatasetGenerator
+	"""
+	company = company or frappe.defaults.get_global_default("company")
+	if not company:
+		frappe.throw("A company is required to generate a dataset")
+
+	generator = DatasetGenerator(company, **kwargs)
+	generator.generate()
+	frappe.db.commit()
+	return generator
+
+
+def purge_dataset(prefix=DEFAULT_PREFIX):
+	"""Delete every record created by a previous run with the same prefix"""
+	prefix = prefix.upper()
+	pattern = f"{prefix}-%"
+	user_pattern = f"{prefix.lower()}-%@example.com"
+
+	users = frappe.db.sql_list("SELECT `name` FROM `tabUser` WHERE `name` LIKE %s", user_pattern)
+
+	for doctype in SCOPED_TRANSACTION_DOCTYPES:
+		frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE `name` LIKE %s", pattern)
+	frappe.db.sql("DELETE FROM `tabJournal Entry Account` WHERE `parent` LIKE %s", pattern)
+
+	for doctype in ("User Permission", "User Scope Index", "User Unit Index"):
+		frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE `user` LIKE %s", user_pattern)
+	for doctype in ("Has Role", "User Access Scope"):
+		frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE `parent` LIKE %s", user_pattern)
+	frappe.db.sql("DELETE FROM `tabUser` WHERE `name` LIKE %s", user_pattern)
+
+	for doctype in ("Factory Business Unit", "Strategic Business Unit", "Enterprise", "Cost Center"):
+		frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE `name` LIKE %s", pattern)
+	rebuild_tree("Cost Center")
+
+	clear_hierarchy_cache()
+	clear_scope_cache(users)
+	frappe.db.commit()
+
+	print(f"✓ Purged dataset '{prefix}' ({len(users)} users)")
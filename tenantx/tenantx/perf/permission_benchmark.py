@@ -0,0 +1,176 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Permission query benchmark for TenantX
+Measures condition generation time, list view latency and rows examined per scoped
+doctype and scope shape on a generated dataset, and compares the results with a stored
+JSON baseline so regressions are flagged
+"""
+
+import json
+import os
+import statistics
+import time
+
+import frappe
+from frappe.utils import cint
+
+from tenantx.tenantx.perf.dataset import DEFAULT_PREFIX, get_dataset_users
+from tenantx.tenantx.permission_queries import SCOPED_TRANSACTION_DOCTYPES
+from tenantx.tenantx.scope_index import clear_scope_cache
+
+DEFAULT_ITERATIONS = 10
+
+# Relative slowdown of list view latency that counts as a regression
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+
+def get_baseline_path():
+	"""Get the default baseline file of the current site"""
+	return frappe.get_site_path("tenantx_benchmarks", "permission_queries.json")
+
+
+def run_permission_benchmark(prefix=DEFAULT_PREFIX, iterations=DEFAULT_ITERATIONS, doctypes=None):
+	"""
+	Benchmark every scoped doctype for one generated user of each scope shape
+	Returns a dict keyed by "<doctype>|<shape>"
+	"""
+	results = {}
+	users = get_dataset_users(prefix)
+
+	for shape, shape_users in users.items():
+		if not shape_users:
+			print(f"⚠ No generated users with a {shape} scope, skipping")
+			continue
+
+		user = shape_users[0]
+		for doctype in doctypes or SCOPED_TRANSACTION_DOCTYPES:
+			results[f"{doctype}|{shape}"] = benchmark_doctype(doctype, user, iterations)
+			print(f"  {doctype:<18} {shape:<13} list {results[f'{doctype}|{shape}']['list_ms']:.2f} ms")
+
+	return results
+
+
+def benchmark_doctype(doctype, user, iterations):
+	"""Measure one doctype for one user"""
+	condition_function = frappe.get_attr(frappe.get_hooks("permission_query_conditions")[doctype][-1])
+
+	cold, warm, latency, rows_examined = [], [], [], []
+	for _iteration in range(iterations):
+		# Cold: scope resolved from the database, warm: served from cache
+		clear_scope_cache([user])
+		cold.append(timed(condition_function, user)[0])
+		warm.append(timed(condition_function, user)[0])
+
+		frappe.set_user(user)
+		try:
+			reads_before = get_handler_reads()
+			elapsed, _rows = timed(
+				frappe.get_list, doctype, fields=["name"], order_by="modified desc", limit_page_length=20
+			)
+			rows_examined.append(get_handler_reads() - reads_before)
+			latency.append(elapsed)
+		finally:
+			frappe.set_user("Administrator")
+
+	return {
+		"user": user,
+		"condition_cold_ms": statistics.median(cold),
+		"condition_warm_ms": statistics.median(warm),
+		"list_ms": statistics.median(latency),
+		"list_p95_ms": percentile(latency, 95),
+		"rows_examined": statistics.median(rows_examined),
+	}
+
+
+def timed(function, *args, **kwargs):
+	"""Call a function and return the elapsed milliseconds and its result"""
+	start = time.perf_counter()
+	result = function(*args, **kwargs)
+	return (time.perf_counter() - start) * 1000, result
+
+
+def get_handler_reads():
+	"""Get the session's total handler reads, i.e. rows examined so far"""
+	return sum(
+		cint(row[1]) for row in frappe.db.sql("SHOW SESSION STATUS LIKE 'Handler_read%%'")
+	)
+
+
+def percentile(values, percent):
+	"""Nearest-rank percentile"""
+	ordered = sorted(values)
+	index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+	return ordered[index]
+
+
+def load_baseline(path=None):
+	"""Load a stored baseline, or None when there is none yet"""
+	path = path or get_baseline_path()
+	if not os.path.exists(path):
+		return None
+
+	with open(path) as f:
+		return json.load(f)
+
+
+def save_baseline(results, path=None):
+	"""Store results as the new baseline"""
+	path = path or get_baseline_path()
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, "w") as f:
+		json.dump(results, f, indent=1, sort_keys=True)
+
+
+def compare_with_baseline(results, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD):
+	"""
+	Flag doctype/shape pairs whose list latency or rows examined grew beyond the threshold
+	Returns a list of regression dicts
+	"""
+	regressions = []
+	for key, result in results.items():
+		previous = baseline.get(key)
+		if not previous:
+			continue
+
+		for metric in ("list_ms", "rows_examined"):
+			if previous[metric] and result[metric] > previous[metric] * (1 + threshold):
+				regressions.append({
+					"key": key,
+					"metric": metric,
+					"baseline": previous[metric],
+					"current": result[metric],
+				})
+
+	return regressions
+
+
+def run_and_compare(
+	prefix=DEFAULT_PREFIX,
+	iterations=DEFAULT_ITERATIONS,
+	baseline_path=None,
+	threshold=DEFAULT_REGRESSION_THRESHOLD,
+	update_baseline=False,
+):
+	"""
+	Run the benchmark and compare it with the stored baseline
+	The first run, or a run with update_baseline, stores the results as the baseline
+	"""
+	print("Running TenantX permission query benchmark...")
+	results = run_permission_benchmark(prefix, iterations)
+
+	baseline = load_baseline(baseline_path)
+	regressions = compare_with_baseline(results, baseline, threshold) if baseline else []
+
+	if baseline is None or update_baseline:
+		save_baseline(results, baseline_path)
+		print(f"✓ Baseline saved to {baseline_path or get_baseline_path()}")
+
+	for regression in regressions:
+		print(f"✗ {regression['key']} {regression['metric']}: "
+			f"{regression['baseline']:.2f} → {regression['current']:.2f}")
+	if baseline and not regressions:
+		print("✓ No regressions against the baseline")
+
+	return regressions
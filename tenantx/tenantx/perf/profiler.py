@@ -0,0 +1,227 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Opt-in profiler for TenantX permission hooks
+When `tenantx_profiler` is set in site config, every decorated hook records its call
+count, latency histogram, SQL count and scope cache hits and misses per hook, doctype
+and user role. Metrics are aggregated in Redis and exposed as JSON and as Prometheus text
+"""
+
+import functools
+import hmac
+import time
+
+import frappe
+from frappe.utils import cint, flt
+
+from tenantx.tenantx.perf.query_counter import QueryCounter
+from tenantx.tenantx.perf.query_log import sample_condition_query
+from tenantx.tenantx.perf.request_timing import PERMISSION_RESOLUTION, PERMISSION_SYNC, timed_area
+
+PROFILE_CACHE_KEY = "tenantx_profile"
+
+# Upper bounds of the latency histogram buckets in milliseconds
+LATENCY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Request timing area each profiled hook is attributed to
+HOOK_AREAS = {
+	"permission_query_conditions": PERMISSION_RESOLUTION,
+	"has_permission": PERMISSION_RESOLUTION,
+	"user_sync": PERMISSION_SYNC,
+}
+
+# The first of these roles a user holds labels their metrics
+PROFILED_ROLES = (
+	"System Manager",
+	"Enterprise Admin",
+	"SBU Head",
+	"Factory Head",
+	"Factory User",
+	"Liaison Officer",
+)
+
+
+def is_profiler_enabled():
+	"""Check if the profiler is switched on for this site"""
+	return cint(frappe.conf.get("tenantx_profiler"))
+
+
+def profile_hook(hook, doctype):
+	"""
+	Decorate a TenantX hook so its calls are profiled while the profiler is enabled
+	Permission query conditions are also sampled for EXPLAIN capture, see query_log
+	Costs a couple of site config lookups per call when both are disabled
+	"""
+	def decorator(function):
+		if hook in HOOK_AREAS:
+			function = timed_area(HOOK_AREAS[hook])(function)
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			if not is_profiler_enabled() or frappe.flags.get("in_tenantx_profile"):
+				result = function(*args, **kwargs)
+			else:
+				result = call_profiled(function, args, kwargs, hook, doctype)
+
+			if hook == "permission_query_conditions":
+				sample_condition_query(doctype, get_hook_user(args, kwargs), result)
+
+			return result
+
+		return wrapper
+
+	return decorator
+
+
+def call_profiled(function, args, kwargs, hook, doctype):
+	"""Call a hook and record its latency, SQL count and cache misses"""
+	frappe.flags.in_tenantx_profile = True
+	frappe.flags.tenantx_cache_misses = 0
+	start = time.perf_counter()
+	try:
+		with QueryCounter() as counter:
+			return function(*args, **kwargs)
+	finally:
+		elapsed = (time.perf_counter() - start) * 1000
+		misses = frappe.flags.tenantx_cache_misses
+		frappe.flags.in_tenantx_profile = False
+		record_call(hook, doctype, get_role_label(get_hook_user(args, kwargs)), elapsed, counter.queries, misses)
+
+
+def note_cache_miss():
+	"""Count a TenantX cache miss against the hook being profiled"""
+	if frappe.flags.get("in_tenantx_profile"):
+		frappe.flags.tenantx_cache_misses += 1
+
+
+def get_hook_user(args, kwargs):
+	"""Get the user a hook runs for: its user argument, otherwise the session user"""
+	user = kwargs.get("user")
+	if not user:
+		# permission_query_conditions(user) and has_permission(doc, ptype, user)
+		for index in (0, 2):
+			if len(args) > index and isinstance(args[index], str):
+				user = args[index]
+				break
+	return user or frappe.session.user
+
+
+def get_role_label(user):
+	"""Get the TenantX role a user's metrics are grouped under"""
+	roles = frappe.get_roles(user)
+	return next((role for role in PROFILED_ROLES if role in roles), "Other")
+
+
+def record_call(hook, doctype, role, elapsed, queries, cache_misses):
+	"""Add one call to the aggregated metrics in Redis"""
+	label = f"{hook}|{doctype}|{role}"
+	bucket = next((str(bound) for bound in LATENCY_BUCKETS if elapsed <= bound), "+Inf")
+
+	cache = frappe.cache()
+	pipeline = cache.pipeline()
+	key = cache.make_key(PROFILE_CACHE_KEY)
+	pipeline.hincrby(key, f"{label}|calls", 1)
+	pipeline.hincrbyfloat(key, f"{label}|ms", elapsed)
+	pipeline.hincrby(key, f"{label}|sql", queries)
+	pipeline.hincrby(key, f"{label}|bucket|{bucket}", 1)
+	pipeline.hincrby(key, f"{label}|cache_misses", cache_misses)
+	pipeline.hincrby(key, f"{label}|cache_hits", 0 if cache_misses else 1)
+	pipeline.execute()
+
+
+def get_metrics():
+	"""
+	Read the aggregated metrics
+	Returns a list of dicts, one per hook, doctype and role
+	"""
+	# Read through a raw pipeline, the cache wrapper would unpickle the counters
+	cache = frappe.cache()
+	raw = cache.pipeline().hgetall(cache.make_key(PROFILE_CACHE_KEY)).execute()[0]
+
+	metrics = {}
+	for field, value in raw.items():
+		hook, doctype, role, metric = frappe.safe_decode(field).split("|", 3)
+		row = metrics.setdefault((hook, doctype, role), {
+			"hook": hook,
+			"doctype": doctype,
+			"role": role,
+			"calls": 0,
+			"ms": 0.0,
+			"sql": 0,
+			"cache_hits": 0,
+			"cache_misses": 0,
+			"buckets": {},
+		})
+		if metric.startswith("bucket|"):
+			row["buckets"][metric.split("|", 1)[1]] = cint(value)
+		else:
+			row[metric] = flt(value) if metric == "ms" else cint(value)
+
+	for row in metrics.values():
+		row["avg_ms"] = row["ms"] / row["calls"] if row["calls"] else 0
+
+	return sorted(metrics.values(), key=lambda row: row["ms"], reverse=True)
+
+
+def get_prometheus_text():
+	"""Render the metrics in the Prometheus text exposition format"""
+	lines = [
+		"# HELP tenantx_hook_calls_total TenantX hook calls",
+		"# TYPE tenantx_hook_calls_total counter",
+		"# HELP tenantx_hook_sql_total Queries run inside TenantX hooks",
+		"# TYPE tenantx_hook_sql_total counter",
+		"# HELP tenantx_hook_cache_total TenantX cache lookups by result",
+		"# TYPE tenantx_hook_cache_total counter",
+		"# HELP tenantx_hook_latency_ms TenantX hook latency in milliseconds",
+		"# TYPE tenantx_hook_latency_ms histogram",
+	]
+
+	for row in get_metrics():
+		labels = 'hook="{hook}",doctype="{doctype}",role="{role}"'.format(**row)
+		lines.append(f"tenantx_hook_calls_total{{{labels}}} {row['calls']}")
+		lines.append(f"tenantx_hook_sql_total{{{labels}}} {row['sql']}")
+		lines.append(f'tenantx_hook_cache_total{{{labels},result="hit"}} {row["cache_hits"]}')
+		lines.append(f'tenantx_hook_cache_total{{{labels},result="miss"}} {row["cache_misses"]}')
+
+		cumulative = 0
+		for bound in [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]:
+			cumulative += row["buckets"].get(bound, 0)
+			lines.append(f'tenantx_hook_latency_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+		lines.append(f"tenantx_hook_latency_ms_sum{{{labels}}} {row['ms']:.3f}")
+		lines.append(f"tenantx_hook_latency_ms_count{{{labels}}} {row['calls']}")
+
+	return "\n".join(lines) + "\n"
+
+
+@frappe.whitelist()
+def get_profile_metrics():
+	"""Get the aggregated hook metrics"""
+	frappe.only_for("System Manager")
+	return get_metrics()
+
+
+@frappe.whitelist()
+def reset_profile_metrics():
+	"""Clear the aggregated hook metrics"""
+	frappe.only_for("System Manager")
+	frappe.cache().delete_value(PROFILE_CACHE_KEY)
+
+
+@frappe.whitelist(allow_guest=True)
+def metrics():
+	"""
+	Prometheus scrape endpoint
+	Guests must send the site's `tenantx_metrics_token` as a bearer token
+	"""
+	from werkzeug.wrappers import Response
+
+	if frappe.session.user == "Guest":
+		token = frappe.conf.get("tenantx_metrics_token")
+		authorization = frappe.get_request_header("Authorization") or ""
+		if not token or not hmac.compare_digest(authorization, f"Bearer {token}"):
+			raise frappe.PermissionError
+	else:
+		frappe.only_for("System Manager")
+
+	return Response(get_prometheus_text(), mimetype="text/plain; version=0.0.4")
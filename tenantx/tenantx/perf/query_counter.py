@@ -0,0 +1,47 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Query counter for TenantX benchmarks and profiling
+Counts queries and rows written through frappe.db.sql while active
+"""
+
+import frappe
+
+WRITE_QUERY_TYPES = ("insert", "update", "delete", "replace")
+
+
+class QueryCounter:
+	"""
+	Context manager that wraps frappe.db.sql for the current connection
+	Nested counters each see the queries made while they are active
+	"""
+
+	def __enter__(self):
+		self.queries = 0
+		self.rows_written = 0
+		self.db = frappe.db
+		self.previous = self.db.__dict__.get("sql")
+		inner = self.db.sql
+
+		def sql(query, *args, **kwargs):
+			result = inner(query, *args, **kwargs)
+			self.queries += 1
+			if is_write_query(query):
+				self.rows_written += max(self.db._cursor.rowcount, 0)
+			return result
+
+		self.db.sql = sql
+		return self
+
+	def __exit__(self, *exc_info):
+		if self.previous is None:
+			del self.db.sql
+		else:
+			self.db.sql = self.previous
+
+
+def is_write_query(query):
+	"""Check if a query writes rows"""
+	query = str(query).lstrip().lower()
+	return query.startswith(WRITE_QUERY_TYPES)
@@ -0,0 +1,133 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+EXPLAIN capture for TenantX permission conditions
+A sampled share of condition hook calls watch the list query that embeds the generated
+conditions. When that query runs longer than the threshold, its final SQL, bound values
+and EXPLAIN output are written to the Permission Query Log in a background job
+"""
+
+import json
+import random
+import time
+
+import frappe
+from frappe.utils import cint, flt
+
+# Queries watched for the embedded conditions before giving up
+MAX_WATCHED_QUERIES = 50
+
+DEFAULT_EXPLAIN_THRESHOLD_MS = 200
+
+
+def get_sample_rate():
+	"""Share of condition hook calls whose query is watched, 0 disables capture"""
+	return flt(frappe.conf.get("tenantx_explain_sample_rate"))
+
+
+def get_threshold():
+	"""Query duration in milliseconds above which the query is logged"""
+	return flt(frappe.conf.get("tenantx_explain_threshold_ms")) or DEFAULT_EXPLAIN_THRESHOLD_MS
+
+
+def sample_condition_query(doctype, user, conditions):
+	"""Watch the query embedding these conditions for a sampled share of calls"""
+	rate = get_sample_rate()
+	if not rate or not conditions or conditions == "1=0" or random.random() >= rate:
+		return
+
+	ConditionQueryWatcher(doctype, user, conditions).install()
+
+
+class ConditionQueryWatcher:
+	"""One-shot wrapper around frappe.db.sql that times the query embedding the conditions"""
+
+	def __init__(self, doctype, user, conditions):
+		self.doctype = doctype
+		self.user = user
+		self.conditions = conditions
+		self.watched = 0
+		self.done = False
+
+	def install(self):
+		self.db = frappe.db
+		self.previous = self.db.__dict__.get("sql")
+		self.inner = self.db.sql
+		self.db.sql = self.sql
+
+		if getattr(frappe.local, "tenantx_query_watchers", None) is None:
+			frappe.local.tenantx_query_watchers = []
+		frappe.local.tenantx_query_watchers.append(self)
+
+	def uninstall(self):
+		self.done = True
+		# Leave the chain alone if another wrapper was installed on top of this one
+		if self.db.__dict__.get("sql") == self.sql:
+			if self.previous is None:
+				del self.db.sql
+			else:
+				self.db.sql = self.previous
+
+	def sql(self, query, values=(), *args, **kwargs):
+		if self.done:
+			return self.inner(query, values, *args, **kwargs)
+
+		self.watched += 1
+		if self.conditions not in str(query):
+			if self.watched >= MAX_WATCHED_QUERIES:
+				self.uninstall()
+			return self.inner(query, values, *args, **kwargs)
+
+		self.uninstall()
+		start = time.perf_counter()
+		result = self.inner(query, values, *args, **kwargs)
+		elapsed = (time.perf_counter() - start) * 1000
+
+		if elapsed >= get_threshold():
+			self.log(str(query), values, elapsed)
+
+		return result
+
+	def log(self, query, values, elapsed):
+		"""Capture EXPLAIN for the slow query and queue it for the log"""
+		from tenantx.tenantx.perf.profiler import get_role_label
+		from tenantx.tenantx.scope_index import get_scope_cost_centers, get_scope_strategy
+
+		explain = self.inner(f"EXPLAIN {query}", values, as_dict=True)
+		cost_centers = get_scope_cost_centers(self.user)
+
+		frappe.enqueue(
+			"tenantx.tenantx.perf.query_log.insert_query_log",
+			queue="short",
+			log={
+				"ref_doctype": self.doctype,
+				"user": self.user,
+				"role": get_role_label(self.user),
+				"scope_strategy": get_scope_strategy(cost_centers),
+				"scope_size": len(cost_centers),
+				"duration_ms": elapsed,
+				"rows_examined": sum(cint(row.get("rows")) for row in explain),
+				"conditions": self.conditions,
+				"query": query,
+				"query_values": json.dumps(values, default=str, indent=1),
+				"explain": json.dumps(explain, default=str, indent=1),
+			},
+		)
+
+
+def uninstall_watchers(*args, **kwargs):
+	"""
+	Remove the watchers still installed at the end of a request or job
+	Long-lived connections would otherwise keep them around for unrelated queries
+	"""
+	watchers = getattr(frappe.local, "tenantx_query_watchers", None)
+	frappe.local.tenantx_query_watchers = None
+	for watcher in reversed(watchers or []):
+		if not watcher.done:
+			watcher.uninstall()
+
+
+def insert_query_log(log):
+	"""Background job: store a captured slow permission query"""
+	frappe.get_doc({"doctype": "Permission Query Log", **log}).insert(ignore_permissions=True)
@@ -0,0 +1,167 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Request and job timing for TenantX code paths
+With `tenantx_request_timing` set in site config, time spent in TenantX areas is
+attributed per request and per background job and pushed to a rolling ring buffer in
+Redis, summarized on the TenantX Timings desk page
+"""
+
+import functools
+import json
+import statistics
+import time
+
+import frappe
+from frappe.utils import cint, now
+
+TIMING_CACHE_KEY = "tenantx_request_timings"
+
+# Requests and jobs kept in the ring buffer
+DEFAULT_RING_SIZE = 1000
+
+PERMISSION_RESOLUTION = "permission_resolution"
+HIERARCHY_EXPANSION = "hierarchy_expansion"
+VALIDATION = "validation"
+PERMISSION_SYNC = "permission_sync"
+
+TIMED_AREAS = (PERMISSION_RESOLUTION, HIERARCHY_EXPANSION, VALIDATION, PERMISSION_SYNC)
+
+
+def is_timing_enabled():
+	"""Check if request timing is switched on for this site"""
+	return cint(frappe.conf.get("tenantx_request_timing"))
+
+
+def get_ring_size():
+	"""Get the number of requests and jobs kept in the ring buffer"""
+	return cint(frappe.conf.get("tenantx_request_timing_ring_size")) or DEFAULT_RING_SIZE
+
+
+def timed_area(area):
+	"""
+	Decorate a TenantX function so its time is attributed to an area of the current request
+	Nested calls within the same area are only counted once
+	"""
+	def decorator(function):
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			timings = getattr(frappe.local, "tenantx_timings", None)
+			if timings is None or area in timings["active"]:
+				return function(*args, **kwargs)
+
+			timings["active"].add(area)
+			start = time.perf_counter()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				timings["active"].discard(area)
+				timings["areas"][area] = timings["areas"].get(area, 0) + (time.perf_counter() - start) * 1000
+
+		return wrapper
+
+	return decorator
+
+
+def start_timing():
+	"""Start collecting TenantX timings for the current request or job"""
+	frappe.local.tenantx_timings = (
+		{"start": time.perf_counter(), "areas": {}, "active": set()} if is_timing_enabled() else None
+	)
+
+
+def finish_timing(kind, path):
+	"""Push the collected timings of a request or job to the ring buffer"""
+	timings = getattr(frappe.local, "tenantx_timings", None)
+	frappe.local.tenantx_timings = None
+	if not timings or not timings["areas"]:
+		return
+
+	entry = {
+		"kind": kind,
+		"path": path,
+		"user": frappe.session.user if getattr(frappe.local, "session", None) else None,
+		"timestamp": now(),
+		"total_ms": (time.perf_counter() - timings["start"]) * 1000,
+		"areas": timings["areas"],
+	}
+
+	cache = frappe.cache()
+	cache.lpush(TIMING_CACHE_KEY, json.dumps(entry))
+	cache.ltrim(TIMING_CACHE_KEY, 0, get_ring_size() - 1)
+
+
+def before_request(*args, **kwargs):
+	start_timing()
+
+
+def after_request(response=None, request=None, **kwargs):
+	finish_timing("request", getattr(request or frappe.request, "path", None))
+
+
+def before_job(*args, **kwargs):
+	start_timing()
+
+
+def after_job(method=None, **kwargs):
+	finish_timing("job", method if isinstance(method, str) else getattr(method, "__name__", str(method)))
+
+
+def get_entries(limit=None):
+	"""Read entries from the ring buffer, newest first"""
+	cache = frappe.cache()
+	return [json.loads(entry) for entry in cache.lrange(TIMING_CACHE_KEY, 0, (limit or get_ring_size()) - 1)]
+
+
+@frappe.whitelist()
+def get_timing_summary(limit=None):
+	"""
+	Summarize the ring buffer per TenantX area and per path
+	Returns area statistics, the paths spending most time in TenantX and the latest entries
+	"""
+	frappe.only_for("System Manager")
+	entries = get_entries(cint(limit) or None)
+
+	areas = []
+	for area in TIMED_AREAS:
+		values = sorted(entry["areas"][area] for entry in entries if area in entry["areas"])
+		if values:
+			areas.append({
+				"area": area,
+				"count": len(values),
+				"avg_ms": statistics.mean(values),
+				"p95_ms": values[max(0, round(0.95 * len(values)) - 1)],
+				"max_ms": values[-1],
+				"total_ms": sum(values),
+			})
+
+	paths = {}
+	for entry in entries:
+		row = paths.setdefault((entry["kind"], entry["path"]), {
+			"kind": entry["kind"],
+			"path": entry["path"],
+			"count": 0,
+			"tenantx_ms": 0.0,
+			"total_ms": 0.0,
+		})
+		row["count"] += 1
+		row["tenantx_ms"] += sum(entry["areas"].values())
+		row["total_ms"] += entry["total_ms"]
+
+	for row in paths.values():
+		row["share"] = row["tenantx_ms"] / row["total_ms"] * 100 if row["total_ms"] else 0
+
+	return {
+		"entries": len(entries),
+		"areas": areas,
+		"paths": sorted(paths.values(), key=lambda row: row["tenantx_ms"], reverse=True)[:20],
+		"latest": entries[:20],
+	}
+
+
+@frappe.whitelist()
+def clear_timings():
+	"""Empty the ring buffer"""
+	frappe.only_for("System Manager")
+	frappe.cache().delete_value(TIMING_CACHE_KEY)
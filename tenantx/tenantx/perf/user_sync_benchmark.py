@@ -0,0 +1,164 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+User save and sync benchmark for TenantX
+Saves throwaway users with growing numbers of access scope rows and records wall time,
+query count and rows written for each sync strategy, giving the scaling curve of
+permission provisioning
+"""
+
+import json
+import os
+
+import frappe
+
+from tenantx.tenantx.perf.dataset import DEFAULT_PREFIX, get_dataset_user_email
+from tenantx.tenantx.perf.permission_benchmark import timed
+from tenantx.tenantx.perf.query_counter import QueryCounter
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+
+# Sync strategies measured by the benchmark, called as strategy(user_doc, method)
+# New strategies are added here so they are measured against the current one
+SYNC_STRATEGIES = {
+	"current": "tenantx.tenantx.doc_events.user.update_user_permissions",
+}
+
+SCOPE_DOCTYPES = ("Factory Business Unit", "Strategic Business Unit", "Enterprise", "Liaison Office")
+
+
+def get_results_path():
+	"""Get the default results file of the current site"""
+	return frappe.get_site_path("tenantx_benchmarks", "user_sync.json")
+
+
+def get_scope_units(prefix=DEFAULT_PREFIX, limit=None):
+	"""Get (scope_type, scope_name) pairs of a generated dataset, factories first"""
+	units = []
+	for doctype in SCOPE_DOCTYPES:
+		names = frappe.get_all(
+			doctype, filters={"name": ["like", f"{prefix.upper()}-%"]}, pluck="name", order_by="name"
+		)
+		units.extend((doctype, name) for name in names)
+		if limit and len(units) >= limit:
+			break
+
+	return units[:limit] if limit else units
+
+
+def run_user_sync_benchmark(prefix=DEFAULT_PREFIX, sizes=DEFAULT_SIZES, strategies=None):
+	"""
+	Benchmark every sync strategy at every scope size
+	Returns a dict keyed by "<strategy>|<size>"
+	"""
+	results = {}
+	units = get_scope_units(prefix, max(sizes))
+	if not units:
+		frappe.throw(f"No generated scope units with prefix {prefix}, run tenantx-generate-dataset first")
+
+	for strategy in strategies or list(SYNC_STRATEGIES):
+		sync = frappe.get_attr(SYNC_STRATEGIES[strategy])
+		for size in sizes:
+			if size > len(units):
+				print(f"⚠ Only {len(units)} scope units available, skipping size {size}")
+				continue
+
+			result = results[f"{strategy}|{size}"] = benchmark_sync(prefix, sync, units[:size])
+			print(f"  {strategy:<12} {size:>6} rows  {result['sync_ms']:>10.2f} ms  "
+				f"{result['queries']:>7} queries  {result['rows_written']:>7} rows written")
+
+	# The current strategy also runs inside a real save, which adds the document overhead
+	if "current" in (strategies or SYNC_STRATEGIES):
+		for size in sizes:
+			if size <= len(units):
+				results[f"current|{size}"].update(benchmark_save(prefix, units[:size]))
+
+	return results
+
+
+def benchmark_sync(prefix, sync, units):
+	"""
+	Call one sync strategy on a fresh user holding the given scope rows
+	Runs with the same flag as the User on_update hook, so User Permission inserts do not
+	each rebuild the scope index and the numbers compare with a real save
+	"""
+	user = create_benchmark_user(prefix, len(units))
+	try:
+		set_scope_rows(user, units)
+		frappe.flags.in_user_scope_sync = True
+		try:
+			with QueryCounter() as counter:
+				elapsed, _result = timed(sync, user, "on_update")
+		finally:
+			frappe.flags.in_user_scope_sync = False
+
+		return {
+			"size": len(units),
+			"sync_ms": elapsed,
+			"queries": counter.queries,
+			"rows_written": counter.rows_written,
+		}
+	finally:
+		delete_benchmark_user(user.name)
+
+
+def benchmark_save(prefix, units):
+	"""Save a fresh user with the given scope rows through the User hooks"""
+	user = create_benchmark_user(prefix, len(units))
+	try:
+		set_scope_rows(user, units)
+		with QueryCounter() as counter:
+			elapsed, _result = timed(user.save, ignore_permissions=True)
+
+		return {
+			"save_ms": elapsed,
+			"save_queries": counter.queries,
+			"save_rows_written": counter.rows_written,
+		}
+	finally:
+		delete_benchmark_user(user.name)
+
+
+def create_benchmark_user(prefix, size):
+	"""Insert a user without scope rows, so only the benchmarked sync writes permissions"""
+	email = get_dataset_user_email(f"{prefix}-sync-bench", "user", size)
+	delete_benchmark_user(email)
+
+	user = frappe.get_doc({
+		"doctype": "User",
+		"email": email,
+		"first_name": f"Sync Benchmark {size}",
+		"send_welcome_email": 0,
+	})
+	user.flags.no_welcome_mail = True
+	user.insert(ignore_permissions=True)
+	frappe.db.commit()
+	return user
+
+
+def set_scope_rows(user, units):
+	"""Replace the user's access scope rows"""
+	user.set("user_access_scope", [])
+	for scope_type, scope_name in units:
+		user.append("user_access_scope", {"scope_type": scope_type, "scope_name": scope_name, "read": 1})
+
+
+def delete_benchmark_user(email):
+	"""Remove a benchmark user with its permissions and scope index rows"""
+	if not frappe.db.exists("User", email):
+		return
+
+	frappe.db.delete("User Permission", {"user": email})
+	frappe.db.delete("User Scope Index", {"user": email})
+	frappe.db.delete("User Unit Index", {"user": email})
+	frappe.delete_doc("User", email, force=True, ignore_permissions=True)
+	frappe.db.commit()
+
+
+def save_results(results, path=None):
+	"""Store benchmark results as JSON"""
+	path = path or get_results_path()
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, "w") as f:
+		json.dump(results, f, indent=1, sort_keys=True)
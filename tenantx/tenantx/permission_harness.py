@@ -0,0 +1,296 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Pure-Python harness for TenantX permission conditions
+Stands in for frappe.db, frappe.get_roles, frappe.session and the Redis cache with an
+in-memory SQLite schema, so condition builders and scope caches can be unit-tested and
+micro-benchmarked without a site, MariaDB or ERPNext
+"""
+
+import re
+import sqlite3
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import frappe
+
+from tenantx.tenantx.party_map import PARTY_DOCTYPES
+from tenantx.tenantx.permission_queries import SCOPED_TRANSACTION_DOCTYPES, SELLING_DOCTYPES
+
+# Columns of the tables the permission code reads, every column is TEXT in SQLite
+SCHEMA = {
+	"User Permission": ["user", "allow", "for_value", "applicable_for", "is_default"],
+	"Enterprise": ["enterprise_name", "parent_enterprise", "cost_center", "is_active"],
+	"Strategic Business Unit": ["sbu_name", "enterprise", "parent_sbu", "cost_center", "is_active"],
+	"Factory Business Unit": ["factory_name", "enterprise", "sbu", "cost_center", "is_active"],
+	"Liaison Office": ["office_name", "enterprise", "sbu", "factory", "is_active"],
+	"Cost Center": ["cost_center_name", "parent_cost_center", "company", "is_group", "lft", "rgt"],
+	"User Access Scope": [
+		"parent", "parenttype", "parentfield", "scope_type", "scope_name", "read", "write", "valid_from", "valid_to",
+	],
+	"User Scope Index": ["user", "cost_center", "scope_type", "scope_name", "can_write"],
+	"User Unit Index": ["user", "unit_type", "unit"],
+	"Unit Cost Center Index": ["unit_type", "unit", "cost_center"],
+	"Party Unit Map": ["party_type", "party", "unit_type", "unit", "source", "access_type", "is_primary", "is_approved"],
+	"Journal Entry Account": ["parent", "parenttype", "parentfield", "cost_center"],
+	"Supplier": ["supplier_name"],
+	"Customer": ["customer_name"],
+	**{doctype: ["cost_center"] for doctype in SCOPED_TRANSACTION_DOCTYPES},
+	**{doctype: ["cost_center", "customer"] for doctype in SELLING_DOCTYPES},
+}
+
+NAMED_PARAMETER = re.compile(r"%\((\w+)\)s")
+
+
+class SQLiteDatabase:
+	"""The subset of frappe.db used by TenantX permission code, over SQLite"""
+
+	def __init__(self):
+		self.connection = sqlite3.connect(":memory:")
+		self.queries = []
+		for doctype, columns in SCHEMA.items():
+			self.connection.execute(
+				"CREATE TABLE `tab{}` (`name` TEXT PRIMARY KEY, {})".format(
+					doctype, ", ".join(f"`{column}` TEXT" for column in columns)
+				)
+			)
+
+	def sql(self, query, values=None, as_dict=False, as_list=False, pluck=False, **kwargs):
+		"""Run a MariaDB-style query with %s / %(name)s placeholders"""
+		query, values = translate_query(str(query), values)
+		self.queries.append(query)
+		cursor = self.connection.execute(query, values)
+		if cursor.description is None:
+			return ()
+
+		rows = cursor.fetchall()
+		if pluck:
+			return [row[0] for row in rows]
+		if as_dict:
+			columns = [column[0] for column in cursor.description]
+			return [frappe._dict(zip(columns, row, strict=True)) for row in rows]
+		if as_list:
+			return [list(row) for row in rows]
+		return tuple(rows)
+
+	def sql_list(self, query, values=None, **kwargs):
+		return [row[0] for row in self.sql(query, values)]
+
+	def escape(self, value, percent=True):
+		value = str(value).replace("'", "''")
+		if percent:
+			value = value.replace("%", "%%")
+		return f"'{value}'"
+
+	def exists(self, doctype, name):
+		return self.get_value(doctype, name, "name")
+
+	def get_value(self, doctype, filters, fieldname="name", **kwargs):
+		where, values = build_where(filters)
+		rows = self.sql(f"SELECT `{fieldname}` FROM `tab{doctype}` WHERE {where} LIMIT 1", values)
+		return rows[0][0] if rows else None
+
+	def insert(self, doctype, **values):
+		"""Insert one row, named from `name` or a running number"""
+		values.setdefault("name", f"{doctype}-{self.count(doctype) + 1}")
+		self.bulk_insert(doctype, list(values), [tuple(values.values())])
+		return values["name"]
+
+	def count(self, doctype, filters=None):
+		where, values = build_where(filters)
+		return self.sql(f"SELECT COUNT(*) FROM `tab{doctype}` WHERE {where}", values)[0][0]
+
+	def delete(self, doctype, filters=None):
+		where, values = build_where(filters)
+		self.sql(f"DELETE FROM `tab{doctype}` WHERE {where}", values)
+
+	def bulk_insert(self, doctype, fields, values, ignore_duplicates=False):
+		columns = ", ".join(f"`{field}`" for field in fields)
+		placeholders = ", ".join("?" for _field in fields)
+		verb = "INSERT OR IGNORE" if ignore_duplicates else "INSERT"
+		self.connection.executemany(
+			f"{verb} INTO `tab{doctype}` ({columns}) VALUES ({placeholders})", [tuple(row) for row in values]
+		)
+
+	def commit(self):
+		self.connection.commit()
+
+	def rollback(self):
+		self.connection.rollback()
+
+
+class FakeCache:
+	"""In-memory replacement for frappe.cache() with hit/miss counters"""
+
+	def __init__(self):
+		self.data = {}
+		self.hits = 0
+		self.misses = 0
+
+	def get_value(self, key, generator=None, **kwargs):
+		if key not in self.data and generator:
+			self.misses += 1
+			self.data[key] = generator()
+		elif key in self.data:
+			self.hits += 1
+		return self.data.get(key)
+
+	def set_value(self, key, value, **kwargs):
+		self.data[key] = value
+
+	def delete_value(self, keys, **kwargs):
+		for key in keys if isinstance(keys, list | tuple) else [keys]:
+			self.data.pop(key, None)
+
+	def hget(self, name, key, generator=None, **kwargs):
+		values = self.data.setdefault(name, {})
+		if key not in values and generator:
+			self.misses += 1
+			values[key] = generator()
+		elif key in values:
+			self.hits += 1
+		return values.get(key)
+
+	def hset(self, name, key, value, **kwargs):
+		self.data.setdefault(name, {})[key] = value
+
+	def hdel(self, name, key, **kwargs):
+		self.data.get(name, {}).pop(key, None)
+
+	def delete_key(self, key, **kwargs):
+		self.data.pop(key, None)
+
+
+class PermissionHarness:
+	"""
+	Context manager that patches frappe with the SQLite database and fake cache
+
+		with PermissionHarness() as harness:
+			harness.grant("user@example.com", "Factory Business Unit", factory)
+			harness.get_visible("Purchase Order", "user@example.com")
+	"""
+
+	def __init__(self, conf=None):
+		self.db = SQLiteDatabase()
+		self.cache = FakeCache()
+		self.roles = {}
+		self.conf = frappe._dict(conf or {})
+		self.session = frappe._dict(user="Administrator")
+		self.flags = frappe._dict()
+		self.stack = ExitStack()
+
+	def __enter__(self):
+		for attribute, value in (
+			("db", self.db),
+			("conf", self.conf),
+			("session", self.session),
+			("flags", self.flags),
+			("cache", lambda: self.cache),
+			("get_roles", lambda user=None: self.roles.get(user or self.session.user, ["Guest"])),
+		):
+			self.stack.enter_context(patch.object(frappe, attribute, value, create=True))
+		return self
+
+	def __exit__(self, *exc_info):
+		self.stack.close()
+
+	def set_user(self, user, roles=None):
+		"""Make a user the session user, optionally with roles"""
+		self.session.user = user
+		if roles is not None:
+			self.roles[user] = list(roles)
+
+	def add_unit(self, doctype, name, cost_center=None, **values):
+		"""Insert an org unit and, when given, its cost center"""
+		if cost_center:
+			if not self.db.exists("Cost Center", cost_center):
+				self.db.insert("Cost Center", name=cost_center, is_group="0")
+			values["cost_center"] = cost_center
+		return self.db.insert(doctype, name=name, is_active="1", **values)
+
+	def grant(self, user, allow, for_value):
+		"""Insert a User Permission"""
+		return self.db.insert("User Permission", user=user, allow=allow, for_value=for_value, is_default="0")
+
+	def get_visible(self, doctype, user):
+		"""Names of `doctype` rows the user can see through its permission query conditions"""
+		conditions = get_condition_function(doctype)(user)
+		return sorted(self.db.sql_list(f"SELECT `name` FROM `tab{doctype}` WHERE {conditions or '1=1'}"))
+
+	def benchmark(self, function, *args, iterations=1000):
+		"""Average milliseconds per call of a condition builder"""
+		start = time.perf_counter()
+		for _iteration in range(iterations):
+			function(*args)
+		return (time.perf_counter() - start) * 1000 / iterations
+
+
+def get_condition_function(doctype):
+	"""Get the permission query condition builder TenantX registers for a doctype"""
+	from tenantx.tenantx import permission_queries
+
+	if doctype in SCOPED_TRANSACTION_DOCTYPES or doctype in PARTY_DOCTYPES:
+		return getattr(
+			permission_queries, "get_permission_query_conditions_for_" + frappe.scrub(doctype)
+		)
+	return frappe.get_attr(
+		f"tenantx.tenantx.doctype.{frappe.scrub(doctype)}.{frappe.scrub(doctype)}.get_permission_query_conditions"
+	)
+
+
+def translate_query(query, values):
+	"""
+	Translate MariaDB placeholders to SQLite ones
+	Tuple and list values are expanded for `IN %(name)s` / `IN %s`
+	"""
+	if isinstance(values, dict):
+		parameters = {}
+
+		def named(match):
+			key = match.group(1)
+			value = values[key]
+			if isinstance(value, list | tuple):
+				keys = [f"{key}_{index}" for index in range(len(value))]
+				parameters.update(zip(keys, value, strict=True))
+				return "({})".format(", ".join(f":{k}" for k in keys))
+			parameters[key] = value
+			return f":{key}"
+
+		query = NAMED_PARAMETER.sub(named, query)
+		return query.replace("%%", "%"), parameters
+
+	if values is not None and not isinstance(values, list | tuple):
+		values = (values,)
+
+	parameters = []
+	parts = query.replace("%%", "\0").split("%s")
+	for index, value in enumerate(values or ()):
+		if isinstance(value, list | tuple):
+			parts[index] += "({})".format(", ".join("?" for _item in value))
+			parameters.extend(value)
+		else:
+			parts[index] += "?"
+			parameters.append(value)
+
+	return "".join(parts).replace("\0", "%"), parameters
+
+
+def build_where(filters):
+	"""Build a WHERE clause from a name or a {field: value | [operator, value]} dict"""
+	if not filters:
+		return "1=1", {}
+	if not isinstance(filters, dict):
+		filters = {"name": filters}
+
+	clauses, values = [], {}
+	for field, value in filters.items():
+		if isinstance(value, list | tuple) and value and value[0] in ("in", "not in"):
+			clauses.append(f"`{field}` {value[0].upper()} %({field})s")
+			values[field] = tuple(value[1]) or ("",)
+		else:
+			clauses.append(f"`{field}` = %({field})s")
+			values[field] = value
+
+	return " AND ".join(clauses), values
@@ -4,10 +4,48 @@
 import frappe
 from frappe import _
 
+from tenantx.tenantx.active_unit import get_narrowing_unit, narrow_liaison_offices, narrow_to_active_unit
+from tenantx.tenantx.hierarchy import filter_active_units, get_visible_units
+from tenantx.tenantx.party_map import PARTY_ACCESS_SOURCES, PARTY_LINK_SOURCES
+from tenantx.tenantx.perf.profiler import profile_hook
+from tenantx.tenantx.scope_index import (
+	get_scope_cost_centers,
+	get_scope_match,
+	get_unit_match,
+	get_user_units,
+	get_write_scope_cost_centers,
+)
 
-def get_permission_query_conditions_for_purchase_order(user):
+# Transactions scoped by cost center, each with a permission query function below
+SCOPED_TRANSACTION_DOCTYPES = [
+	"Purchase Order",
+	"Sales Invoice",
+	"Purchase Invoice",
+	"Sales Order",
+	"Delivery Note",
+	"Purchase Receipt",
+	"Journal Entry",
+]
+
+# Permission types checked against the user's write scope by the has_permission hooks
+WRITE_PTYPES = ("write", "submit", "cancel")
+
+# Transactions a Liaison Office also sees through the customers linked to it
+SELLING_DOCTYPES = ["Sales Invoice", "Sales Order", "Delivery Note"]
+
+# Stock doctypes scoped by warehouse through the Warehouse Unit Map:
+# doctype to (child table or None for the doctype itself, warehouse fields)
+WAREHOUSE_SCOPED_DOCTYPES = {
+	"Stock Entry": ("Stock Entry Detail", ("s_warehouse", "t_warehouse")),
+	"Material Request": ("Material Request Item", ("warehouse", "from_warehouse")),
+	"Stock Reconciliation": ("Stock Reconciliation Item", ("warehouse",)),
+	"Stock Ledger Entry": (None, ("warehouse",)),
+}
+
+
+def get_cost_center_conditions(doctype, user):
 	"""
-	Permission query conditions for Purchase Order
+	Permission query conditions for a transaction with a `cost_center` field
 	Checks if the cost center is linked to a Factory Business Unit or SBU that the user has access to
 	"""
 	if not user:
@@ -17,118 +55,96 @@ def get_permission_query_conditions_for_purchase_order(user):
 	if "System Manager" in frappe.get_roles(user):
 		return ""
 	
-	# Get user's allowed Factory Business Units and SBUs
-	allowed_factories = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Factory Business Unit'
-	""", user)
+	# Cost centers resolved from the user's Factory Business Units, SBUs, Liaison Offices and Cost Centers
+	allowed_cost_centers = get_scope_cost_centers(user)
 	
-	allowed_sbus = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Strategic Business Unit'
-	""", user)
+	conditions = []
+	if allowed_cost_centers:
+		conditions.append(f"`tab{doctype}`.`cost_center` IN {get_cost_center_match(user, allowed_cost_centers)}")
 	
-	# Get user's directly allowed cost centers
-	allowed_cost_centers = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Cost Center'
-	""", user)
+	if doctype in SELLING_DOCTYPES:
+		liaison_offices = filter_active_units("Liaison Office", get_user_units(user).get("Liaison Office") or [])
+		# With an active unit only the offices below it show their customers
+		narrowed = narrow_liaison_offices(user, liaison_offices or [])
+		if narrowed is not None:
+			liaison_offices = narrowed
+		if liaison_offices:
+			conditions.append(f"`tab{doctype}`.`customer` IN {get_liaison_customer_match(liaison_offices)}")
 	
 	# If user has no permissions, they see nothing
-	if not allowed_factories and not allowed_sbus and not allowed_cost_centers:
+	if not conditions:
 		return "1=0"
 	
-	conditions = []
-	
-	# Check if cost center is linked to allowed Factory Business Units
-	if allowed_factories:
-		conditions.append(f"""`tabPurchase Order`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabFactory Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_factories))})
-		)""")
-	
-	# Check if cost center is linked to allowed SBUs
-	if allowed_sbus:
-		conditions.append(f"""`tabPurchase Order`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabStrategic Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_sbus))})
-		)""")
-	
-	# Check if cost center is directly allowed
-	if allowed_cost_centers:
-		conditions.append(f"""`tabPurchase Order`.`cost_center` IN ({','.join(['%s'] * len(allowed_cost_centers))})""")
-	
-	# Combine conditions with OR
-	if conditions:
-		return "(" + " OR ".join(conditions) + ")"
-	
-	return "1=0"
+	return "({})".format(" OR ".join(conditions))
 
 
-def get_permission_query_conditions_for_sales_invoice(user):
+def get_liaison_customer_match(liaison_offices):
+	"""Get a subquery of the customers linked to some Liaison Offices in the Party Unit Map"""
+	return f"""(
+		SELECT pum.`party` FROM `tabParty Unit Map` pum
+		WHERE pum.`unit_type` = 'Liaison Office'
+		AND pum.`unit` IN ({", ".join(frappe.db.escape(office) for office in liaison_offices)})
+		AND pum.`party_type` = 'Customer'
+	)"""
+
+
+def get_cost_center_match(user, allowed_cost_centers):
 	"""
-	Permission query conditions for Sales Invoice
-	Checks if the cost center is linked to a Factory Business Unit or SBU that the user has access to
+	Get the right-hand side of the cost center `IN` predicate
+	With an active unit in the session only its subtree is matched, inlined or joined by size
 	"""
-	if not user:
-		user = frappe.session.user
-	
-	# System Manager sees everything
-	if "System Manager" in frappe.get_roles(user):
-		return ""
-	
-	# Get user's allowed Factory Business Units and SBUs
-	allowed_factories = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Factory Business Unit'
-	""", user)
-	
-	allowed_sbus = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Strategic Business Unit'
-	""", user)
-	
-	# Get user's directly allowed cost centers
-	allowed_cost_centers = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Cost Center'
-	""", user)
-	
-	# If user has no permissions, they see nothing
-	if not allowed_factories and not allowed_sbus and not allowed_cost_centers:
-		return "1=0"
-	
-	conditions = []
-	
-	# Check if cost center is linked to allowed Factory Business Units
-	if allowed_factories:
-		conditions.append(f"""`tabSales Invoice`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabFactory Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_factories))})
-		)""")
-	
-	# Check if cost center is linked to allowed SBUs
-	if allowed_sbus:
-		conditions.append(f"""`tabSales Invoice`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabStrategic Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_sbus))})
-		)""")
-	
-	# Check if cost center is directly allowed
-	if allowed_cost_centers:
-		conditions.append(f"""`tabSales Invoice`.`cost_center` IN ({','.join(['%s'] * len(allowed_cost_centers))})""")
-	
-	# Combine conditions with OR
-	if conditions:
-		return "(" + " OR ".join(conditions) + ")"
-	
-	return "1=0"
+	active_cost_centers = narrow_to_active_unit(user, allowed_cost_centers)
+	if active_cost_centers is None:
+		return get_scope_match(user, allowed_cost_centers)
+
+	if not active_cost_centers:
+		return "(NULL)"
+
+	active_unit = get_narrowing_unit(user)
+	return get_scope_match(user, active_cost_centers, unit=(active_unit["doctype"], active_unit["name"]))
+
+
+@profile_hook("permission_query_conditions", "Purchase Order")
+def get_permission_query_conditions_for_purchase_order(user):
+	"""Permission query conditions for Purchase Order"""
+	return get_cost_center_conditions("Purchase Order", user)
+
+
+@profile_hook("permission_query_conditions", "Sales Invoice")
+def get_permission_query_conditions_for_sales_invoice(user):
+	"""Permission query conditions for Sales Invoice"""
+	return get_cost_center_conditions("Sales Invoice", user)
 
 
+@profile_hook("permission_query_conditions", "Purchase Invoice")
 def get_permission_query_conditions_for_purchase_invoice(user):
+	"""Permission query conditions for Purchase Invoice"""
+	return get_cost_center_conditions("Purchase Invoice", user)
+
+
+@profile_hook("permission_query_conditions", "Sales Order")
+def get_permission_query_conditions_for_sales_order(user):
+	"""Permission query conditions for Sales Order"""
+	return get_cost_center_conditions("Sales Order", user)
+
+
+@profile_hook("permission_query_conditions", "Delivery Note")
+def get_permission_query_conditions_for_delivery_note(user):
+	"""Permission query conditions for Delivery Note"""
+	return get_cost_center_conditions("Delivery Note", user)
+
+
+@profile_hook("permission_query_conditions", "Purchase Receipt")
+def get_permission_query_conditions_for_purchase_receipt(user):
+	"""Permission query conditions for Purchase Receipt"""
+	return get_cost_center_conditions("Purchase Receipt", user)
+
+
+@profile_hook("permission_query_conditions", "Journal Entry")
+def get_permission_query_conditions_for_journal_entry(user):
 	"""
-	Permission query conditions for Purchase Invoice
-	Checks if the cost center is linked to a Factory Business Unit or SBU that the user has access to
+	Permission query conditions for Journal Entry
+	Checks if any of the cost centers in the journal entry are linked to Factory Business Units or SBUs that the user has access to
 	"""
 	if not user:
 		user = frappe.session.user
@@ -137,301 +153,216 @@ def get_permission_query_conditions_for_purchase_invoice(user):
 	if "System Manager" in frappe.get_roles(user):
 		return ""
 	
-	# Get user's allowed Factory Business Units and SBUs
-	allowed_factories = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Factory Business Unit'
-	""", user)
-	
-	allowed_sbus = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Strategic Business Unit'
-	""", user)
-	
-	# Get user's directly allowed cost centers
-	allowed_cost_centers = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Cost Center'
-	""", user)
+	allowed_cost_centers = get_scope_cost_centers(user)
 	
 	# If user has no permissions, they see nothing
-	if not allowed_factories and not allowed_sbus and not allowed_cost_centers:
+	if not allowed_cost_centers:
 		return "1=0"
 	
-	conditions = []
-	
-	# Check if cost center is linked to allowed Factory Business Units
-	if allowed_factories:
-		conditions.append(f"""`tabPurchase Invoice`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabFactory Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_factories))})
-		)""")
-	
-	# Check if cost center is linked to allowed SBUs
-	if allowed_sbus:
-		conditions.append(f"""`tabPurchase Invoice`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabStrategic Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_sbus))})
-		)""")
-	
-	# Check if cost center is directly allowed
-	if allowed_cost_centers:
-		conditions.append(f"""`tabPurchase Invoice`.`cost_center` IN ({','.join(['%s'] * len(allowed_cost_centers))})""")
-	
-	# Combine conditions with OR
-	if conditions:
-		return "(" + " OR ".join(conditions) + ")"
-	
-	return "1=0"
+	# Check if any cost center in the journal entry is allowed
+	return f"""EXISTS (
+		SELECT 1 FROM `tabJournal Entry Account` jea
+		WHERE jea.parent = `tabJournal Entry`.`name`
+		AND jea.cost_center IN {get_cost_center_match(user, allowed_cost_centers)}
+	)"""
 
 
-def get_permission_query_conditions_for_sales_order(user):
+def has_cost_center_permission(doc, ptype=None, user=None):
 	"""
-	Permission query conditions for Sales Order
-	Checks if the cost center is linked to a Factory Business Unit or SBU that the user has access to
+	has_permission for a transaction scoped by cost center
+	Write, submit and cancel need a cost center of the document in the user's write scope,
+	other permission types are left to the permission query conditions
 	"""
-	if not user:
-		user = frappe.session.user
-	
-	# System Manager sees everything
+	if ptype not in WRITE_PTYPES:
+		return None
+
+	user = user or frappe.session.user
 	if "System Manager" in frappe.get_roles(user):
-		return ""
-	
-	# Get user's allowed Factory Business Units and SBUs
-	allowed_factories = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Factory Business Unit'
-	""", user)
-	
-	allowed_sbus = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Strategic Business Unit'
-	""", user)
-	
-	# Get user's directly allowed cost centers
-	allowed_cost_centers = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Cost Center'
-	""", user)
-	
-	# If user has no permissions, they see nothing
-	if not allowed_factories and not allowed_sbus and not allowed_cost_centers:
-		return "1=0"
-	
-	conditions = []
-	
-	# Check if cost center is linked to allowed Factory Business Units
-	if allowed_factories:
-		conditions.append(f"""`tabSales Order`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabFactory Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_factories))})
-		)""")
-	
-	# Check if cost center is linked to allowed SBUs
-	if allowed_sbus:
-		conditions.append(f"""`tabSales Order`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabStrategic Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_sbus))})
-		)""")
-	
-	# Check if cost center is directly allowed
-	if allowed_cost_centers:
-		conditions.append(f"""`tabSales Order`.`cost_center` IN ({','.join(['%s'] * len(allowed_cost_centers))})""")
-	
-	# Combine conditions with OR
-	if conditions:
-		return "(" + " OR ".join(conditions) + ")"
-	
-	return "1=0"
+		return None
 
+	if doc.doctype == "Journal Entry":
+		cost_centers = {row.cost_center for row in doc.get("accounts") or [] if row.cost_center}
+	else:
+		cost_centers = {doc.get("cost_center")} if doc.get("cost_center") else set()
 
-def get_permission_query_conditions_for_delivery_note(user):
+	# Documents without a cost center are not scoped
+	if not cost_centers:
+		return None
+
+	write_scope = get_write_scope_cost_centers(user)
+	if any(cost_center in write_scope for cost_center in cost_centers):
+		return None
+
+	return False
+
+
+@profile_hook("has_permission", "Purchase Order")
+def has_permission_for_purchase_order(doc, ptype=None, user=None):
+	return has_cost_center_permission(doc, ptype, user)
+
+
+@profile_hook("has_permission", "Sales Invoice")
+def has_permission_for_sales_invoice(doc, ptype=None, user=None):
+	return has_cost_center_permission(doc, ptype, user)
+
+
+@profile_hook("has_permission", "Purchase Invoice")
+def has_permission_for_purchase_invoice(doc, ptype=None, user=None):
+	return has_cost_center_permission(doc, ptype, user)
+
+
+@profile_hook("has_permission", "Sales Order")
+def has_permission_for_sales_order(doc, ptype=None, user=None):
+	return has_cost_center_permission(doc, ptype, user)
+
+
+@profile_hook("has_permission", "Delivery Note")
+def has_permission_for_delivery_note(doc, ptype=None, user=None):
+	return has_cost_center_permission(doc, ptype, user)
+
+
+@profile_hook("has_permission", "Purchase Receipt")
+def has_permission_for_purchase_receipt(doc, ptype=None, user=None):
+	return has_cost_center_permission(doc, ptype, user)
+
+
+@profile_hook("has_permission", "Journal Entry")
+def has_permission_for_journal_entry(doc, ptype=None, user=None):
+	return has_cost_center_permission(doc, ptype, user)
+
+
+def get_warehouse_conditions(doctype, user):
 	"""
-	Permission query conditions for Delivery Note
-	Checks if the cost center is linked to a Factory Business Unit or SBU that the user has access to
+	Permission query conditions for a stock doctype
+	Checks if a warehouse of the document sits under a Factory Business Unit whose cost center the user has access to
 	"""
 	if not user:
 		user = frappe.session.user
-	
+
 	# System Manager sees everything
 	if "System Manager" in frappe.get_roles(user):
 		return ""
-	
-	# Get user's allowed Factory Business Units and SBUs
-	allowed_factories = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Factory Business Unit'
-	""", user)
-	
-	allowed_sbus = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Strategic Business Unit'
-	""", user)
-	
-	# Get user's directly allowed cost centers
-	allowed_cost_centers = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Cost Center'
-	""", user)
-	
+
+	allowed_cost_centers = get_scope_cost_centers(user)
+
 	# If user has no permissions, they see nothing
-	if not allowed_factories and not allowed_sbus and not allowed_cost_centers:
+	if not allowed_cost_centers:
 		return "1=0"
-	
-	conditions = []
-	
-	# Check if cost center is linked to allowed Factory Business Units
-	if allowed_factories:
-		conditions.append(f"""`tabDelivery Note`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabFactory Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_factories))})
-		)""")
-	
-	# Check if cost center is linked to allowed SBUs
-	if allowed_sbus:
-		conditions.append(f"""`tabDelivery Note`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabStrategic Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_sbus))})
-		)""")
-	
-	# Check if cost center is directly allowed
-	if allowed_cost_centers:
-		conditions.append(f"""`tabDelivery Note`.`cost_center` IN ({','.join(['%s'] * len(allowed_cost_centers))})""")
-	
-	# Combine conditions with OR
-	if conditions:
-		return "(" + " OR ".join(conditions) + ")"
-	
-	return "1=0"
 
+	allowed_warehouses = f"""(
+		SELECT wum.`warehouse` FROM `tabWarehouse Unit Map` wum
+		WHERE wum.`cost_center` IN {get_cost_center_match(user, allowed_cost_centers)}
+	)"""
 
-def get_permission_query_conditions_for_purchase_receipt(user):
+	child_doctype, warehouse_fields = WAREHOUSE_SCOPED_DOCTYPES[doctype]
+	if not child_doctype:
+		matches = " OR ".join(f"`tab{doctype}`.`{field}` IN {allowed_warehouses}" for field in warehouse_fields)
+		return f"({matches})"
+
+	matches = " OR ".join(f"item.`{field}` IN {allowed_warehouses}" for field in warehouse_fields)
+	return f"""EXISTS (
+		SELECT 1 FROM `tab{child_doctype}` item
+		WHERE item.parent = `tab{doctype}`.`name`
+		AND ({matches})
+	)"""
+
+
+@profile_hook("permission_query_conditions", "Stock Entry")
+def get_permission_query_conditions_for_stock_entry(user):
+	"""Permission query conditions for Stock Entry"""
+	return get_warehouse_conditions("Stock Entry", user)
+
+
+@profile_hook("permission_query_conditions", "Material Request")
+def get_permission_query_conditions_for_material_request(user):
+	"""Permission query conditions for Material Request"""
+	return get_warehouse_conditions("Material Request", user)
+
+
+@profile_hook("permission_query_conditions", "Stock Reconciliation")
+def get_permission_query_conditions_for_stock_reconciliation(user):
+	"""Permission query conditions for Stock Reconciliation"""
+	return get_warehouse_conditions("Stock Reconciliation", user)
+
+
+@profile_hook("permission_query_conditions", "Stock Ledger Entry")
+def get_permission_query_conditions_for_stock_ledger_entry(user):
+	"""Permission query conditions for Stock Ledger Entry"""
+	return get_warehouse_conditions("Stock Ledger Entry", user)
+
+
+def get_unit_conditions(doctype, user):
 	"""
-	Permission query conditions for Purchase Receipt
-	Checks if the cost center is linked to a Factory Business Unit or SBU that the user has access to
+	Permission query conditions for an org unit doctype
+	A unit is visible when it is granted to the user or lies below a granted unit, the same units
+	link search, the org tree and party conditions use
 	"""
 	if not user:
 		user = frappe.session.user
-	
+
+	visible = get_visible_units(user)
 	# System Manager sees everything
-	if "System Manager" in frappe.get_roles(user):
+	if visible is None:
 		return ""
-	
-	# Get user's allowed Factory Business Units and SBUs
-	allowed_factories = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Factory Business Unit'
-	""", user)
-	
-	allowed_sbus = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Strategic Business Unit'
-	""", user)
-	
-	# Get user's directly allowed cost centers
-	allowed_cost_centers = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Cost Center'
-	""", user)
-	
-	# If user has no permissions, they see nothing
-	if not allowed_factories and not allowed_sbus and not allowed_cost_centers:
+
+	units = sorted(visible[doctype])
+	if not units:
 		return "1=0"
-	
-	conditions = []
-	
-	# Check if cost center is linked to allowed Factory Business Units
-	if allowed_factories:
-		conditions.append(f"""`tabPurchase Receipt`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabFactory Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_factories))})
-		)""")
-	
-	# Check if cost center is linked to allowed SBUs
-	if allowed_sbus:
-		conditions.append(f"""`tabPurchase Receipt`.`cost_center` IN (
-			SELECT `cost_center` FROM `tabStrategic Business Unit`
-			WHERE `name` IN ({','.join(['%s'] * len(allowed_sbus))})
-		)""")
-	
-	# Check if cost center is directly allowed
-	if allowed_cost_centers:
-		conditions.append(f"""`tabPurchase Receipt`.`cost_center` IN ({','.join(['%s'] * len(allowed_cost_centers))})""")
-	
-	# Combine conditions with OR
-	if conditions:
-		return "(" + " OR ".join(conditions) + ")"
-	
-	return "1=0"
 
+	return f"(`tab{doctype}`.`name` IN {get_unit_match(user, doctype, units)})"
 
-def get_permission_query_conditions_for_journal_entry(user):
+
+def get_party_conditions(doctype, user):
 	"""
-	Permission query conditions for Journal Entry
-	Checks if any of the cost centers in the journal entry are linked to Factory Business Units or SBUs that the user has access to
+	Permission query conditions for a party mapped in Party Unit Map
+	A party is visible when its SBU Access, Factory Access or Factory Association rows map it to a unit in
+	the user's scope, parties without any such row stay visible to everyone. A Customer's Liaison Office
+	also shows it to that office's users without hiding it from others, and rows a factory maintains
+	from its Customer Details do not restrict the customer
 	"""
 	if not user:
 		user = frappe.session.user
-	
+
+	visible = get_visible_units(user)
 	# System Manager sees everything
-	if "System Manager" in frappe.get_roles(user):
+	if visible is None:
 		return ""
-	
-	# Get user's allowed Factory Business Units and SBUs
-	allowed_factories = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Factory Business Unit'
-	""", user)
-	
-	allowed_sbus = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Strategic Business Unit'
-	""", user)
-	
-	# Get user's directly allowed cost centers
-	allowed_cost_centers = frappe.db.sql_list("""
-		SELECT `for_value` FROM `tabUser Permission`
-		WHERE `user` = %s AND `allow` = 'Cost Center'
-	""", user)
-	
-	# If user has no permissions, they see nothing
-	if not allowed_factories and not allowed_sbus and not allowed_cost_centers:
-		return "1=0"
-	
-	conditions = []
-	
-	# Check if any cost center in the journal entry is linked to allowed Factory Business Units
-	if allowed_factories:
-		conditions.append(f"""EXISTS (
-			SELECT 1 FROM `tabJournal Entry Account` jea
-			WHERE jea.parent = `tabJournal Entry`.`name`
-			AND jea.cost_center IN (
-				SELECT `cost_center` FROM `tabFactory Business Unit`
-				WHERE `name` IN ({','.join(['%s'] * len(allowed_factories))})
-			)
-		)""")
-	
-	# Check if any cost center in the journal entry is linked to allowed SBUs
-	if allowed_sbus:
-		conditions.append(f"""EXISTS (
-			SELECT 1 FROM `tabJournal Entry Account` jea
-			WHERE jea.parent = `tabJournal Entry`.`name`
-			AND jea.cost_center IN (
-				SELECT `cost_center` FROM `tabStrategic Business Unit`
-				WHERE `name` IN ({','.join(['%s'] * len(allowed_sbus))})
-			)
-		)""")
-	
-	# Check if any cost center in the journal entry is directly allowed
-	if allowed_cost_centers:
-		conditions.append(f"""EXISTS (
-			SELECT 1 FROM `tabJournal Entry Account` jea
-			WHERE jea.parent = `tabJournal Entry`.`name`
-			AND jea.cost_center IN ({','.join(['%s'] * len(allowed_cost_centers))})
-		)""")
-	
-	# Combine conditions with OR
-	if conditions:
-		return "(" + " OR ".join(conditions) + ")"
-	
-	return "1=0" 
\ No newline at end of file
+
+	# Large unit sets join the User Unit Index instead of being inlined, like cost center scopes
+	unit_matches = []
+	for unit_type in ("Strategic Business Unit", "Factory Business Unit", "Liaison Office"):
+		if visible[unit_type]:
+			match = get_unit_match(user, unit_type, sorted(visible[unit_type]))
+			unit_matches.append(f"(pum.unit_type = {frappe.db.escape(unit_type)} AND pum.unit IN {match})")
+
+	access_sources = ", ".join(frappe.db.escape(source) for source in PARTY_ACCESS_SOURCES)
+	visible_sources = ", ".join(frappe.db.escape(source) for source in PARTY_ACCESS_SOURCES + PARTY_LINK_SOURCES)
+	unmapped = f"""NOT EXISTS (
+		SELECT 1 FROM `tabParty Unit Map` pum
+		WHERE pum.party_type = {frappe.db.escape(doctype)}
+		AND pum.party = `tab{doctype}`.`name`
+		AND pum.source IN ({access_sources})
+	)"""
+
+	if not unit_matches:
+		return unmapped
+
+	return f"""(EXISTS (
+		SELECT 1 FROM `tabParty Unit Map` pum
+		WHERE pum.party_type = {frappe.db.escape(doctype)}
+		AND pum.party = `tab{doctype}`.`name`
+		AND pum.source IN ({visible_sources})
+		AND ({" OR ".join(unit_matches)})
+	) OR {unmapped})"""
+
+
+@profile_hook("permission_query_conditions", "Supplier")
+def get_permission_query_conditions_for_supplier(user):
+	"""Permission query conditions for Supplier"""
+	return get_party_conditions("Supplier", user)
+
+
+@profile_hook("permission_query_conditions", "Customer")
+def get_permission_query_conditions_for_customer(user):
+	"""Permission query conditions for Customer"""
+	return get_party_conditions("Customer", user)
@@ -0,0 +1,25 @@
+// Copyright (c) 2026, CognitionXLogic and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Permission Query Offenders"] = {
+	filters: [
+		{
+			fieldname: "from_date",
+			label: __("From Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.add_days(frappe.datetime.get_today(), -7),
+		},
+		{
+			fieldname: "to_date",
+			label: __("To Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.get_today(),
+		},
+		{
+			fieldname: "ref_doctype",
+			label: __("DocType"),
+			fieldtype: "Link",
+			options: "DocType",
+		},
+	],
+};
@@ -0,0 +1,76 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+
+
+def execute(filters=None):
+	filters = filters or {}
+	return get_columns(), get_data(filters)
+
+
+def get_columns():
+	return [
+		{"fieldname": "ref_doctype", "label": _("DocType"), "fieldtype": "Link", "options": "DocType", "width": 180},
+		{"fieldname": "role", "label": _("Role"), "fieldtype": "Data", "width": 140},
+		{"fieldname": "scope_strategy", "label": _("Scope Strategy"), "fieldtype": "Data", "width": 110},
+		{"fieldname": "slow_queries", "label": _("Slow Queries"), "fieldtype": "Int", "width": 110},
+		{"fieldname": "total_ms", "label": _("Total (ms)"), "fieldtype": "Float", "width": 110},
+		{"fieldname": "avg_ms", "label": _("Average (ms)"), "fieldtype": "Float", "width": 110},
+		{"fieldname": "max_ms", "label": _("Max (ms)"), "fieldtype": "Float", "width": 110},
+		{"fieldname": "avg_scope_size", "label": _("Average Scope Size"), "fieldtype": "Float", "width": 140},
+		{"fieldname": "avg_rows_examined", "label": _("Average Rows Examined"), "fieldtype": "Float", "width": 160},
+		{"fieldname": "worst_log", "label": _("Worst Query"), "fieldtype": "Link", "options": "Permission Query Log", "width": 120},
+	]
+
+
+def get_data(filters):
+	"""Rank doctype and scope shapes by the total time their slow queries took"""
+	conditions, values = ["1=1"], {}
+	if filters.get("from_date"):
+		conditions.append("`creation` >= %(from_date)s")
+		values["from_date"] = filters["from_date"]
+	if filters.get("to_date"):
+		conditions.append("`creation` < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)")
+		values["to_date"] = filters["to_date"]
+	if filters.get("ref_doctype"):
+		conditions.append("`ref_doctype` = %(ref_doctype)s")
+		values["ref_doctype"] = filters["ref_doctype"]
+
+	data = frappe.db.sql(f"""
+		SELECT `ref_doctype`, `role`, `scope_strategy`,
+			COUNT(*) AS slow_queries,
+			SUM(`duration_ms`) AS total_ms,
+			AVG(`duration_ms`) AS avg_ms,
+			MAX(`duration_ms`) AS max_ms,
+			AVG(`scope_size`) AS avg_scope_size,
+			AVG(`rows_examined`) AS avg_rows_examined
+		FROM `tabPermission Query Log`
+		WHERE {" AND ".join(conditions)}
+		GROUP BY `ref_doctype`, `role`, `scope_strategy`
+		ORDER BY total_ms DESC
+	""", values, as_dict=True)
+
+	# Link each shape to its slowest captured query, ranked in SQL over the same filtered logs
+	worst = {
+		(log.ref_doctype, log.role, log.scope_strategy): log.name
+		for log in frappe.db.sql(f"""
+			SELECT `name`, `ref_doctype`, `role`, `scope_strategy`
+			FROM (
+				SELECT `name`, `ref_doctype`, `role`, `scope_strategy`,
+					ROW_NUMBER() OVER (
+						PARTITION BY `ref_doctype`, `role`, `scope_strategy`
+						ORDER BY `duration_ms` DESC, `name`
+					) AS duration_rank
+				FROM `tabPermission Query Log`
+				WHERE {" AND ".join(conditions)}
+			) ranked
+			WHERE ranked.duration_rank = 1
+		""", values, as_dict=True)
+	}
+
+	for row in data:
+		row.worst_log = worst.get((row.ref_doctype, row.role, row.scope_strategy))
+
+	return data
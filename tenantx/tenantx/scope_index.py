@@ -0,0 +1,435 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+User scope index for TenantX
+Resolves a user's User Permissions into the cost centers they can access, keeps the
+result cached in Redis and materialized in the User Scope Index table so that very
+large scopes can be joined instead of being inlined into permission conditions. The
+units a user can see, granted ones and everything below them, are materialized the
+same way in the User Unit Index table for party permission conditions
+"""
+
+import json
+
+import frappe
+from frappe.utils import cint, create_batch, now
+from frappe.utils.background_jobs import get_job
+
+from tenantx.tenantx.perf.profiler import note_cache_miss
+from tenantx.tenantx.perf.request_timing import PERMISSION_SYNC, timed_area
+
+SCOPE_CACHE_KEY = "tenantx_user_scope"
+WRITE_SCOPE_CACHE_KEY = "tenantx_user_write_scope"
+USER_UNITS_CACHE_KEY = "tenantx_user_units"
+
+# Units changed since the last hierarchy scope rebuild, and the job applying them
+PENDING_SCOPE_REBUILD_KEY = "tenantx_pending_scope_rebuild"
+SCOPE_REBUILD_JOB_ID = "tenantx_rebuild_enterprise_scopes"
+
+ORG_DOCTYPES = ("Enterprise", "Strategic Business Unit", "Factory Business Unit", "Liaison Office")
+
+# User Permission doctypes that grant cost centers
+SCOPE_DOCTYPES = ("Enterprise", "Factory Business Unit", "Strategic Business Unit", "Liaison Office", "Cost Center")
+
+# Scopes up to this many cost centers are inlined as an IN (...) list, larger
+# scopes are matched against the materialized User Scope Index table
+DEFAULT_INLINE_LIMIT = 200
+
+
+def get_scope_cost_centers(user):
+	"""
+	Get the cost centers a user can access
+	Served from cache, resolved from User Permissions on a miss
+	"""
+	def generator():
+		note_cache_miss()
+		return resolve_scope_cost_centers(user)
+
+	return frappe.cache().hget(SCOPE_CACHE_KEY, user, generator=generator)
+
+
+def resolve_scope_cost_centers(user):
+	"""Resolve the distinct cost centers granted to a user"""
+	return sorted({row[0] for row in resolve_scope_grants(user)})
+
+
+def get_write_scope_cost_centers(user):
+	"""
+	Get the cost centers a user can write to, as a set for constant time lookups
+	Served from cache, resolved from User Permissions and User Access Scope on a miss
+	"""
+	def generator():
+		note_cache_miss()
+		return resolve_write_scope_cost_centers(user)
+
+	return frappe.cache().hget(WRITE_SCOPE_CACHE_KEY, user, generator=generator)
+
+
+def resolve_write_scope_cost_centers(user):
+	"""Resolve the distinct cost centers a user can write to"""
+	return frozenset(row[0] for row in resolve_scope_grants(user) if row[3])
+
+
+def resolve_scope_grants(user):
+	"""
+	Resolve (cost_center, scope_type, scope_name, can_write) rows granted to a user
+	Grants are writable unless every User Access Scope row behind them leaves `write` unchecked.
+	Inactive units grant nothing, or only reading when the site keeps them read-only
+	"""
+	read_only = resolve_read_only_grants(user)
+	keep_inactive = inactive_units_read_only()
+	return [
+		(cost_center, scope_type, scope_name, 1 if cint(is_active) and (scope_type, scope_name) not in read_only else 0)
+		for cost_center, scope_type, scope_name, is_active in resolve_scope_rows(user)
+		if cint(is_active) or keep_inactive
+	]
+
+
+def inactive_units_read_only():
+	"""Whether units with `is_active` unchecked stay visible, read-only, to the users granted them"""
+	return cint(frappe.conf.get("tenantx_inactive_units_read_only"))
+
+
+def resolve_read_only_grants(user):
+	"""Resolve the (scope_type, scope_name) pairs a user's current access scope only grants reading"""
+	return {
+		(scope_type, scope_name)
+		for scope_type, scope_name in frappe.db.sql("""
+			SELECT `scope_type`, `scope_name` FROM `tabUser Access Scope`
+			WHERE `parent` = %(user)s AND `parenttype` = 'User'
+				AND (`valid_from` IS NULL OR `valid_from` <= %(now)s)
+				AND (`valid_to` IS NULL OR `valid_to` > %(now)s)
+			GROUP BY `scope_type`, `scope_name`
+			HAVING MAX(`write`) = 0
+		""", {"user": user, "now": now()})
+	}
+
+
+def resolve_scope_rows(user):
+	"""
+	Resolve (cost_center, scope_type, scope_name, is_active) rows granted to a user
+	A Factory Business Unit or SBU grants its cost center, a Liaison Office grants the cost
+	centers of the factory and SBU it is linked to, a Cost Center grants itself and an
+	Enterprise grants every cost center beneath it
+	"""
+	rows = frappe.db.sql("""
+		SELECT fbu.`cost_center`, up.`allow`, up.`for_value`, fbu.`is_active`
+		FROM `tabUser Permission` up
+		INNER JOIN `tabFactory Business Unit` fbu ON fbu.`name` = up.`for_value`
+		WHERE up.`user` = %(user)s AND up.`allow` = 'Factory Business Unit'
+			AND IFNULL(fbu.`cost_center`, '') != ''
+		UNION
+		SELECT sbu.`cost_center`, up.`allow`, up.`for_value`, sbu.`is_active`
+		FROM `tabUser Permission` up
+		INNER JOIN `tabStrategic Business Unit` sbu ON sbu.`name` = up.`for_value`
+		WHERE up.`user` = %(user)s AND up.`allow` = 'Strategic Business Unit'
+			AND IFNULL(sbu.`cost_center`, '') != ''
+		UNION
+		SELECT fbu.`cost_center`, up.`allow`, up.`for_value`, lo.`is_active` AND fbu.`is_active`
+		FROM `tabUser Permission` up
+		INNER JOIN `tabLiaison Office` lo ON lo.`name` = up.`for_value`
+		INNER JOIN `tabFactory Business Unit` fbu ON fbu.`name` = lo.`factory`
+		WHERE up.`user` = %(user)s AND up.`allow` = 'Liaison Office'
+			AND IFNULL(fbu.`cost_center`, '') != ''
+		UNION
+		SELECT sbu.`cost_center`, up.`allow`, up.`for_value`, lo.`is_active` AND sbu.`is_active`
+		FROM `tabUser Permission` up
+		INNER JOIN `tabLiaison Office` lo ON lo.`name` = up.`for_value`
+		INNER JOIN `tabStrategic Business Unit` sbu ON sbu.`name` = lo.`sbu`
+		WHERE up.`user` = %(user)s AND up.`allow` = 'Liaison Office'
+			AND IFNULL(sbu.`cost_center`, '') != ''
+		UNION
+		SELECT up.`for_value`, up.`allow`, up.`for_value`, 1
+		FROM `tabUser Permission` up
+		WHERE up.`user` = %(user)s AND up.`allow` = 'Cost Center'
+	""", {"user": user})
+
+	return [*rows, *resolve_enterprise_scope_rows(user)]
+
+
+def resolve_enterprise_scope_rows(user):
+	"""
+	Resolve the rows granted through Enterprises
+	Each Enterprise grants its own cost center and those of its SBUs, factories and child
+	enterprises, expanded through the cached hierarchy. A cost center is active when an
+	active unit below an active Enterprise holds it
+	"""
+	enterprises = frappe.db.sql_list("""
+		SELECT `for_value` FROM `tabUser Permission`
+		WHERE `user` = %(user)s AND `allow` = 'Enterprise'
+	""", {"user": user})
+	if not enterprises:
+		return []
+
+	from tenantx.tenantx.hierarchy import get_hierarchy, get_subtree_cost_centers
+
+	hierarchy = get_hierarchy()
+	rows = []
+	for enterprise in enterprises:
+		active = set(get_subtree_cost_centers("Enterprise", enterprise, hierarchy, active_only=True))
+		rows.extend(
+			(cost_center, "Enterprise", enterprise, 1 if cost_center in active else 0)
+			for cost_center in get_subtree_cost_centers("Enterprise", enterprise, hierarchy)
+		)
+	return rows
+
+
+def get_user_units(user):
+	"""
+	Get the org units granted to a user through User Permissions
+	Returns a dict of doctype to sorted unit names, served from cache
+	"""
+	return frappe.cache().hget(USER_UNITS_CACHE_KEY, user, generator=lambda: resolve_user_units(user))
+
+
+def resolve_user_units(user):
+	"""Resolve the org units granted to a user"""
+	units = {doctype: [] for doctype in ORG_DOCTYPES}
+	for allow, for_value in frappe.db.sql("""
+		SELECT `allow`, `for_value` FROM `tabUser Permission`
+		WHERE `user` = %(user)s AND `allow` IN %(doctypes)s
+		ORDER BY `for_value`
+	""", {"user": user, "doctypes": ORG_DOCTYPES}):
+		units[allow].append(for_value)
+
+	return units
+
+
+def resolve_visible_unit_rows(user):
+	"""Resolve (unit_type, unit) rows for the units granted to a user and every unit below them"""
+	from tenantx.tenantx.hierarchy import expand_units
+
+	return sorted(
+		(unit_type, unit)
+		for unit_type, units in expand_units(resolve_user_units(user)).items()
+		for unit in units
+	)
+
+
+def get_inline_limit():
+	"""Get the largest scope that is still inlined into permission conditions"""
+	return cint(frappe.conf.get("tenantx_scope_inline_limit")) or DEFAULT_INLINE_LIMIT
+
+
+def get_scope_strategy(cost_centers):
+	"""
+	Choose how a scope is matched from its cardinality
+	Small scopes are inlined, large ones join against the User Scope Index table
+	"""
+	if len(cost_centers) <= get_inline_limit():
+		return "inline"
+	return "index"
+
+
+def get_scope_match(user, cost_centers, unit=None):
+	"""
+	Get the right-hand side of an `IN` predicate for a user's scope
+	Returns an escaped value list or a subquery on the User Scope Index table. With a
+	(doctype, name) `unit` the subquery only keeps the cost centers of that unit's subtree
+	"""
+	if get_scope_strategy(cost_centers) == "inline":
+		return "({})".format(", ".join(frappe.db.escape(cost_center) for cost_center in cost_centers))
+
+	if unit:
+		return f"""(
+		SELECT usi.`cost_center` FROM `tabUser Scope Index` usi
+		INNER JOIN `tabUnit Cost Center Index` ucci ON ucci.`cost_center` = usi.`cost_center`
+		WHERE usi.`user` = {frappe.db.escape(user)}
+			AND ucci.`unit_type` = {frappe.db.escape(unit[0])} AND ucci.`unit` = {frappe.db.escape(unit[1])}
+	)"""
+
+	return f"""(
+		SELECT `cost_center` FROM `tabUser Scope Index`
+		WHERE `user` = {frappe.db.escape(user)}
+	)"""
+
+
+def get_unit_match(user, unit_type, units):
+	"""
+	Get the right-hand side of an `IN` predicate for the units of one type a user can see
+	Returns an escaped value list or a subquery on the User Unit Index table
+	"""
+	if get_scope_strategy(units) == "inline":
+		return "({})".format(", ".join(frappe.db.escape(unit) for unit in units))
+
+	return get_unit_index_match(user, unit_type)
+
+
+def get_unit_index_match(user, unit_type):
+	"""Get a subquery on the User Unit Index table for the units of one type a user can see"""
+	return f"""(
+		SELECT `unit` FROM `tabUser Unit Index`
+		WHERE `user` = {frappe.db.escape(user)} AND `unit_type` = {frappe.db.escape(unit_type)}
+	)"""
+
+
+@timed_area(PERMISSION_SYNC)
+def rebuild_scope_index(users):
+	"""
+	Rebuild the materialized scope rows and cached scope for the given users
+	Rows are replaced with one delete and one bulk insert for the whole batch
+	"""
+	users = sorted(set(filter(None, users)))
+	if not users:
+		return
+
+	frappe.db.delete("User Scope Index", {"user": ["in", users]})
+
+	values = []
+	for user in users:
+		for cost_center, scope_type, scope_name, can_write in resolve_scope_grants(user):
+			values.append((frappe.generate_hash(length=10), user, cost_center, scope_type, scope_name, can_write))
+
+	if values:
+		frappe.db.bulk_insert(
+			"User Scope Index",
+			["name", "user", "cost_center", "scope_type", "scope_name", "can_write"],
+			values,
+		)
+
+	rebuild_unit_index(users)
+	clear_scope_cache(users)
+
+
+def rebuild_unit_index(users):
+	"""Rebuild the materialized visible units of the given users with one delete and one bulk insert"""
+	users = sorted(set(filter(None, users)))
+	if not users:
+		return
+
+	frappe.db.delete("User Unit Index", {"user": ["in", users]})
+
+	values = [
+		(frappe.generate_hash(length=10), user, unit_type, unit)
+		for user in users
+		for unit_type, unit in resolve_visible_unit_rows(user)
+	]
+	for batch in create_batch(values, 10000):
+		frappe.db.bulk_insert("User Unit Index", ["name", "user", "unit_type", "unit"], batch)
+
+
+def rebuild_scope_index_for_unit(doctype, name):
+	"""Rebuild the scope of every user who has been granted the given unit, or a Liaison Office linked to it"""
+	users = frappe.db.sql_list("""
+		SELECT DISTINCT `user` FROM `tabUser Permission`
+		WHERE `allow` = %s AND `for_value` = %s
+	""", (doctype, name))
+
+	link_field = {"Factory Business Unit": "factory", "Strategic Business Unit": "sbu"}.get(doctype)
+	if link_field:
+		users += frappe.db.sql_list(f"""
+			SELECT DISTINCT up.`user` FROM `tabUser Permission` up
+			INNER JOIN `tabLiaison Office` lo ON lo.`name` = up.`for_value`
+			WHERE up.`allow` = 'Liaison Office' AND lo.`{link_field}` = %s
+		""", (name,))
+
+	rebuild_scope_index(users)
+
+
+def enqueue_enterprise_scope_rebuild(units):
+	"""
+	Rebuild the scopes that contain some changed (doctype, name) units once the save commits
+	The units are queued in Redis, so one job picks up every change made before it starts
+	"""
+	units = [list(unit) for unit in units if unit]
+	if units:
+		frappe.db.after_commit.add(lambda: queue_scope_rebuild(units))
+
+
+def queue_scope_rebuild(units):
+	"""
+	Queue changed units and make sure a rebuild job that has not started yet will pick them up
+	A job already running may have read the hierarchy before this change, so a second job
+	id is used while it runs
+	"""
+	frappe.cache().sadd(PENDING_SCOPE_REBUILD_KEY, *(json.dumps(unit) for unit in units))
+
+	job_ids = (SCOPE_REBUILD_JOB_ID, f"{SCOPE_REBUILD_JOB_ID}_next")
+	job_id = next((job_id for job_id in job_ids if not is_job_started(job_id)), job_ids[-1])
+	frappe.enqueue(
+		"tenantx.tenantx.scope_index.rebuild_enterprise_scopes",
+		queue="short",
+		job_id=job_id,
+		deduplicate=True,
+	)
+
+
+def is_job_started(job_id):
+	job = get_job(job_id)
+	return bool(job) and job.get_status() == "started"
+
+
+def pop_pending_units():
+	"""Take the queued changed units out of Redis"""
+	cache = frappe.cache()
+	members = list(cache.smembers(PENDING_SCOPE_REBUILD_KEY) or ())
+	if members:
+		cache.srem(PENDING_SCOPE_REBUILD_KEY, *members)
+	return [tuple(json.loads(member)) for member in members]
+
+
+def rebuild_enterprise_scopes():
+	"""
+	Rebuild after hierarchy changes, for the queued units only
+	Refreshes the subtree cost centers of the changed units and everything above them, and the
+	scope of every user granted one of those units, whose granted subtree holds the change
+	"""
+	units = pop_pending_units()
+	if not units:
+		return
+
+	from tenantx.tenantx.hierarchy import (
+		clear_hierarchy_cache,
+		get_ancestor_nodes,
+		get_users_with_access,
+		rebuild_unit_cost_centers,
+	)
+
+	# A request racing the save may have cached the hierarchy from before it committed
+	clear_hierarchy_cache()
+	nodes = get_ancestor_nodes(units)
+	rebuild_unit_cost_centers(nodes)
+
+	granted = {}
+	for doctype, name in nodes:
+		granted.setdefault(doctype, []).append(name)
+	rebuild_scope_index(get_users_with_access(granted))
+
+
+def rebuild_all_scope_indexes():
+	"""Rebuild the scope index for every user holding a scoped User Permission"""
+	users = frappe.db.sql_list("""
+		SELECT DISTINCT `user` FROM `tabUser Permission`
+		WHERE `allow` IN %(doctypes)s
+	""", {"doctypes": SCOPE_DOCTYPES})
+
+	frappe.db.delete("User Scope Index")
+	frappe.db.delete("User Unit Index")
+	rebuild_scope_index(users)
+
+
+def clear_scope_cache(users=None):
+	"""Clear cached scopes for the given users, or for everyone"""
+	if users is None:
+		frappe.cache().delete_key(SCOPE_CACHE_KEY)
+		frappe.cache().delete_key(WRITE_SCOPE_CACHE_KEY)
+		frappe.cache().delete_key(USER_UNITS_CACHE_KEY)
+		return
+
+	for user in users:
+		frappe.cache().hdel(SCOPE_CACHE_KEY, user)
+		frappe.cache().hdel(WRITE_SCOPE_CACHE_KEY, user)
+		frappe.cache().hdel(USER_UNITS_CACHE_KEY, user)
+
+
+def on_user_permission_change(doc, method):
+	"""Keep the scope index in sync with User Permissions edited directly"""
+	# The User sync rebuilds the index once after writing all its permissions
+	if frappe.flags.in_user_scope_sync:
+		return
+
+	if doc.allow in SCOPE_DOCTYPES:
+		rebuild_scope_index([doc.user])
+	elif doc.allow in ORG_DOCTYPES:
+		clear_scope_cache([doc.user])
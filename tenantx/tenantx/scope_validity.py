@@ -0,0 +1,134 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Time-bounded access scopes
+User Access Scope rows may carry `valid_from` and `valid_to`. Only rows inside their bounds
+become User Permissions, so permission conditions never look at dates. An hourly job finds
+the rows whose bounds were crossed since its last run through the indexed bound columns and
+re-syncs those users' User Permissions and scope index in batches
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import create_batch, get_datetime, now, now_datetime
+
+from tenantx.tenantx.scope_index import ORG_DOCTYPES, rebuild_scope_index
+
+LAST_RUN_KEY = "tenantx_scope_validity_last_run"
+
+# Users re-synced per batch by the hourly job
+SYNC_BATCH_SIZE = 100
+
+USER_PERMISSION_FIELDS = [
+	"name",
+	"user",
+	"allow",
+	"for_value",
+	"is_default",
+	"apply_to_all_doctypes",
+	"owner",
+	"modified_by",
+	"creation",
+	"modified",
+]
+
+
+def is_scope_current(scope, at=None):
+	"""Whether a User Access Scope row is inside its validity bounds"""
+	at = at or now_datetime()
+	if scope.get("valid_from") and get_datetime(scope.valid_from) > at:
+		return False
+	if scope.get("valid_to") and get_datetime(scope.valid_to) <= at:
+		return False
+	return True
+
+
+def validate_scope_bounds(scopes):
+	"""Stop a scope from expiring before it starts"""
+	for scope in scopes:
+		if scope.get("valid_from") and scope.get("valid_to") and get_datetime(scope.valid_to) <= get_datetime(scope.valid_from):
+			frappe.throw(
+				_("Row #{0}: Valid To must be after Valid From").format(scope.idx),
+				title=_("Invalid Access Scope"),
+			)
+
+
+def validate_user_scope_bounds(doc, method=None):
+	"""Validate the access scope bounds of a User before it is saved, used as a doc event"""
+	validate_scope_bounds(doc.get("user_access_scope") or [])
+
+
+def apply_scope_validity():
+	"""
+	Hourly job activating and expiring access scopes
+	Re-syncs every user with a bound crossed since the last run, or with any bound on the first run
+	"""
+	current = now()
+	last_run = frappe.db.get_default(LAST_RUN_KEY)
+
+	if last_run:
+		users = frappe.db.sql_list("""
+			SELECT `parent` FROM `tabUser Access Scope`
+			WHERE `parenttype` = 'User' AND `valid_from` > %(last_run)s AND `valid_from` <= %(now)s
+			UNION
+			SELECT `parent` FROM `tabUser Access Scope`
+			WHERE `parenttype` = 'User' AND `valid_to` > %(last_run)s AND `valid_to` <= %(now)s
+		""", {"last_run": last_run, "now": current})
+	else:
+		users = frappe.db.sql_list("""
+			SELECT DISTINCT `parent` FROM `tabUser Access Scope`
+			WHERE `parenttype` = 'User' AND (`valid_from` IS NOT NULL OR `valid_to` IS NOT NULL)
+		""")
+
+	for batch in create_batch(sorted(users), SYNC_BATCH_SIZE):
+		sync_scope_permissions(batch, current)
+		frappe.db.commit()
+
+	frappe.db.set_default(LAST_RUN_KEY, current)
+
+
+def sync_scope_permissions(users, at=None):
+	"""
+	Replace the org unit User Permissions of some users with their current access scopes
+	One delete and one insert for the whole batch, then one scope index rebuild
+	"""
+	at = get_datetime(at or now())
+	scopes = frappe.db.sql("""
+		SELECT `parent`, `scope_type`, `scope_name`, `valid_from`, `valid_to`
+		FROM `tabUser Access Scope`
+		WHERE `parenttype` = 'User' AND `parent` IN %(users)s
+			AND (`read` = 1 OR `write` = 1)
+			AND IFNULL(`scope_type`, '') != '' AND IFNULL(`scope_name`, '') != ''
+	""", {"users": tuple(users)}, as_dict=True)
+
+	existing = {
+		doctype: set(frappe.get_all(doctype, filters={"name": ["in", names]}, pluck="name"))
+		for doctype, names in group_scope_names(scopes).items()
+	}
+
+	timestamp = now()
+	grants = sorted({
+		(scope.parent, scope.scope_type, scope.scope_name)
+		for scope in scopes
+		if scope.scope_name in existing.get(scope.scope_type, ()) and is_scope_current(scope, at)
+	})
+
+	# Bulk writes skip the User Permission hooks, the scope index is rebuilt once below instead
+	frappe.db.delete("User Permission", {"user": ["in", list(users)], "allow": ["in", ORG_DOCTYPES]})
+	for batch in create_batch(grants, 10000):
+		frappe.db.bulk_insert("User Permission", USER_PERMISSION_FIELDS, [
+			(frappe.generate_hash(length=10), user, allow, for_value, 0, 1, "Administrator", "Administrator", timestamp, timestamp)
+			for user, allow, for_value in batch
+		])
+
+	rebuild_scope_index(users)
+	for user in users:
+		frappe.cache().hdel("user_permissions", user)
+
+
+def group_scope_names(scopes):
+	names = {}
+	for scope in scopes:
+		names.setdefault(scope.scope_type, set()).add(scope.scope_name)
+	return {doctype: list(values) for doctype, values in names.items() if doctype in ORG_DOCTYPES}
@@ -0,0 +1,72 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Selling factory for Sales Orders and Delivery Notes
+Resolves the factories serving a customer from the Party Unit Map in one indexed lookup,
+limited to the user's scope, to default or restrict the selling factory and cost center
+"""
+
+import frappe
+from frappe import _
+
+from tenantx.tenantx.hierarchy import get_factory_for_cost_center, get_hierarchy, get_visible_units
+
+
+def get_customer_factories(customer):
+	"""Get the Factory Business Units serving a customer, from either side of the mapping"""
+	return frappe.db.sql_list("""
+		SELECT `unit` FROM `tabParty Unit Map`
+		WHERE `party_type` = 'Customer' AND `party` = %(customer)s
+			AND `unit_type` = 'Factory Business Unit'
+		GROUP BY `unit`
+		ORDER BY MAX(`is_primary`) DESC, `unit`
+	""", {"customer": customer})
+
+
+@frappe.whitelist()
+def get_selling_factories(customer):
+	"""
+	Get the active factories in the user's scope that serve a customer, with their cost centers
+	`factory` and `cost_center` are set when the choice is unambiguous
+	"""
+	hierarchy = get_hierarchy()
+	units = hierarchy["units"]["Factory Business Unit"]
+	visible = get_visible_units(frappe.session.user, hierarchy)
+
+	factories = [
+		{
+			"factory": factory,
+			"title": units[factory].title or factory,
+			"cost_center": units[factory].cost_center,
+		}
+		for factory in get_customer_factories(customer)
+		if factory in units
+		and units[factory].is_active
+		and (visible is None or factory in visible["Factory Business Unit"])
+	]
+
+	default = factories[0] if len(factories) == 1 else {}
+	return {
+		"factories": factories,
+		"factory": default.get("factory"),
+		"cost_center": default.get("cost_center"),
+	}
+
+
+def validate_selling_factory(doc, method=None):
+	"""Stop a selling document from being raised on a factory that does not serve its customer"""
+	if not doc.get("customer") or not doc.get("cost_center"):
+		return
+
+	factory = get_factory_for_cost_center(doc.cost_center)
+	if not factory:
+		return
+
+	factories = get_customer_factories(doc.customer)
+	# Customers not mapped to any factory can be sold from anywhere
+	if factories and factory not in factories:
+		frappe.throw(
+			_("Customer {0} is not served by Factory Business Unit {1}").format(doc.customer, factory),
+			title=_("Invalid Selling Factory"),
+		)
@@ -0,0 +1,240 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for TenantX permission conditions on the SQLite harness
+These run without a site: `python -m unittest tenantx.tenantx.test_permission_queries`
+"""
+
+import unittest
+
+import frappe
+
+from tenantx.tenantx.active_unit import get_cache_key
+from tenantx.tenantx.hierarchy import rebuild_unit_cost_centers
+from tenantx.tenantx.permission_harness import PermissionHarness
+from tenantx.tenantx.permission_queries import (
+	get_permission_query_conditions_for_customer,
+	get_permission_query_conditions_for_purchase_order,
+	has_permission_for_purchase_order,
+)
+from tenantx.tenantx.scope_index import clear_scope_cache, rebuild_scope_index
+
+USER = "factory.user@example.com"
+
+
+class TestPermissionQueries(unittest.TestCase):
+	def setUp(self):
+		self.harness = PermissionHarness().__enter__()
+		self.addCleanup(self.harness.__exit__, None, None, None)
+
+		self.harness.add_unit("Factory Business Unit", "FBU-1", cost_center="CC-1")
+		self.harness.add_unit("Factory Business Unit", "FBU-2", cost_center="CC-2")
+		self.harness.add_unit("Strategic Business Unit", "SBU-1", cost_center="CC-3")
+		for name, cost_center in (("PO-1", "CC-1"), ("PO-2", "CC-2"), ("PO-3", "CC-3")):
+			self.harness.db.insert("Purchase Order", name=name, cost_center=cost_center)
+		self.harness.set_user(USER, roles=["Factory User"])
+
+	def test_system_manager_is_unrestricted(self):
+		self.harness.set_user("admin@example.com", roles=["System Manager"])
+		self.assertEqual(get_permission_query_conditions_for_purchase_order("admin@example.com"), "")
+
+	def test_user_without_scope_sees_nothing(self):
+		self.assertEqual(get_permission_query_conditions_for_purchase_order(USER), "1=0")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), [])
+
+	def test_factory_and_sbu_scope(self):
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.harness.grant(USER, "Strategic Business Unit", "SBU-1")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1", "PO-3"])
+
+	def test_direct_cost_center_scope(self):
+		self.harness.grant(USER, "Cost Center", "CC-2")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-2"])
+
+	def test_large_scope_uses_index(self):
+		self.harness.conf.tenantx_scope_inline_limit = 1
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.harness.grant(USER, "Factory Business Unit", "FBU-2")
+		rebuild_scope_index([USER])
+
+		self.assertIn("tabUser Scope Index", get_permission_query_conditions_for_purchase_order(USER))
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1", "PO-2"])
+
+	def test_large_unit_set_uses_index(self):
+		self.harness.conf.tenantx_scope_inline_limit = 1
+		self.harness.add_unit("Factory Business Unit", "FBU-3", cost_center="CC-5", sbu="SBU-1")
+		self.harness.add_unit("Factory Business Unit", "FBU-4", cost_center="CC-6", sbu="SBU-1")
+		self.harness.grant(USER, "Strategic Business Unit", "SBU-1")
+		rebuild_scope_index([USER])
+		for customer, factory in (("CUST-1", "FBU-3"), ("CUST-2", "FBU-1"), ("CUST-3", None)):
+			self.harness.db.insert("Customer", name=customer)
+			if factory:
+				self.harness.db.insert(
+					"Party Unit Map", name=f"PUM-{customer}", party_type="Customer", party=customer,
+					unit_type="Factory Business Unit", unit=factory, source="Factory Access",
+				)
+
+		self.assertIn("tabUser Unit Index", get_permission_query_conditions_for_customer(USER))
+		self.assertEqual(self.harness.get_visible("Customer", USER), ["CUST-1", "CUST-3"])
+
+	def test_factory_customer_details_do_not_restrict_customer(self):
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.harness.db.insert("Customer", name="CUST-1")
+		self.harness.db.insert(
+			"Party Unit Map", name="PUM-1", party_type="Customer", party="CUST-1",
+			unit_type="Factory Business Unit", unit="FBU-2", source="Customer Details",
+		)
+		self.assertEqual(self.harness.get_visible("Customer", USER), ["CUST-1"])
+
+	def test_liaison_office_link_shows_customer_without_hiding_it(self):
+		self.harness.add_unit("Liaison Office", "LO-1", factory="FBU-1")
+		for customer in ("CUST-1", "CUST-2"):
+			self.harness.db.insert("Customer", name=customer)
+			self.harness.db.insert(
+				"Party Unit Map", name=f"PUM-{customer}-LO", party_type="Customer", party=customer,
+				unit_type="Liaison Office", unit="LO-1", source="Customer",
+			)
+		self.harness.db.insert(
+			"Party Unit Map", name="PUM-CUST-2-SBU", party_type="Customer", party="CUST-2",
+			unit_type="Strategic Business Unit", unit="SBU-1", source="SBU Access",
+		)
+
+		self.harness.grant(USER, "Factory Business Unit", "FBU-2")
+		self.assertEqual(self.harness.get_visible("Customer", USER), ["CUST-1"])
+
+		officer = "liaison.officer@example.com"
+		self.harness.set_user(officer, roles=["Factory User"])
+		self.harness.grant(officer, "Liaison Office", "LO-1")
+		self.assertEqual(self.harness.get_visible("Customer", officer), ["CUST-1", "CUST-2"])
+
+	def test_units_below_granted_sbu_are_listed(self):
+		self.harness.add_unit("Factory Business Unit", "FBU-3", cost_center="CC-5", sbu="SBU-1")
+		self.harness.grant(USER, "Strategic Business Unit", "SBU-1")
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.assertEqual(self.harness.get_visible("Factory Business Unit", USER), ["FBU-1", "FBU-3"])
+		self.assertEqual(self.harness.get_visible("Strategic Business Unit", USER), ["SBU-1"])
+
+	def test_large_active_unit_uses_index(self):
+		self.harness.conf.tenantx_scope_inline_limit = 1
+		self.harness.add_unit("Enterprise", "ENT-1", cost_center="CC-4")
+		self.harness.db.sql("UPDATE `tabStrategic Business Unit` SET `enterprise` = 'ENT-1'")
+		self.harness.db.sql("UPDATE `tabFactory Business Unit` SET `sbu` = 'SBU-1'")
+		self.harness.db.insert("Purchase Order", name="PO-4", cost_center="CC-4")
+		self.harness.grant(USER, "Enterprise", "ENT-1")
+		rebuild_scope_index([USER])
+		rebuild_unit_cost_centers()
+
+		self.harness.session.sid = "session-1"
+		self.harness.cache.set_value(get_cache_key("session-1"), {
+			"doctype": "Strategic Business Unit",
+			"name": "SBU-1",
+			"cost_centers": ["CC-1", "CC-2", "CC-3"],
+			"liaison_offices": [],
+		})
+
+		self.assertIn("tabUnit Cost Center Index", get_permission_query_conditions_for_purchase_order(USER))
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1", "PO-2", "PO-3"])
+
+	def test_journal_entry_matches_any_account(self):
+		self.harness.grant(USER, "Factory Business Unit", "FBU-2")
+		self.harness.db.insert("Journal Entry", name="JV-1")
+		self.harness.db.insert("Journal Entry", name="JV-2")
+		self.harness.db.insert("Journal Entry Account", parent="JV-1", cost_center="CC-1")
+		self.harness.db.insert("Journal Entry Account", parent="JV-1", cost_center="CC-2")
+		self.harness.db.insert("Journal Entry Account", parent="JV-2", cost_center="CC-3")
+		self.assertEqual(self.harness.get_visible("Journal Entry", USER), ["JV-1"])
+
+	def test_liaison_office_scope(self):
+		self.harness.add_unit("Liaison Office", "LO-1", factory="FBU-1")
+		self.harness.grant(USER, "Liaison Office", "LO-1")
+		self.harness.db.insert("Sales Invoice", name="SINV-1", cost_center="CC-1", customer="CUST-1")
+		self.harness.db.insert("Sales Invoice", name="SINV-2", cost_center="CC-2", customer="CUST-2")
+		self.harness.db.insert("Sales Invoice", name="SINV-3", cost_center="CC-3", customer="CUST-3")
+		self.harness.db.insert(
+			"Party Unit Map", name="PUM-1", party_type="Customer", party="CUST-2",
+			unit_type="Liaison Office", unit="LO-1", source="Customer",
+		)
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1"])
+		self.assertEqual(self.harness.get_visible("Sales Invoice", USER), ["SINV-1", "SINV-2"])
+
+	def test_enterprise_scope_covers_subtree(self):
+		self.harness.add_unit("Enterprise", "ENT-1", cost_center="CC-4")
+		self.harness.add_unit("Enterprise", "ENT-2", parent_enterprise="ENT-1")
+		self.harness.db.sql("UPDATE `tabStrategic Business Unit` SET `enterprise` = 'ENT-2' WHERE `name` = 'SBU-1'")
+		self.harness.db.sql("UPDATE `tabFactory Business Unit` SET `sbu` = 'SBU-1' WHERE `name` = 'FBU-2'")
+		self.harness.db.insert("Purchase Order", name="PO-4", cost_center="CC-4")
+		self.harness.grant(USER, "Enterprise", "ENT-1")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-2", "PO-3", "PO-4"])
+
+	def test_read_only_scope_cannot_write(self):
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.harness.grant(USER, "Factory Business Unit", "FBU-2")
+		self.harness.db.insert(
+			"User Access Scope", name="UAS-1", parent=USER, parenttype="User", parentfield="user_access_scope",
+			scope_type="Factory Business Unit", scope_name="FBU-1", read="1", write="0",
+		)
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1", "PO-2"])
+
+		read_only = frappe._dict(doctype="Purchase Order", cost_center="CC-1")
+		writable = frappe._dict(doctype="Purchase Order", cost_center="CC-2")
+		self.assertIsNone(has_permission_for_purchase_order(read_only, "read", USER))
+		self.assertFalse(has_permission_for_purchase_order(read_only, "write", USER))
+		self.assertFalse(has_permission_for_purchase_order(read_only, "submit", USER))
+		self.assertIsNone(has_permission_for_purchase_order(writable, "write", USER))
+
+	def test_inactive_units_grant_nothing(self):
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.harness.grant(USER, "Factory Business Unit", "FBU-2")
+		self.harness.db.sql("UPDATE `tabFactory Business Unit` SET `is_active` = 0 WHERE `name` = 'FBU-2'")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1"])
+
+	def test_inactive_units_can_stay_read_only(self):
+		self.harness.conf.tenantx_inactive_units_read_only = 1
+		self.harness.grant(USER, "Factory Business Unit", "FBU-2")
+		self.harness.db.sql("UPDATE `tabFactory Business Unit` SET `is_active` = 0 WHERE `name` = 'FBU-2'")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-2"])
+
+		document = frappe._dict(doctype="Purchase Order", cost_center="CC-2")
+		self.assertFalse(has_permission_for_purchase_order(document, "write", USER))
+
+	def test_inactive_factory_hides_its_customers(self):
+		self.harness.add_unit("Factory Business Unit", "FBU-3", cost_center="CC-5", sbu="SBU-1")
+		self.harness.db.sql("UPDATE `tabFactory Business Unit` SET `is_active` = 0 WHERE `name` = 'FBU-3'")
+		self.harness.grant(USER, "Strategic Business Unit", "SBU-1")
+		self.harness.db.insert("Customer", name="CUST-1")
+		self.harness.db.insert(
+			"Party Unit Map", name="PUM-1", party_type="Customer", party="CUST-1",
+			unit_type="Factory Business Unit", unit="FBU-3", source="Factory Access",
+		)
+		self.assertEqual(self.harness.get_visible("Customer", USER), [])
+		self.assertEqual(self.harness.get_visible("Factory Business Unit", USER), [])
+
+		self.harness.conf.tenantx_inactive_units_read_only = 1
+		self.assertEqual(self.harness.get_visible("Customer", USER), ["CUST-1"])
+
+	def test_inactive_liaison_office_grants_nothing(self):
+		self.harness.add_unit("Liaison Office", "LO-1", factory="FBU-1")
+		self.harness.db.sql("UPDATE `tabLiaison Office` SET `is_active` = 0 WHERE `name` = 'LO-1'")
+		self.harness.grant(USER, "Liaison Office", "LO-1")
+		self.harness.db.insert("Sales Invoice", name="SINV-1", cost_center="CC-2", customer="CUST-1")
+		self.harness.db.insert(
+			"Party Unit Map", name="PUM-1", party_type="Customer", party="CUST-1",
+			unit_type="Liaison Office", unit="LO-1", source="Customer",
+		)
+		self.assertEqual(self.harness.get_visible("Sales Invoice", USER), [])
+
+	def test_scope_is_cached_until_cleared(self):
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1"])
+
+		self.harness.grant(USER, "Factory Business Unit", "FBU-2")
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1"])
+		self.assertEqual(self.harness.cache.misses, 1)
+
+		clear_scope_cache([USER])
+		self.assertEqual(self.harness.get_visible("Purchase Order", USER), ["PO-1", "PO-2"])
+
+	def test_condition_builder_is_fast_when_cached(self):
+		self.harness.grant(USER, "Factory Business Unit", "FBU-1")
+		self.assertLess(self.harness.benchmark(get_permission_query_conditions_for_purchase_order, USER), 1)
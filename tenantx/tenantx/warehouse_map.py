@@ -0,0 +1,83 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Warehouse to unit map for TenantX
+Materializes every warehouse under a Factory Business Unit's Warehouse Details, descendants
+included through the Warehouse tree's lft/rgt, with the factory's cost center. Stock
+permission conditions join against it by cost center instead of walking the tree per row
+"""
+
+import frappe
+from frappe.utils import create_batch
+
+WAREHOUSE_UNIT_FIELDS = ["name", "warehouse", "factory", "cost_center", "root_warehouse"]
+
+
+def rebuild_factory_warehouses(factories):
+	"""Replace the map rows of some factories with one delete and one insert per batch"""
+	factories = sorted(set(filter(None, factories)))
+	if not factories:
+		return
+
+	frappe.db.delete("Warehouse Unit Map", {"factory": ["in", factories]})
+	insert_rows(resolve_factory_warehouses(factories))
+
+
+def rebuild_all_warehouse_unit_maps():
+	"""Rebuild the map for every Factory Business Unit"""
+	frappe.db.delete("Warehouse Unit Map")
+	insert_rows(resolve_factory_warehouses())
+
+
+def resolve_factory_warehouses(factories=None):
+	"""Resolve (warehouse, factory, cost_center, root_warehouse) rows, one per factory and warehouse"""
+	conditions = ""
+	if factories:
+		conditions = "AND fbu.`name` IN %(factories)s"
+
+	return frappe.db.sql(f"""
+		SELECT DISTINCT wh.`name`, fbu.`name`, fbu.`cost_center`, root.`name`
+		FROM `tabWarehouse Details` wd
+		INNER JOIN `tabFactory Business Unit` fbu ON fbu.`name` = wd.`parent`
+		INNER JOIN `tabWarehouse` root ON root.`name` = wd.`warehouse`
+		INNER JOIN `tabWarehouse` wh ON wh.`lft` >= root.`lft` AND wh.`rgt` <= root.`rgt`
+		WHERE wd.`parenttype` = 'Factory Business Unit' {conditions}
+	""", {"factories": tuple(factories or ())})
+
+
+def insert_rows(rows):
+	seen = set()
+	values = []
+	for warehouse, factory, cost_center, root_warehouse in rows:
+		# A warehouse nested under two roots of the same factory is mapped once
+		if (warehouse, factory) in seen:
+			continue
+		seen.add((warehouse, factory))
+		values.append((frappe.generate_hash(length=10), warehouse, factory, cost_center, root_warehouse))
+
+	for batch in create_batch(values, 10000):
+		frappe.db.bulk_insert("Warehouse Unit Map", WAREHOUSE_UNIT_FIELDS, batch)
+
+
+def on_factory_update(doc, method=None):
+	rebuild_factory_warehouses([doc.name])
+
+
+def on_factory_trash(doc, method=None):
+	frappe.db.delete("Warehouse Unit Map", {"factory": doc.name})
+
+
+def on_warehouse_change(doc, method=None):
+	"""
+	Rebuild the factories a warehouse is, or now falls, under
+	Covers warehouses created or moved below a mapped warehouse, and mapped warehouses moved
+	away or deleted
+	"""
+	warehouses = [doc.name, doc.get("parent_warehouse")]
+	factories = frappe.db.sql_list("""
+		SELECT DISTINCT `factory` FROM `tabWarehouse Unit Map`
+		WHERE `warehouse` IN %(warehouses)s
+	""", {"warehouses": tuple(filter(None, warehouses))})
+
+	rebuild_factory_warehouses(factories)
@@ -0,0 +1,183 @@
+# Copyright (c) 2026, CognitionXLogic and contributors
+# For license information, please see license.txt
+
+"""
+Warehouse provisioning for Factory Business Units
+Creates each factory's templated warehouse tree, a group warehouse with Stores, Work In
+Progress, Finished Goods and Rejected below it, and wires the leaves into Warehouse Details.
+Rows are bulk inserted for any number of factories and the Warehouse tree is rebuilt once
+"""
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import now
+from frappe.utils.nestedset import rebuild_tree
+
+from tenantx.tenantx.warehouse_map import rebuild_factory_warehouses
+
+# Leaf warehouses created below every factory's group warehouse
+WAREHOUSE_TEMPLATE = ("Stores", "Work In Progress", "Finished Goods", "Rejected")
+
+WAREHOUSE_FIELDS = [
+	"name",
+	"warehouse_name",
+	"company",
+	"parent_warehouse",
+	"is_group",
+	"account",
+	"lft",
+	"rgt",
+	"owner",
+	"modified_by",
+	"creation",
+	"modified",
+]
+
+
+@frappe.whitelist()
+def provision_warehouses(factory):
+	"""Provision the templated warehouse tree of one Factory Business Unit"""
+	return bulk_provision_warehouses([factory])
+
+
+@frappe.whitelist()
+def bulk_provision_warehouses(factories):
+	"""
+	Provision the templated warehouse trees of several Factory Business Units at once
+	Existing warehouses are kept, so running it again only fills the gaps
+	Returns the number of warehouses created
+	"""
+	if isinstance(factories, str):
+		factories = json.loads(factories)
+
+	frappe.has_permission("Warehouse", "create", throw=True)
+	for factory in factories:
+		frappe.has_permission("Factory Business Unit", "write", factory, throw=True)
+
+	return provision_factory_warehouses(factories)
+
+
+def provision_factory_warehouses(factories):
+	"""Create the missing template warehouses and Warehouse Details rows of some factories"""
+	factories = frappe.get_all(
+		"Factory Business Unit",
+		filters={"name": ["in", list(set(factories))]},
+		fields=["name", "factory_name", "company"],
+	)
+
+	companies = {}
+	warehouses = []
+	details = []
+	for factory in factories:
+		if not factory.company:
+			frappe.throw(_("Set a Company on Factory Business Unit {0} to provision its warehouses").format(factory.name))
+
+		if factory.company not in companies:
+			companies[factory.company] = get_company_defaults(factory.company)
+		company = companies[factory.company]
+
+		group = get_warehouse_name(factory.factory_name, company.abbr)
+		warehouses.append(get_warehouse_row(group, factory.factory_name, company, company.root_warehouse, is_group=1))
+		for label in WAREHOUSE_TEMPLATE:
+			name = get_warehouse_name(f"{factory.factory_name} {label}", company.abbr)
+			warehouses.append(get_warehouse_row(name, f"{factory.factory_name} {label}", company, group))
+			details.append((factory.name, name, group, company.default_inventory_account))
+
+	existing = set(frappe.get_all("Warehouse", filters={"name": ["in", [row[0] for row in warehouses]]}, pluck="name"))
+	new_warehouses = [row for row in warehouses if row[0] not in existing]
+	if new_warehouses:
+		frappe.db.bulk_insert("Warehouse", WAREHOUSE_FIELDS, new_warehouses)
+		rebuild_tree("Warehouse")
+
+	insert_warehouse_details(details)
+	rebuild_factory_warehouses([factory.name for factory in factories])
+
+	return len(new_warehouses)
+
+
+def get_company_defaults(company):
+	"""Get the abbreviation, default inventory account and root warehouse of a company"""
+	defaults = frappe.get_cached_value("Company", company, ["abbr", "default_inventory_account"], as_dict=True)
+	defaults.name = company
+	defaults.root_warehouse = frappe.db.get_value(
+		"Warehouse", {"company": company, "is_group": 1, "parent_warehouse": ["is", "not set"]}
+	)
+	return defaults
+
+
+def get_warehouse_name(warehouse_name, abbr):
+	"""Warehouse names carry the company abbreviation, like ERPNext's Warehouse autoname"""
+	return f"{warehouse_name} - {abbr}"
+
+
+def get_warehouse_row(name, warehouse_name, company, parent_warehouse, is_group=0):
+	"""Build a Warehouse row in WAREHOUSE_FIELDS order, lft and rgt are set by the tree rebuild"""
+	timestamp = now()
+	return (
+		name,
+		warehouse_name,
+		company.name,
+		parent_warehouse,
+		is_group,
+		None if is_group else company.default_inventory_account,
+		0,
+		0,
+		frappe.session.user,
+		frappe.session.user,
+		timestamp,
+		timestamp,
+	)
+
+
+def insert_warehouse_details(details):
+	"""Append the Warehouse Details rows a factory does not have yet"""
+	factories = sorted({factory for factory, *_rest in details})
+	existing = {}
+	for parent, warehouse, idx in frappe.db.sql("""
+		SELECT `parent`, `warehouse`, `idx` FROM `tabWarehouse Details`
+		WHERE `parenttype` = 'Factory Business Unit' AND `parent` IN %(factories)s
+	""", {"factories": tuple(factories) or ("",)}):
+		existing.setdefault(parent, {"warehouses": set(), "idx": 0})
+		existing[parent]["warehouses"].add(warehouse)
+		existing[parent]["idx"] = max(existing[parent]["idx"], idx)
+
+	timestamp = now()
+	rows = []
+	for factory, warehouse, parent_warehouse, account in details:
+		current = existing.setdefault(factory, {"warehouses": set(), "idx": 0})
+		if warehouse in current["warehouses"]:
+			continue
+		current["warehouses"].add(warehouse)
+		current["idx"] += 1
+		rows.append((
+			frappe.generate_hash(length=10),
+			factory,
+			"Factory Business Unit",
+			"warehouse_details",
+			current["idx"],
+			warehouse,
+			parent_warehouse,
+			account,
+			frappe.session.user,
+			frappe.session.user,
+			timestamp,
+			timestamp,
+		))
+
+	if rows:
+		frappe.db.bulk_insert("Warehouse Details", [
+			"name",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"warehouse",
+			"parent_warehouse",
+			"account",
+			"owner",
+			"modified_by",
+			"creation",
+			"modified",
+		], rows)